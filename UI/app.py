@@ -41,7 +41,6 @@ class ScreenRecorderApp:
         self.audio_devices = list_available_audio_devices() if list_available_audio_devices() else ["No devices found"]
         
         # Initialize buffers for clipping
-        self.frame_buffer = deque(maxlen=30 * 30)  # 30 seconds at 30 fps
         self.audio_buffer = deque(maxlen=30 * 44100 * 2)  # 30 seconds of stereo audio at 44.1kHz
         
         self.settings = {
@@ -53,7 +52,8 @@ class ScreenRecorderApp:
                 "save_location": os.path.expanduser("~/Documents"),
                 "clip_format": "mp4"
                 "clip_duration" "30",  # Add this
-                "clip_hotkey": "Ctrl+C"  # Add this
+                "clip_hotkey": "Ctrl+C",  # Add this
+                "clip_buffer_codec": "raw"  # raw, jpeg or png
             },
             "Audio": {
                 "desktop_audio_device": "Default",
@@ -69,7 +69,8 @@ class ScreenRecorderApp:
         }
 
         # Initialize clipper with buffers
-        self.clipper = Clipper()
+        self.clipper = Clipper(buffer_codec=self.settings["Output"]["clip_buffer_codec"])
+        self.frame_buffer = self.clipper.create_frame_buffer(30 * 30)  # 30 seconds at 30 fps
         self.clipper.set_buffers(self.frame_buffer, self.audio_buffer)
         
         self.current_filename = ""
@@ -341,6 +342,8 @@ class ScreenRecorderApp:
                 try:
                     frame = sct.grab(monitor)
                     frame_bytes = frame.rgb
+                    if hasattr(self.frame_buffer, 'frame_size'):
+                        self.frame_buffer.frame_size = frame.size
                     self.frame_buffer.append(frame_bytes)
                     
                     # Update preview
@@ -1,6 +1,7 @@
 import os
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import threading
 import subprocess
 import vosk
@@ -12,13 +13,102 @@ import requests
 import zipfile
 import shutil
 from pathlib import Path
+import cv2
+import numpy as np
+
+BUFFER_CODECS = {
+    # codec: (image extension, cv2.imencode parameters)
+    "jpeg": (".jpg", [cv2.IMWRITE_JPEG_QUALITY, 90]),
+    "png": (".png", [cv2.IMWRITE_PNG_COMPRESSION, 1])
+}
+
+class CompressedFrameBuffer:
+    """Deque-like frame buffer that stores RGB frames as JPEG or PNG.
+
+    Frames are compressed on a thread pool as they are appended and only
+    decoded back to raw RGB bytes when the buffer is read at save time.
+    """
+
+    def __init__(self, maxlen, codec="jpeg", frame_size=(1920, 1080), workers=None):
+        self.codec = codec
+        self.extension, self.params = BUFFER_CODECS[codec]
+        self.frame_size = frame_size
+        self.frames = deque(maxlen=maxlen)
+        self.workers = workers or max(2, (os.cpu_count() or 2) // 2)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.pending = threading.BoundedSemaphore(self.workers * 2)
+        self.stats_lock = threading.Lock()
+        self.stats = {"frames_dropped": 0, "frames_encoded": 0,
+                      "raw_bytes": 0, "encoded_bytes": 0, "encode_time": 0.0}
+
+    @property
+    def maxlen(self):
+        return self.frames.maxlen
+
+    def __len__(self):
+        return len(self.frames)
+
+    def append(self, data):
+        """Queue raw RGB bytes for compression."""
+        # Drop the frame rather than queue raw frames behind a slow codec
+        if not self.pending.acquire(blocking=False):
+            self.stats["frames_dropped"] += 1
+            return
+        width, height = self.frame_size
+        self.frames.append(self.executor.submit(self._encode, data, width, height))
+
+    def _encode(self, data, width, height):
+        try:
+            start = time.perf_counter()
+            # cv2 expects BGR, so swap channels to keep the stored image correct
+            frame = cv2.cvtColor(np.frombuffer(data, np.uint8).reshape(height, width, 3),
+                                 cv2.COLOR_RGB2BGR)
+            ok, encoded = cv2.imencode(self.extension, frame, self.params)
+            if not ok:
+                raise ValueError(f"{self.codec} encode failed")
+            with self.stats_lock:
+                self.stats["frames_encoded"] += 1
+                self.stats["raw_bytes"] += len(data)
+                self.stats["encoded_bytes"] += encoded.nbytes
+                self.stats["encode_time"] += time.perf_counter() - start
+            return encoded
+        finally:
+            self.pending.release()
+
+    def __iter__(self):
+        """Yield frames decoded back to raw RGB bytes."""
+        for future in list(self.frames):
+            frame = cv2.imdecode(future.result(), cv2.IMREAD_COLOR)
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).tobytes()
+
+    def clear(self):
+        self.frames.clear()
+
+    def get_statistics(self):
+        """Report stored bytes per second of buffer and compression throughput."""
+        with self.stats_lock:
+            stats = dict(self.stats)
+        encoded = [future.result().nbytes for future in list(self.frames) if future.done()]
+        per_worker = stats["encode_time"] / self.workers
+        stats.update({
+            "bytes_per_second": sum(encoded) / len(encoded) * 30 if encoded else 0,  # 30 fps
+            "compression_ratio": stats["raw_bytes"] / stats["encoded_bytes"] if stats["encoded_bytes"] else 0,
+            "encode_fps": stats["frames_encoded"] / per_worker if per_worker else 0,
+            "encode_mb_per_second": stats["raw_bytes"] / per_worker / (1024 * 1024) if per_worker else 0
+        })
+        return stats
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
 class Clipper:
     DEFAULT_MODEL_NAME = "vosk-model-small-en-us-0.15"
     MODEL_URL = f"https://alphacephei.com/vosk/models/{DEFAULT_MODEL_NAME}.zip"
     
-    def __init__(self, buffer_duration=30, output_folder="clips", format="mp4", model_path=None):
+    def __init__(self, buffer_duration=30, output_folder="clips", format="mp4", model_path=None,
+                 buffer_codec="raw"):
         self.buffer_duration = buffer_duration
+        self.buffer_codec = buffer_codec
         self.output_folder = os.path.expanduser(output_folder)
         self.format = format.lower()
         self.is_listening = False
@@ -116,12 +206,21 @@ class Clipper:
         """Set the file format for clips (mp4, mov, mkv, etc.)."""
         self.format = format.lower()
     
+    def create_frame_buffer(self, maxlen, frame_size=(1920, 1080)):
+        """Create a frame buffer for the configured codec ("raw", "jpeg" or "png")."""
+        if self.buffer_codec in BUFFER_CODECS:
+            return CompressedFrameBuffer(maxlen, self.buffer_codec, frame_size)
+        return deque(maxlen=maxlen)
+
     def set_buffer_duration(self, duration):
         """Set the buffer duration in seconds"""
         self.buffer_duration = duration
         # Update buffer sizes
         if hasattr(self, 'frame_buffer'):
-            self.frame_buffer = deque(maxlen=duration * 30)  # 30 fps
+            frame_size = getattr(self.frame_buffer, 'frame_size', (1920, 1080))
+            if hasattr(self.frame_buffer, 'close'):
+                self.frame_buffer.close()
+            self.frame_buffer = self.create_frame_buffer(duration * 30, frame_size)  # 30 fps
         if hasattr(self, 'audio_buffer'):
             self.audio_buffer = deque(maxlen=duration * 44100 * 2)  # 44.1kHz stereo
 
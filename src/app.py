@@ -9,6 +9,7 @@ import ttkbootstrap as ttkbs
 import logging
 from typing import Optional
 import threading
+import time
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
@@ -38,6 +39,8 @@ class VoiceClips:
     """Main application class."""
     
     def __init__(self):
+        self.started_at = time.perf_counter()
+        self.startup_stats = {}
         self.logger = None
         self.setup_logging()
         self.logger.info(f"Starting {APP_NAME} v{APP_VERSION}")
@@ -113,6 +116,7 @@ class VoiceClips:
             self.audio_mixer = AudioMixer(self.config)
             self.effects_manager = EffectsManager()
             self.recording_manager = RecordingManager(self.config)
+            self.performance_monitor.attach_recorder(self.recording_manager)
             
             # Recording features
             self.recording_scheduler = RecordingScheduler(
@@ -124,13 +128,40 @@ class VoiceClips:
             self.clipper = Clipper(
                 buffer_duration=self.config.get("clipping.duration", DEFAULT_CLIP_DURATION),
                 output_folder=self.config.get("clipping.save_path", DEFAULT_CLIPS_FOLDER),
-                format=self.config.get("clipping.format", DEFAULT_CLIP_FORMAT)
+                format=self.config.get("clipping.format", DEFAULT_CLIP_FORMAT),
+                replay_mode=self.config.get("clipping.replay_mode", DEFAULT_REPLAY_MODE),
+                buffer_codec=self.config.get("clipping.buffer_codec", DEFAULT_REPLAY_BUFFER_CODEC),
+                post_roll=self.config.get("clipping.post_roll", DEFAULT_CLIP_POST_ROLL),
+                command_grammar=self.config.get("clipping.command_grammar", VOICE_COMMAND_GRAMMAR),
+                voice_process=self.config.get("clipping.voice_process", VOICE_RECOGNITION_PROCESS)
             )
+            # Voice commands share the recorder's microphone capture
+            self.clipper.set_audio_manager(self.recording_manager.audio_manager)
+
+            # Recording control by voice, run on the UI thread like the buttons
+            for action in ("start", "stop", "pause", "resume"):
+                self.clipper.set_command_handler(
+                    action, lambda action=action: self.root.after(0, self._run_voice_command, action)
+                )
 
         except Exception as e:
             self.logger.error(f"Failed to initialize managers: {e}")
             messagebox.showerror("Error", f"Failed to initialize application: {e}")
             sys.exit(1)
+
+    def _run_voice_command(self, action: str):
+        """Apply a recording voice command through the main window's controls."""
+        window = self.main_window
+        state = window.recording_manager.state
+        if action == "start" and not state.is_recording:
+            window.start_recording()
+        elif action == "stop" and state.is_recording:
+            window.stop_recording()
+        elif action == "pause" and state.is_recording and not state.is_paused:
+            window.toggle_pause()
+        elif action == "resume" and state.is_paused:
+            window.toggle_pause()
+
     def initialize_recording(self):
         """Initialize recording components."""
         try:
@@ -247,7 +278,8 @@ class VoiceClips:
             self.clipper.update_settings({
                 "duration": self.config.get("clipping.duration", DEFAULT_CLIP_DURATION),
                 "format": self.config.get("clipping.format", DEFAULT_CLIP_FORMAT),
-                "save_path": self.config.get("clipping.save_path", DEFAULT_CLIPS_FOLDER)
+                "save_path": self.config.get("clipping.save_path", DEFAULT_CLIPS_FOLDER),
+                "post_roll": self.config.get("clipping.post_roll", DEFAULT_CLIP_POST_ROLL)
             })
 
             # Update performance settings
@@ -266,12 +298,26 @@ class VoiceClips:
     def run(self):
         """Start the application."""
         try:
+            self.root.after_idle(self._record_window_ready)
             self.root.mainloop()
         except Exception as e:
             self.logger.error(f"Error running application: {e}")
         finally:
             self.cleanup()
 
+    def _record_window_ready(self):
+        """Log cold start time to the first usable window."""
+        self.startup_stats["window_ready"] = time.perf_counter() - self.started_at
+        self.logger.info(f"Main window ready in {self.startup_stats['window_ready']:.2f}s")
+
+        # Voice clipping becomes available later, once the model has loaded
+        def record_voice_ready():
+            if self.clipper.voice_ready.wait():
+                self.startup_stats["voice_ready"] = time.perf_counter() - self.started_at
+                self.logger.info(f"Voice clipping ready in {self.startup_stats['voice_ready']:.2f}s")
+
+        threading.Thread(target=record_voice_ready, daemon=True).start()
+
     def cleanup(self):
         """Clean up resources."""
         try:
@@ -6,14 +6,14 @@ from pathlib import Path
 import time
 import threading
 import subprocess
+import queue
 import vosk
-import pyaudio
 import wave
 import logging
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Callable, Any
 from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from rapidfuzz import fuzz
 import numpy as np
 from pynput import keyboard
 from plyer import notification
@@ -25,27 +25,59 @@ from src.constants import *
 from src.utils.audio_manager import AudioManager
 from src.utils.video_manager import VideoManager
 from src.utils.error_handler import ErrorHandler
+from src.utils.replay_buffer import (
+    FrameRingBuffer, CompressedFrameRingBuffer, MappedFrameRingBuffer, AudioRingBuffer,
+    SegmentReplayBuffer, RingSnapshot
+)
+from src.utils.encoder_sink import EncoderSink, CHANNEL_PIX_FMTS, pix_fmt_for_frame
+from src.features.voice_commands import VoiceCommandListener, CommandMatch
+from src.features.voice_model import load_model
+from src.features.voice_worker import VoiceWorker
+
+@dataclass
+class ClipJob:
+    """A clip request frozen at trigger time."""
+    requested_at: float
+    start_time: float
+    end_time: float
+    frames: Optional[RingSnapshot] = None
+    audio: Optional[RingSnapshot] = None
+    # Post-roll: the window is only snapshotted once capture reaches end_time
+    pending: bool = False
+    deadline: float = 0.0  # Wall-clock limit for the post-roll wait
+    merged: int = 0  # Further clip commands folded into this window
 
 class Clipper:
     """Manages video clipping functionality."""
     
     def __init__(self, buffer_duration: int = DEFAULT_CLIP_DURATION,
                  output_folder: str = DEFAULT_CLIPS_FOLDER,
-                 format: str = DEFAULT_CLIP_FORMAT):
+                 format: str = DEFAULT_CLIP_FORMAT,
+                 replay_mode: str = DEFAULT_REPLAY_MODE,
+                 buffer_codec: str = DEFAULT_REPLAY_BUFFER_CODEC,
+                 post_roll: float = DEFAULT_CLIP_POST_ROLL,
+                 command_grammar: bool = VOICE_COMMAND_GRAMMAR,
+                 voice_process: bool = VOICE_RECOGNITION_PROCESS):
         
         self.logger = logging.getLogger(__name__)
         self.error_handler = ErrorHandler(DEFAULT_LOGS_PATH)
         
-        self.setup_clipper(buffer_duration, output_folder, format)
+        self.post_roll = max(0, post_roll)
+        self.command_grammar = command_grammar
+        self.voice_process = voice_process
+        self.setup_clipper(buffer_duration, output_folder, format, replay_mode, buffer_codec)
         self.initialize_voice_recognition()
         self.setup_hotkey()
         
-        # Initialize managers
-        self.audio_manager = AudioManager()
+        # Initialize managers; the microphone comes from set_audio_manager
+        self.audio_manager: Optional[AudioManager] = None
         self.video_manager = VideoManager()
         
         # Statistics
         self.clips_created = 0
+        self.clips_dropped = 0
+        self.clips_merged = 0
+        self.frames_lost = 0
         self.last_clip_time = 0
         self.clip_durations = []
         
@@ -54,27 +86,46 @@ class Clipper:
         self.last_frame_timestamp = 0
         self.frame_interval = 1.0 / DEFAULT_FPS
 
-    def setup_clipper(self, buffer_duration: int, output_folder: str, format: str):
+        # Post-roll: the clip waiting for capture to reach its end time
+        self.pending_job: Optional[ClipJob] = None
+        self.post_roll_until: Optional[float] = None
+        self.post_roll_reached = threading.Event()
+
+        # Background save worker
+        self.start_save_worker()
+
+    def setup_clipper(self, buffer_duration: int, output_folder: str, format: str,
+                      replay_mode: str = DEFAULT_REPLAY_MODE,
+                      buffer_codec: str = DEFAULT_REPLAY_BUFFER_CODEC):
         """Initialize clipper settings and buffers."""
         try:
             self.buffer_duration = buffer_duration
             self.output_folder = Path(output_folder)
             self.format = format.lower()
+            self.replay_mode = replay_mode if replay_mode in REPLAY_MODES else DEFAULT_REPLAY_MODE
+            self.buffer_codec = (
+                buffer_codec if buffer_codec in REPLAY_BUFFER_CODECS else DEFAULT_REPLAY_BUFFER_CODEC
+            )
+            self.segment_buffer: Optional[SegmentReplayBuffer] = None
             self.is_listening = False
             self.clip_counter = 0
             self.lock = threading.Lock()
 
             # Create frame and audio buffers
-            buffer_size = int(buffer_duration * DEFAULT_FPS)
-            self.frame_buffer = deque(maxlen=buffer_size)
-            self.audio_buffer = deque(maxlen=int(buffer_duration * AUDIO_SAMPLE_RATE * AUDIO_CHANNELS))
+            self.frame_buffer = self._create_frame_buffer(int(self.window_duration * DEFAULT_FPS))
+            self.audio_buffer = AudioRingBuffer(self.window_duration, reserve=CLIP_SNAPSHOT_RESERVE)
 
             # Ensure output directory exists
             self.output_folder.mkdir(parents=True, exist_ok=True)
             
+            # Pre-encoded segment ring; the encoder starts with the first frame
+            if self.replay_mode == "segments":
+                self.segment_buffer = SegmentReplayBuffer(duration=self.window_duration)
+
             self.logger.info(
                 f"Clipper initialized: duration={buffer_duration}s, "
-                f"format={format}, output={output_folder}"
+                f"format={format}, output={output_folder}, mode={self.replay_mode}, "
+                f"buffer_codec={self.buffer_codec}"
             )
 
         except Exception as e:
@@ -85,25 +136,83 @@ class Clipper:
         """Setup voice recognition system."""
         try:
             model_path = self.find_vosk_model()
-            self.model = vosk.Model(model_path)
-            self.audio_stream = pyaudio.PyAudio()
-            
-            # Configure recognition settings
-            self.recognizer = vosk.KaldiRecognizer(self.model, 16000)
-            self.recent_commands = deque(maxlen=5)
+            self.model = None
+            self.listener: Optional[VoiceCommandListener] = None
+            self.voice_worker: Optional[VoiceWorker] = None
+            self.model_future = None
+            self.voice_ready = threading.Event()
+            self.voice_init_started = time.perf_counter()
+            self.voice_ready_time: Optional[float] = None
             
-            self.logger.info("Voice recognition initialized successfully")
+            self.command_handlers: Dict[str, Callable[[], Any]] = {}
+            self.trigger_latencies = deque(maxlen=50)
+
+            if self.voice_process:
+                # The worker loads its own model and decodes off this process
+                self.voice_worker = VoiceWorker(
+                    model_path,
+                    self._dispatch_command,
+                    on_ready=self._on_worker_ready,
+                    command_grammar=self.command_grammar,
+                    voice_gate=VOICE_ACTIVITY_GATE
+                )
+                self.voice_worker.start()
+                return
+
+            # The model loads in the background (or comes from the process
+            # cache); voice clipping is enabled once it is ready
+            self.model_future = load_model(model_path)
+            self.model_future.add_done_callback(self._on_model_loaded)
             
         except Exception as e:
             self.error_handler.handle_error(e, context="Voice recognition setup")
             raise
 
+    def _on_model_loaded(self, future):
+        """Create the recognizer once the Vosk model is available."""
+        try:
+            self.model = future.result()
+            # Gate, recognizer and matcher; see VoiceCommandListener
+            self.listener = VoiceCommandListener(
+                self.model,
+                self._dispatch_command,
+                command_grammar=self.command_grammar,
+                voice_gate=VOICE_ACTIVITY_GATE
+            )
+            self.voice_ready_time = time.perf_counter() - self.voice_init_started
+            self.voice_ready.set()
+            
+            self.logger.info(
+                f"Voice recognition initialized successfully in {self.voice_ready_time:.2f}s "
+                f"({'command grammar' if self.command_grammar else 'open vocabulary'})"
+            )
+            
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Loading voice model")
+
+    def _on_worker_ready(self, load_time: float):
+        """Enable voice clipping once the worker process has its model."""
+        if self.voice_ready.is_set():
+            return  # A restarted worker
+        self.voice_ready_time = time.perf_counter() - self.voice_init_started
+        self.voice_ready.set()
+        self.logger.info(
+            f"Voice recognition worker initialized in {self.voice_ready_time:.2f}s "
+            f"({'command grammar' if self.command_grammar else 'open vocabulary'})"
+        )
+
     def find_vosk_model(self) -> str:
         """Locate Vosk model directory."""
+        # Grammars need a model with a runtime graph; large models ignore them
+        model_names = [VOSK_MODEL_NAME]
+        if self.command_grammar:
+            model_names.insert(0, VOSK_GRAMMAR_MODEL_NAME)
+
         model_paths = [
-            Path.home() / "vosk-model-en-us-0.22",
-            Path.home() / "Downloads" / "vosk-model-en-us-0.22",
-            Path(__file__).parent.parent / "models" / "vosk-model-en-us-0.22"
+            base / name
+            for name in model_names
+            for base in (Path.home(), Path.home() / "Downloads",
+                         Path(__file__).parent.parent / "models")
         ]
         
         for path in model_paths:
@@ -118,16 +227,41 @@ class Clipper:
         self.audio_mixer = audio_mixer
         self._initialize_buffers()
 
+    def set_audio_manager(self, audio_manager: AudioManager):
+        """Listen for commands on another manager's microphone capture."""
+        was_listening = self.is_listening
+        if was_listening:
+            self.stop_listening()
+        self.audio_manager = audio_manager
+        if was_listening:
+            self.start_listening()
+
+    @property
+    def window_duration(self) -> float:
+        """Seconds the buffers must hold: the replay window plus post-roll."""
+        return self.buffer_duration + self.post_roll
+
+    def _create_frame_buffer(self, size: int) -> FrameRingBuffer:
+        """Create the replay frame ring for the configured buffer codec."""
+        reserve = CLIP_SNAPSHOT_RESERVE * DEFAULT_FPS
+        if self.buffer_codec == "raw":
+            return FrameRingBuffer(size, reserve=reserve)
+        if self.buffer_codec == "mmap":
+            return MappedFrameRingBuffer(size, reserve=reserve)
+        return CompressedFrameRingBuffer(size, reserve=reserve, codec=self.buffer_codec)
+
     def _initialize_buffers(self):
         """Initialize capture buffers."""
         try:
             # Calculate buffer sizes
-            video_buffer_size = int(self.buffer_duration * DEFAULT_FPS)
-            audio_buffer_size = int(self.buffer_duration * AUDIO_SAMPLE_RATE)
+            video_buffer_size = int(self.window_duration * DEFAULT_FPS)
             
             # Create buffers
-            self.frame_buffer = deque(maxlen=video_buffer_size)
-            self.audio_buffer = deque(maxlen=audio_buffer_size)
+            self.frame_buffer.close()
+            self.frame_buffer = self._create_frame_buffer(video_buffer_size)
+            self.audio_buffer = AudioRingBuffer(
+                self.window_duration, reserve=CLIP_SNAPSHOT_RESERVE
+            )
             
         except Exception as e:
             self.error_handler.handle_error(e, context="Initializing buffers")
@@ -138,7 +272,7 @@ class Clipper:
             hotkey_str = DEFAULT_CLIP_HOTKEY.replace('Ctrl', '<ctrl>')
             
             self.hotkey = keyboard.GlobalHotKeys({
-                hotkey_str: self._handle_clip_command
+                hotkey_str: lambda: self._handle_clip_command(self.buffer_duration)
             })
             self.hotkey.start()
             self.logger.info(f"Hotkey {DEFAULT_CLIP_HOTKEY} registered successfully")
@@ -167,26 +301,35 @@ class Clipper:
 
     def _listen_loop(self):
         """Main voice detection loop."""
+        tap = None
         try:
-            stream = self.audio_stream.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=16000,
-                input=True,
-                frames_per_buffer=4096
-            )
+            # Hotkey clips work meanwhile; voice waits for the model
+            while self.is_listening and not self.voice_ready.wait(timeout=0.5):
+                if self.voice_worker and self.voice_worker.failed:
+                    return
+                if self.model_future and self.model_future.done() and self.model_future.exception():
+                    return
+            if not self.is_listening:
+                return
+
+            if self.audio_manager is None:
+                self.logger.warning("No audio manager set; voice commands are unavailable")
+                return
+
+            # Shares the AudioManager's input stream, resampled to 16 kHz mono
+            tap = self.audio_manager.add_tap()
+            if tap is None:
+                return
             
             while self.is_listening:
                 try:
-                    data = stream.read(4096, exception_on_overflow=False)
-                    if self.recognizer.AcceptWaveform(data):
-                        result = eval(self.recognizer.Result())
-                        text = result.get("text", "").lower()
-                        
-                        if text:
-                            self.logger.debug(f"Recognized: {text}")
-                            if self._should_create_clip(text):
-                                self._handle_clip_command()
+                    data = tap.read(timeout=0.5)
+                    if data is None:
+                        continue
+                    if self.voice_worker:
+                        self.voice_worker.write(data)
+                    else:
+                        self.listener.process(data)
                                 
                 except Exception as e:
                     self.error_handler.handle_error(e, context="Audio processing")
@@ -194,40 +337,48 @@ class Clipper:
         except Exception as e:
             self.error_handler.handle_error(e, context="Voice recognition loop")
         finally:
-            stream.stop_stream()
-            stream.close()
-    def _should_create_clip(self, text: str) -> bool:
-        """Determine if a clip should be created based on voice input."""
-        # Prevent rapid clips
-        if time.time() - self.last_clip_time < 2.0:
-            return False
-            
-        # Check recent commands to prevent duplicates
-        if text in self.recent_commands:
-            return False
-            
-        # Check for clip commands
-        for command in VOICE_COMMANDS["clip"]:
-            if command in text:
-                return True
-            
-            # Fuzzy matching for similar commands
-            words = text.split()
-            if any(fuzz.ratio(command, word) > VOICE_COMMAND_SIMILARITY_THRESHOLD 
-                   for word in words):
-                return True
-                
-        return False
+            if tap:
+                self.audio_manager.remove_tap(tap)
 
-    def _handle_clip_command(self):
+    def set_command_handler(self, action: str, handler: Callable[[], Any]):
+        """Run ``handler`` when a non-clip voice command (start, stop, ...) is heard."""
+        self.command_handlers[action] = handler
+
+    def _dispatch_command(self, match: CommandMatch, heard_at: Optional[float] = None):
+        """Run the action for a recognized voice command."""
+        if match.action == "clip":
+            # "clip forty five" clips the last 45 seconds
+            self._handle_clip_command(match.argument, heard_at)
+            return
+
+        handler = self.command_handlers.get(match.action)
+        if handler is None:
+            self.logger.debug(f"No handler for voice command '{match.action}'")
+            return
+
+        self.logger.info(f"Voice command: {match.action} ('{match.phrase}')")
+        try:
+            handler()
+        except Exception as e:
+            self.error_handler.handle_error(e, context=f"Voice command {match.action}")
+
+    def _handle_clip_command(self, seconds: Optional[float] = None,
+                             heard_at: Optional[float] = None):
         """Handle clip creation command."""
-        self.logger.info("Clip command detected")
-        threading.Thread(target=self.save_clip).start()
-        self.recent_commands.append("clip")
+        self.logger.info(f"Clip command detected ({seconds or self.buffer_duration}s)")
+        self.request_clip(seconds)
         self.last_clip_time = time.time()
 
+        # Voice commands: time from the end of speech to the job being queued
+        if heard_at is not None:
+            self.trigger_latencies.append(self.last_clip_time - heard_at)
+
     def add_frame(self, frame: np.ndarray, timestamp: float):
         """Add a frame to the buffer with timestamp."""
+        if self.segment_buffer:
+            self._add_segment_frame(frame, timestamp)
+            return
+
         with self.sync_lock:
             try:
                 # Ensure frame timing is consistent
@@ -236,48 +387,201 @@ class Clipper:
                     if abs(timestamp - expected_time) > self.frame_interval * 0.5:
                         self.logger.warning("Frame timing inconsistency detected")
                 
-                self.frame_buffer.append({
-                    'data': frame.copy(),
-                    'timestamp': timestamp
-                })
+                # Copied in place into a preallocated slot
+                self.frame_buffer.append(frame, timestamp)
                 self.last_frame_timestamp = timestamp
+                self._check_post_roll(timestamp)
                 
             except Exception as e:
                 self.error_handler.handle_error(e, context="Adding frame to buffer")
 
+    def _add_segment_frame(self, frame: np.ndarray, timestamp: float):
+        """Hand a frame to the segment encoder, starting it on first use."""
+        try:
+            if not self.segment_buffer.is_running:
+                height, width = frame.shape[:2]
+                if not self.segment_buffer.start(width, height, pix_fmt_for_frame(frame)):
+                    return
+
+            self.segment_buffer.add_frame(frame, timestamp)
+            self.last_frame_timestamp = timestamp
+            self._check_post_roll(timestamp)
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Adding frame to segment buffer")
+
+    def _check_post_roll(self, timestamp: float):
+        """Wake the save worker once capture passes a pending clip's end."""
+        if self.post_roll_until is not None and timestamp >= self.post_roll_until:
+            self.post_roll_reached.set()
+
     def add_audio(self, audio_data: bytes, timestamp: float):
         """Add audio data to the buffer with timestamp."""
         with self.sync_lock:
             try:
-                self.audio_buffer.append({
-                    'data': audio_data,
-                    'timestamp': timestamp
-                })
+                # Interleaved PCM is copied in behind the ring's write cursor
+                self.audio_buffer.append(audio_data, timestamp)
             except Exception as e:
                 self.error_handler.handle_error(e, context="Adding audio to buffer")
 
-    def save_clip(self) -> bool:
-        """Save the buffered content as a clip."""
-        with self.lock:
-            if not self.frame_buffer:
-                self.logger.warning("No frames to save")
+    def start_save_worker(self):
+        """Start the background worker that drains clip save jobs."""
+        self.save_queue = queue.Queue(maxsize=CLIP_SAVE_QUEUE_SIZE)
+        self.save_thread = threading.Thread(
+            target=self._save_worker,
+            daemon=True
+        )
+        self.save_thread.start()
+
+    def _save_worker(self):
+        """Save queued clip jobs one at a time."""
+        while True:
+            job = self.save_queue.get()
+            if job is None:
+                break
+
+            try:
+                if job.pending:
+                    job = self._await_post_roll(job)
+                    if job.frames is not None and not len(job.frames):
+                        self.logger.warning("No frames to save")
+                        continue
+                self._save_job(job)
+            except Exception as e:
+                self.error_handler.handle_error(e, context="Clip save worker")
+
+    def _snapshot_job(self, seconds: Optional[float] = None,
+                      end: Optional[float] = None) -> ClipJob:
+        """Freeze the last ``seconds`` up to ``end`` without copying frames."""
+        with self.sync_lock:
+            end_time = end if end is not None else self.last_frame_timestamp
+            seconds = min(seconds or self.buffer_duration, self.window_duration)
+            start_time = end_time - seconds
+
+            job = ClipJob(
+                requested_at=time.time(),
+                start_time=start_time,
+                end_time=end_time
+            )
+
+            # Both buffers are in capture order, so the window is located by
+            # binary search on timestamps. Audio is cut to exactly the span
+            # of the selected frames.
+            if not self.segment_buffer:
+                job.frames = self.frame_buffer.find_range(start_time, end_time)
+                if len(job.frames):
+                    start_time = self.frame_buffer.timestamp_at(job.frames.start)
+                    end_time = self.frame_buffer.timestamp_at(job.frames.end - 1) + self.frame_interval
+            job.audio = self.audio_buffer.find_range(start_time, end_time)
+        return job
+
+    def _await_post_roll(self, job: ClipJob) -> ClipJob:
+        """Wait until capture reaches a pending clip's end, then snapshot it."""
+        while True:
+            with self.sync_lock:
+                if self.last_frame_timestamp >= job.end_time or time.time() >= job.deadline:
+                    # Later clip commands start a new window from here on
+                    if self.pending_job is job:
+                        self.pending_job = None
+                    self.post_roll_until = None
+                    start_time, end_time = job.start_time, job.end_time
+                    break
+                self.post_roll_until = job.end_time
+                self.post_roll_reached.clear()
+
+            self.post_roll_reached.wait(timeout=max(0.0, job.deadline - time.time()))
+
+        if job.merged:
+            self.logger.info(f"Saving merged clip window ({job.merged + 1} commands)")
+        return self._snapshot_job(end_time - start_time, min(end_time, self.last_frame_timestamp))
+
+    def _request_post_roll_clip(self, seconds: Optional[float] = None) -> bool:
+        """Queue a clip that keeps recording for the post-roll before saving.
+
+        Commands arriving while a window is still waiting extend that window
+        instead of queueing another, nearly identical encode.
+        """
+        with self.sync_lock:
+            now = self.last_frame_timestamp
+            start_time = now - min(seconds or self.buffer_duration, self.buffer_duration)
+            end_time = now + self.post_roll
+
+            job = self.pending_job
+            if job is not None:
+                job.start_time = max(min(job.start_time, start_time),
+                                     end_time - self.window_duration)
+                job.end_time = end_time
+                job.deadline = time.time() + self.post_roll + CLIP_POST_ROLL_GRACE
+                job.merged += 1
+                self.clips_merged += 1
+                self.post_roll_until = None  # Re-armed by the worker for the new end
+                self.post_roll_reached.set()
+                return True
+
+            job = ClipJob(
+                requested_at=time.time(),
+                start_time=start_time,
+                end_time=end_time,
+                pending=True,
+                deadline=time.time() + self.post_roll + CLIP_POST_ROLL_GRACE
+            )
+            try:
+                self.save_queue.put_nowait(job)
+            except queue.Full:
+                self.clips_dropped += 1
+                self.logger.warning("Clip save queue is full, dropping clip request")
                 return False
 
+            self.pending_job = job
+            return True
+
+    def request_clip(self, seconds: Optional[float] = None,
+                     end: Optional[float] = None) -> bool:
+        """Queue a clip of the last ``seconds`` for the background saver."""
+        if self.post_roll and end is None:
+            return self._request_post_roll_clip(seconds)
+
+        job = self._snapshot_job(seconds, end)
+        if job.frames is not None and not len(job.frames):
+            self.logger.warning("No frames to save")
+            return False
+
+        try:
+            self.save_queue.put_nowait(job)
+            return True
+        except queue.Full:
+            self.clips_dropped += 1
+            self.logger.warning("Clip save queue is full, dropping clip request")
+            return False
+
+    def save_clip(self, seconds: Optional[float] = None,
+                  end: Optional[float] = None) -> bool:
+        """Save the last ``seconds`` (default: the whole buffer) ending at ``end``."""
+        job = self._snapshot_job(seconds, end)
+        if job.frames is not None and not len(job.frames):
+            self.logger.warning("No frames to save")
+            return False
+
+        return self._save_job(job)
+
+    def _save_job(self, job: ClipJob) -> bool:
+        """Encode or export a frozen clip job."""
+        with self.lock:
             try:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 self.clip_counter += 1
                 
                 output_path = self.output_folder / f"clip_{timestamp}_{self.clip_counter}.{self.format}"
                 self.logger.info(f"Saving clip to: {output_path}")
-                
-                # Create temporary files
-                temp_video = self._save_temp_video(timestamp)
-                temp_audio = self._save_temp_audio(timestamp)
-                
-                # Combine video and audio
-                if self._combine_video_audio(temp_video, temp_audio, output_path):
+
+                if job.frames is None:
+                    clip_duration = self._save_segment_clip(job, output_path, timestamp)
+                else:
+                    # Pipe the snapshot and audio straight into the encoder
+                    clip_duration = self._encode_snapshot(job, output_path)
+
+                if clip_duration is not None:
                     self.clips_created += 1
-                    clip_duration = len(self.frame_buffer) / DEFAULT_FPS
                     self.clip_durations.append(clip_duration)
                     self.show_notification(SUCCESS_MESSAGES["clip_created"])
                     return True
@@ -287,94 +591,164 @@ class Clipper:
             except Exception as e:
                 self.error_handler.handle_error(e, context="Saving clip")
                 return False
-            finally:
-                self._cleanup_temp_files(temp_video, temp_audio)
 
-    def _save_temp_video(self, timestamp: str) -> Path:
-        """Save temporary video file."""
-        temp_video = self.output_folder / f"temp_video_{timestamp}.raw"
+    def _save_segment_clip(self, job: ClipJob, output_path: Path,
+                           timestamp: str) -> Optional[float]:
+        """Save a clip by stream copying the pre-encoded replay segments."""
+        temp_audio = None
+        # Leased so capture cannot delete them while FFmpeg reads them
+        segments = self.segment_buffer.lease_segments(job.start_time, job.end_time)
         try:
+            if not segments:
+                self.logger.warning("No finished replay segments to save")
+                return None
+
+            # The clip is made of whole segments, so the audio is cut to their
+            # span rather than to the requested window
             with self.sync_lock:
-                with open(temp_video, 'wb') as f:
-                    for frame_data in self.frame_buffer:
-                        f.write(frame_data['data'].tobytes())
-            return temp_video
+                audio = self.audio_buffer.find_range(
+                    segments[0].start_time, segments[-1].end_time + self.frame_interval
+                )
+                audio_start = self.audio_buffer.time_at(audio.start)
+            temp_audio = self._save_temp_audio(timestamp, audio)
+
+            if not self.segment_buffer.export_clip(output_path, temp_audio,
+                                                   job.start_time, job.end_time,
+                                                   audio_start=audio_start,
+                                                   segments=segments):
+                return None
+
+            return segments[-1].end_time - segments[0].start_time
+
         except Exception as e:
-            self.error_handler.handle_error(e, context="Saving temporary video")
-            raise
+            self.error_handler.handle_error(e, context="Saving segment clip")
+            return None
+        finally:
+            self.segment_buffer.release_segments(segments)
+            self._cleanup_temp_files(temp_audio)
 
-    def _save_temp_audio(self, timestamp: str) -> Path:
+    def _save_temp_audio(self, timestamp: str, audio: RingSnapshot) -> Path:
         """Save temporary audio file."""
         temp_audio = self.output_folder / f"temp_audio_{timestamp}.wav"
         try:
-            with self.sync_lock:
-                if self.audio_buffer:
-                    with wave.open(str(temp_audio), 'wb') as wf:
-                        wf.setnchannels(AUDIO_CHANNELS)
-                        wf.setsampwidth(2)  # 16-bit audio
-                        wf.setframerate(AUDIO_SAMPLE_RATE)
-                        audio_data = b''.join([data['data'] for data in self.audio_buffer])
-                        wf.writeframes(audio_data)
+            if len(audio):
+                with wave.open(str(temp_audio), 'wb') as wf:
+                    wf.setnchannels(AUDIO_CHANNELS)
+                    wf.setsampwidth(2)  # 16-bit audio
+                    wf.setframerate(AUDIO_SAMPLE_RATE)
+                    for view in self.audio_buffer.get_views(audio.start, audio.end):
+                        wf.writeframes(view)
             return temp_audio
         except Exception as e:
             self.error_handler.handle_error(e, context="Saving temporary audio")
             raise
 
-    def _combine_video_audio(self, temp_video: Path, temp_audio: Path, 
-                           output_path: Path) -> bool:
-        """Combine video and audio into final clip."""
+    def _encode_snapshot(self, job: ClipJob, output_path: Path) -> Optional[float]:
+        """Encode a frozen frame window and its audio through an FFmpeg pipe."""
+        sink = None
         try:
-            command = self._create_ffmpeg_command(temp_video, temp_audio, output_path)
-            
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                check=True
+            ring = self.frame_buffer
+            height, width = ring.frame_shape[:2]
+            channels = ring.frame_shape[2] if len(ring.frame_shape) == 3 else 1
+            audio_ring = self.audio_buffer
+            has_audio = len(job.audio) > 0
+
+            sink = EncoderSink(
+                output_path, width, height,
+                output_args=self._get_encoding_args(has_audio),
+                pix_fmt=CHANNEL_PIX_FMTS[channels],  # Capture layout, BGR or BGRA
+                audio=has_audio
             )
-            
-            if result.returncode == 0:
+            if not sink.start():
+                return None
+
+            # Capture keeps writing into fresh slots while the snapshot is
+            # drained oldest first, at whatever pace FFmpeg reads. Frames are
+            # queued by sequence number and only fetched from the ring by the
+            # pipe writer right before they are written.
+            # Audio is interleaved by timestamp so neither pipe starves FFmpeg.
+            audio_position = job.audio.start
+            frames_lost = 0
+
+            for sequence in range(job.frames.start, job.frames.end):
+                if not ring.is_resident(sequence, 1, job.frames.generation):
+                    frames_lost += 1
+                    continue
+
+                if has_audio:
+                    target = min(audio_ring.sample_at(ring.timestamp_at(sequence)), job.audio.end)
+                    self._write_audio_range(sink, job, audio_position, target)
+                    audio_position = max(audio_position, target)
+
+                resolve = lambda sequence=sequence: self._resolve_snapshot_frame(
+                    ring, sequence, job.frames.generation)
+                if not sink.write_frame(None, timeout=5.0, resolve=resolve):
+                    raise Exception(f"Encoder stalled: {sink.error}")
+
+            if has_audio:
+                self._write_audio_range(sink, job, audio_position, job.audio.end)
+
+            closed = sink.close()
+            frames_lost += sink.stats['frames_stale']
+            if frames_lost:
+                self.frames_lost += frames_lost
+                self.logger.warning(
+                    f"{frames_lost} snapshot frames were overwritten before they were saved"
+                )
+
+            if closed:
                 self.logger.info(f"Clip saved successfully: {output_path}")
-                return True
-            else:
-                raise Exception(f"FFmpeg error: {result.stderr}")
+                return sink.stats['frames_written'] / DEFAULT_FPS
+
+            raise Exception(f"FFmpeg error: {sink.error}")
                 
         except Exception as e:
-            self.error_handler.handle_error(e, context="Combining video and audio")
-            return False
+            self.error_handler.handle_error(e, context="Encoding clip")
+            if sink:
+                sink.abort()
+            return None
 
-    def _create_ffmpeg_command(self, temp_video: Path, temp_audio: Path, 
-                             output_path: Path) -> List[str]:
-        """Create FFmpeg command for combining video and audio."""
-        width, height = map(int, BASE_CANVAS_RESOLUTION.split('x'))
-        
-        command = [
-            'ffmpeg',
-            '-f', 'rawvideo',
-            '-vcodec', 'rawvideo',
-            '-s', f'{width}x{height}',
-            '-pix_fmt', 'rgb24',
-            '-framerate', str(DEFAULT_FPS),
-            '-i', str(temp_video)
-        ]
-        
-        if temp_audio.exists():
-            command.extend([
-                '-i', str(temp_audio),
+    @staticmethod
+    def _resolve_snapshot_frame(ring, sequence: int, generation: int) -> Optional[np.ndarray]:
+        """Frame data to pipe for a snapshot frame, or None once it is overwritten.
+
+        Called by the encoder's pipe writer. A frame well inside the ring is
+        written straight from its slot; one within CLIP_SNAPSHOT_COPY_MARGIN
+        frames of being overwritten could be torn during the pipe write, so
+        it is copied and kept only if capture had not reached it meanwhile.
+        """
+        if ring.is_resident(sequence, CLIP_SNAPSHOT_COPY_MARGIN, generation):
+            return ring.frame_at(sequence)
+        if not ring.is_resident(sequence, 1, generation):
+            return None
+        frame = ring.frame_at(sequence).copy()
+        # The slot being filled next still reads as resident, hence the margin of 1
+        return frame if ring.is_resident(sequence, 1, generation) else None
+
+    def _write_audio_range(self, sink: EncoderSink, job: ClipJob, start: int, end: int):
+        """Queue ring views of the snapshot audio in ``[start, end)``."""
+        if not self.audio_buffer.is_resident(start, job.audio.generation):
+            return
+        for view in self.audio_buffer.get_views(start, end):
+            sink.write_audio(view, timeout=5.0)
+
+    def _get_encoding_args(self, has_audio: bool) -> List[str]:
+        """Get FFmpeg output arguments for clip encoding."""
+        args = []
+        if has_audio:
+            args.extend([
                 '-c:a', 'aac',
                 '-b:a', '192k'
             ])
 
-        command.extend([
+        args.extend([
             '-c:v', 'h264',
             '-preset', DEFAULT_VIDEO_PRESET,
             '-crf', '23',
-            '-pix_fmt', 'yuv420p',
-            '-y',
-            str(output_path)
+            '-pix_fmt', 'yuv420p'
         ])
         
-        return command
+        return args
 
     def _cleanup_temp_files(self, *files: Path):
         """Clean up temporary files."""
@@ -400,19 +774,18 @@ class Clipper:
     def update_settings(self, settings: Dict):
         """Update clipper settings."""
         try:
-            if "duration" in settings:
-                self.buffer_duration = settings["duration"]
+            if "duration" in settings or "post_roll" in settings:
+                self.buffer_duration = settings.get("duration", self.buffer_duration)
+                self.post_roll = max(0, settings.get("post_roll", self.post_roll))
                 # Update buffer sizes
                 with self.sync_lock:
-                    self.frame_buffer = deque(
-                        self.frame_buffer, 
-                        maxlen=int(self.buffer_duration * DEFAULT_FPS)
-                    )
-                    self.audio_buffer = deque(
-                        self.audio_buffer,
-                        maxlen=int(self.buffer_duration * AUDIO_SAMPLE_RATE * AUDIO_CHANNELS)
-                    )
+                    self.frame_buffer.resize(int(self.window_duration * DEFAULT_FPS))
+                    self.audio_buffer.resize(self.window_duration)
                 
+                if self.segment_buffer:
+                    self.segment_buffer.stop()
+                    self.segment_buffer = SegmentReplayBuffer(duration=self.window_duration)
+
             if "format" in settings:
                 self.format = settings["format"].lower()
                 
@@ -428,7 +801,7 @@ class Clipper:
 
     def get_statistics(self) -> Dict:
         """Get clipper statistics."""
-        return {
+        stats = {
             "clips_created": self.clips_created,
             "average_duration": np.mean(self.clip_durations) if self.clip_durations else 0,
             "total_duration": sum(self.clip_durations) if self.clip_durations else 0,
@@ -436,17 +809,49 @@ class Clipper:
             "buffer_usage": {
                 "video": len(self.frame_buffer) / self.frame_buffer.maxlen if self.frame_buffer.maxlen else 0,
                 "audio": len(self.audio_buffer) / self.audio_buffer.maxlen if self.audio_buffer.maxlen else 0
-            }
+            },
+            "buffer_memory": self.frame_buffer.nbytes + self.audio_buffer.nbytes,
+            "clips_dropped": self.clips_dropped,
+            "clips_merged": self.clips_merged,
+            "frames_lost": self.frames_lost,
+            "pending_saves": self.save_queue.qsize()
         }
+        stats["frame_buffer"] = self.frame_buffer.get_statistics()
+        stats["voice_ready"] = self.voice_ready.is_set()
+        stats["voice_ready_time"] = self.voice_ready_time
+        listener_stats = {}
+        if getattr(self, 'voice_worker', None):
+            stats["voice_worker"] = self.voice_worker.get_statistics()
+            listener_stats = stats["voice_worker"]["worker"]
+        elif getattr(self, 'listener', None):
+            listener_stats = self.listener.get_statistics()
+        if listener_stats:
+            if "voice_activity" in listener_stats:
+                stats["voice_activity"] = listener_stats["voice_activity"]
+            stats["trigger_latency"] = {
+                "last": self.trigger_latencies[-1] if self.trigger_latencies else 0,
+                "average": np.mean(self.trigger_latencies) if self.trigger_latencies else 0,
+                "partial_triggers": listener_stats["partial_triggers"],
+                "final_triggers": listener_stats["final_triggers"]
+            }
+        if self.segment_buffer:
+            stats["replay_segments"] = self.segment_buffer.get_statistics()
+        return stats
 
     def cleanup(self):
         """Clean up resources."""
         try:
             self.stop_listening()
-            if hasattr(self, 'audio_stream'):
-                self.audio_stream.terminate()
+            if hasattr(self, 'save_thread'):
+                self.save_queue.put(None)
+                self.save_thread.join()
             if hasattr(self, 'hotkey'):
                 self.hotkey.stop()
+            if self.segment_buffer:
+                self.segment_buffer.stop()
+            if self.voice_worker:
+                self.voice_worker.stop()
+            self.frame_buffer.close()
             
             self.logger.info("Clipper cleanup completed")
             
@@ -32,6 +32,45 @@ VIDEO_BITRATES = {
 VIDEO_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"]
 DEFAULT_VIDEO_PRESET = "veryfast"
 
+# Recording: encode while recording (to one file or to independently playable
+# segments), or capture raw frames and encode after stop
+RECORDING_MODES = ["streaming", "segmented", "buffered"]
+DEFAULT_RECORDING_MODE = "streaming"
+RECORDING_STREAM_PRESETS = {  # Must keep up with capture in real time
+    "Low": "veryfast",
+    "Medium": "faster",
+    "High": "fast"
+}
+RECORDING_FRAME_TIMEOUT = 0.1  # Longest the recording loop waits for a frame
+RECORDING_AUDIO_DRAIN = 1.0  # Most seconds of audio taken per loop wake-up
+RECORDING_STATS_INTERVAL = 1.0  # seconds between recording statistics updates
+DEFAULT_RECORDING_SEGMENT_DURATION = 60  # seconds; a crash loses at most one segment
+RECORDING_SEGMENT_INDEX = "index.csv"  # FFmpeg segment list: filename,start,end
+RECORDING_SEGMENT_FORMATS = {"mkv": "matroska"}  # Muxer names that differ from the extension
+RECORDING_CHUNK_CORES = 4  # CPU cores per parallel encoder when encoding buffered recordings
+RECORDING_MIN_CHUNK_SECONDS = 10  # Shorter chunks lose more to x264 lookahead warm-up
+RECORDING_WRITE_BUFFER = 16 * 1024 * 1024  # bytes gathered into each raw capture write
+RECORDING_WRITE_QUEUE = 60  # Frames queued for the raw capture writer before capture waits
+RECORDING_WRITE_STALL_TIMEOUT = 10.0  # seconds capture waits on a full raw writer queue before the recording fails
+RECORDING_PREALLOCATE_SECONDS = 300  # Disk space reserved ahead of the raw capture writer
+RECORDING_DISK_RESERVE = 1024 ** 3  # bytes preallocation always leaves free
+RECORDING_PIXEL_FORMATS = ["native", "yuv420p"]  # How frames reach the encoder or raw file
+
+# Adaptive encoding: degrade in ladder order (faster preset, lower capture
+# fps, scaled output) while the live encoder falls behind
+X264_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium",
+                "slow", "slower", "veryslow"]  # Fastest first
+BACKPRESSURE_FASTEST_PRESET = "veryfast"  # Faster presets cost too much bitrate
+BACKPRESSURE_FPS_STEPS = [24, 20]
+BACKPRESSURE_MIN_SPEED = 0.97  # Encoder speed (x realtime) below this is falling behind once its queue passes QUEUE_LOW
+BACKPRESSURE_QUEUE_HIGH = 0.5  # Encoder queue fill that counts as pressure
+BACKPRESSURE_QUEUE_LOW = 0.1  # ...and that counts as headroom
+BACKPRESSURE_CPU_LOW = 70.0  # System CPU % above which the encoder is not stepped back up
+BACKPRESSURE_STEP_DOWN_AFTER = 3.0  # seconds of sustained pressure before degrading
+BACKPRESSURE_STEP_UP_AFTER = 20.0  # seconds of sustained headroom before recovering
+BACKPRESSURE_PART_CLOSE_TIMEOUT = 30.0  # seconds a replaced encoder part gets to finalize before it is killed
+BACKPRESSURE_HOLD = 10.0  # seconds after any change before the next one
+
 # Audio Settings
 AUDIO_SAMPLE_RATE = 44100
 AUDIO_CHANNELS = 2
@@ -51,6 +90,21 @@ DEFAULT_CLIP_HOTKEY = "Ctrl+C"
 DEFAULT_CLIP_FORMAT = "mp4"
 CLIP_BUFFER_SIZE = DEFAULT_CLIP_DURATION * DEFAULT_FPS
 CLIP_NAMING_FORMAT = "clip_{timestamp}_{counter}"
+REPLAY_MODES = ["raw", "segments"]  # raw frames in memory, or pre-encoded segments
+DEFAULT_REPLAY_MODE = "raw"
+REPLAY_SEGMENT_LENGTH = 2  # seconds per keyframe-aligned replay segment
+REPLAY_BUFFER_CODECS = ["raw", "jpeg", "png", "mmap"]  # How replay frames are held; mmap is a disk-backed ring file
+DEFAULT_REPLAY_BUFFER_CODEC = "raw"
+REPLAY_BUFFER_CODEC_PARAMS = {
+    # codec: (image extension, cv2.imencode parameters)
+    "jpeg": (".jpg", ["IMWRITE_JPEG_QUALITY", 90]),
+    "png": (".png", ["IMWRITE_PNG_COMPRESSION", 1])  # Lossless, fastest level
+}
+CLIP_SNAPSHOT_RESERVE = 2  # seconds of extra ring slots protecting a snapshot being saved
+CLIP_SNAPSHOT_COPY_MARGIN = 30  # frames from being overwritten at which a snapshot frame is copied, not piped from its slot
+CLIP_SAVE_QUEUE_SIZE = 4  # pending clip saves before new requests are dropped
+DEFAULT_CLIP_POST_ROLL = 0  # seconds captured after a clip command before saving
+CLIP_POST_ROLL_GRACE = 2  # seconds to wait past the post-roll if capture stalls
 
 # UI Settings
 UI_THEME = "darkly"
@@ -152,7 +206,35 @@ VOICE_COMMANDS = {
     "pause": ["pause recording", "pause"],
     "resume": ["resume recording", "resume"]
 }
-VOICE_COMMAND_SIMILARITY_THRESHOLD = 75  # Fuzzy matching threshold
+VOICE_COMMAND_SIMILARITY_THRESHOLD = 75  # Fuzzy matching threshold for clip phrases
+VOICE_EXACT_COMMANDS = ["start", "stop", "pause", "resume"]  # Recording controls fire only on an exact phrase ("cause" is not "pause")
+VOICE_ARGUMENT_COMMANDS = ["clip"]  # Take a spoken number ("clip forty five"), so never fire on a partial result
+VOICE_COMMAND_GRAMMAR = True  # Constrain the recognizer to command phrases and numbers
+VOSK_MODEL_NAME = "vosk-model-en-us-0.22"
+VOSK_GRAMMAR_MODEL_NAME = "vosk-model-small-en-us-0.15"  # Large models ignore grammars
+VOICE_SAMPLE_RATE = 16000  # Recognizer input rate
+VOICE_BLOCK_SIZE = 4096  # Samples per microphone read
+VOICE_PARTIAL_STABLE_BLOCKS = 2  # Unchanged partial results before a command fires early
+VOICE_PARTIAL_SIMILARITY_THRESHOLD = 90  # Stricter fuzzy match for partial results
+VOICE_COMMAND_COOLDOWN = 2.0  # seconds before another voice command may fire
+
+# Voice recognition worker process (keeps decoding off the capture process's GIL)
+VOICE_RECOGNITION_PROCESS = False
+VOICE_WORKER_RING_BLOCKS = 64  # Shared-memory audio ring, about 16 s at 16 kHz
+VOICE_WORKER_HEALTH_INTERVAL = 1.0  # seconds between worker heartbeats
+VOICE_WORKER_HEALTH_TIMEOUT = 10.0  # Restart a ready worker silent for this long
+VOICE_WORKER_MAX_RESTARTS = 5  # Consecutive failures before giving up
+
+# Voice activity gate in front of the recognizer
+VOICE_ACTIVITY_GATE = True
+VAD_FRAME_SIZE = 256  # Samples per analysis frame (16 ms at 16 kHz)
+VAD_MIN_RMS = 300  # Absolute int16 RMS floor for speech
+VAD_NOISE_RATIO = 2.5  # Speech must be this much louder than the noise floor
+VAD_NOISE_ADAPTATION = 0.05  # Noise floor smoothing per quiet block
+VAD_ZCR_RANGE = (0.02, 0.35)  # Zero-crossing rate of voiced frames
+VAD_SPEECH_FRAME_RATIO = 0.3  # Voiced share of frames that makes a block speech
+VAD_HANGOVER = 0.5  # seconds the gate stays open after speech
+VAD_PRE_ROLL = 0.25  # seconds of audio replayed when the gate opens
 
 # Default Configuration
 DEFAULT_CONFIG = {
@@ -179,13 +261,25 @@ DEFAULT_CONFIG = {
     "recording": {
         "format": DEFAULT_FILE_EXTENSION,
         "save_path": DEFAULT_RECORDINGS_FOLDER,
-        "filename_template": "recording_{timestamp}"
+        "filename_template": "recording_{timestamp}",
+        "mode": DEFAULT_RECORDING_MODE,
+        "segment_duration": DEFAULT_RECORDING_SEGMENT_DURATION,
+        "finalize_segments": True,
+        "adaptive_encoding": True,
+        "parallel_chunks": 0,  # Buffered mode; 0 picks from the CPU count, 1 disables
+        "direct_io": False,  # Buffered mode: write raw frames with O_DIRECT where supported
+        "pixel_format": "native"  # "yuv420p" converts once in capture, halving pipe bandwidth
     },
     "clipping": {
         "duration": DEFAULT_CLIP_DURATION,
         "format": DEFAULT_CLIP_FORMAT,
         "save_path": DEFAULT_CLIPS_FOLDER,
-        "hotkey": DEFAULT_CLIP_HOTKEY
+        "hotkey": DEFAULT_CLIP_HOTKEY,
+        "replay_mode": DEFAULT_REPLAY_MODE,
+        "buffer_codec": DEFAULT_REPLAY_BUFFER_CODEC,
+        "post_roll": DEFAULT_CLIP_POST_ROLL,
+        "command_grammar": VOICE_COMMAND_GRAMMAR,
+        "voice_process": VOICE_RECOGNITION_PROCESS
     },
     "performance": {
         "priority": "Normal",
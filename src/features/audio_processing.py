@@ -245,4 +245,63 @@ class EqualizerFilter(AudioFilter):
 
         except Exception as e:
             logging.error(f"Error in equalizer: {e}")
-            return audio_data
\ No newline at end of file
+            return audio_data
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler built on ``scipy.signal.resample_poly``.
+
+    The anti-aliasing filter is designed once per rate pair and shared.
+    Chunks are processed with ``pad`` samples of context on each side, where
+    ``pad`` is a multiple of the decimation factor, so chunk edges line up
+    exactly and the output has no seams.
+    """
+
+    _filters: Dict[tuple, np.ndarray] = {}
+
+    def __init__(self, source_rate: int, target_rate: int, chunk_periods: int = 4):
+        divisor = np.gcd(source_rate, target_rate)
+        self.up = target_rate // divisor
+        self.down = source_rate // divisor
+        self.filter = self.get_filter(self.up, self.down)
+
+        # Context must cover the filter's half length at the input rate
+        half_len = (len(self.filter) - 1) // 2
+        self.pad = self.down * int(np.ceil(half_len / self.up / self.down))
+        self.chunk = self.down * chunk_periods
+        self.pending = np.zeros(self.pad, dtype=np.float32)
+
+    @classmethod
+    def get_filter(cls, up: int, down: int) -> np.ndarray:
+        """The FIR filter ``resample_poly`` would design, cached per ratio."""
+        key = (up, down)
+        if key not in cls._filters:
+            max_rate = max(up, down)
+            if max_rate == 1:
+                # Equal rates: nothing to band-limit
+                cls._filters[key] = np.ones(1)
+                return cls._filters[key]
+            half_len = 10 * max_rate
+            cls._filters[key] = signal.firwin(
+                2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)
+            )
+        return cls._filters[key]
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next mono chunk; the newest ``pad`` samples wait for context."""
+        self.pending = np.concatenate((self.pending, samples.astype(np.float32, copy=False)))
+
+        usable = (len(self.pending) - 2 * self.pad) // self.chunk * self.chunk
+        if usable <= 0:
+            return np.empty(0, dtype=np.float32)
+
+        window = self.pending[:usable + 2 * self.pad]
+        resampled = signal.resample_poly(window, self.up, self.down, window=self.filter)
+        offset = self.pad * self.up // self.down
+        output = resampled[offset:offset + usable * self.up // self.down]
+
+        self.pending = self.pending[usable:]
+        return output.astype(np.float32, copy=False)
+
+    def reset(self):
+        """Drop buffered input, as at the start of a new stream."""
+        self.pending = np.zeros(self.pad, dtype=np.float32)
@@ -13,6 +13,15 @@ from typing import Dict, Any, Optional,List
 from src.constants import DEFAULT_LOGS_PATH
 from src.utils.error_handler import ErrorHandler
 
+def to_bgr(frame: np.ndarray) -> np.ndarray:
+    """Copy of ``frame`` in the BGR layout the effects work in.
+
+    Screen capture delivers BGRA frames; the alpha channel is dropped.
+    """
+    if frame.ndim == 3 and frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    return frame.copy()
+
 class BaseVideoEffect(ABC):
     """Base class for video effects."""
     
@@ -225,7 +234,7 @@ class EffectsManager:
     def process_frame(self, frame: np.ndarray) -> np.ndarray:
         """Process frame through effect chain."""
         try:
-            processed_frame = frame.copy()
+            processed_frame = to_bgr(frame)
             
             for effect_name in self.effect_chain:
                 effect = self.effects.get(effect_name)
@@ -15,13 +15,19 @@ import time
 from datetime import datetime
 import json
 import shutil
+import cv2
 import numpy as np
+import psutil
 from queue import Queue, Empty
 from src.constants import *
 from src.utils.error_handler import ErrorHandler
 from src.utils.video_manager import VideoManager, VideoFrame
 from src.utils.audio_manager import AudioManager, AudioFrame
 from src.utils.performance import PerformanceUtils
+from src.utils.encoder_sink import EncoderSink, rawvideo_input_args, frame_bytes, FRAME_PIX_FMTS
+from src.utils.backpressure import BackpressureController, EncoderLevel, build_ladder
+from src.utils.chunked_encoder import ChunkedEncoder, default_chunk_count
+from src.utils.disk_writer import DiskWriter
 
 class RecordingState:
     """Recording state management."""
@@ -34,6 +40,12 @@ class RecordingState:
         self.frame_count = 0
         self.error: Optional[str] = None
 
+# Single-pass conversions from capture layouts to planar YUV 4:2:0
+I420_CONVERSIONS = {
+    'BGR': cv2.COLOR_BGR2YUV_I420,
+    'BGRA': cv2.COLOR_BGRA2YUV_I420
+}
+
 class RecordingManager:
     """Manages video recording functionality."""
     
@@ -50,6 +62,16 @@ class RecordingManager:
         self.format = config.get("recording.format", DEFAULT_FILE_EXTENSION)
         self.save_path = Path(config.get("recording.save_path", DEFAULT_RECORDINGS_FOLDER))
         self.quality = config.get("video.quality", "High")
+        mode = config.get("recording.mode", DEFAULT_RECORDING_MODE)
+        self.mode = mode if mode in RECORDING_MODES else DEFAULT_RECORDING_MODE
+        self.segment_duration = config.get("recording.segment_duration",
+                                           DEFAULT_RECORDING_SEGMENT_DURATION)
+        self.finalize_on_stop = config.get("recording.finalize_segments", True)
+        self.adaptive_encoding = config.get("recording.adaptive_encoding", True)
+        self.parallel_chunks = config.get("recording.parallel_chunks", 0) or default_chunk_count()
+        self.direct_io = config.get("recording.direct_io", False)
+        pixel_format = config.get("recording.pixel_format", "native")
+        self.pixel_format = pixel_format if pixel_format in RECORDING_PIXEL_FORMATS else "native"
         
         # Create directories
         self.save_path.mkdir(parents=True, exist_ok=True)
@@ -58,7 +80,20 @@ class RecordingManager:
         self.temp_video = None
         self.temp_audio = None
         self.output_file = None
+        self.segment_dir: Optional[Path] = None
         self.encoding_process = None
+        self.chunked_encoder: Optional[ChunkedEncoder] = None
+        self.disk_writer: Optional[DiskWriter] = None
+        
+        # Negotiated with the capture source when recording starts
+        self.input_pix_fmt = 'bgr24'
+        self.input_size: Tuple[int, int] = tuple(map(int, BASE_CANVAS_RESOLUTION.split('x')))
+        self._frame_conversion: Optional[int] = None
+        self.sink: Optional[EncoderSink] = None
+        self.sink_lock = threading.Lock()
+        self.parts: List[Dict] = []  # Encoder outputs this session, one per ladder change
+        self.part_closers: List[threading.Thread] = []  # Finalizing replaced parts
+        self.backpressure: Optional[BackpressureController] = None
         
         # Initialize statistics
         self.stats = {
@@ -67,7 +102,9 @@ class RecordingManager:
             'failed_recordings': 0,
             'current_filesize': 0,
             'current_duration': 0.0,
-            'encoding_speed': 0.0
+            'encoding_speed': 0.0,
+            'encoding_progress': 0.0,
+            'loop_cpu_percent': 0.0
         }
         
         # Initialize buffers
@@ -80,6 +117,9 @@ class RecordingManager:
         # Initialize threads
         self.record_thread = None
         self.encoding_thread = None
+        self.stats_thread = None
+        self._stats_stop = threading.Event()
+        self._process = psutil.Process()
         
         self.logger.info("Recording manager initialized successfully")
     def init_components(self):
@@ -182,9 +222,22 @@ class RecordingManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             self.output_file = self.save_path / f"recording_{timestamp}.{self.format}"
             
-            # Create temporary files
-            self.temp_video = self.save_path / f"temp_video_{timestamp}.raw"
-            self.temp_audio = self.save_path / f"temp_audio_{timestamp}.wav"
+            self.segment_dir = None
+            self.disk_writer = None
+            self._negotiate_format()
+            if self.mode in ("streaming", "segmented"):
+                # Encode while recording; stop only finalizes the container
+                self.temp_video = None
+                self.temp_audio = None
+                if self.mode == "segmented":
+                    # Completed segments survive a crash; see get_finished_segments()
+                    self.segment_dir = self.save_path / f"recording_{timestamp}_segments"
+                    self.segment_dir.mkdir(parents=True, exist_ok=True)
+                self._start_stream()
+            else:
+                # Create temporary files
+                self.temp_video = self.save_path / f"temp_video_{timestamp}.raw"
+                self.temp_audio = self.save_path / f"temp_audio_{timestamp}.wav"
             
             # Start video and audio capture
             if not self.video_manager.start_capture():
@@ -196,15 +249,24 @@ class RecordingManager:
             self.state.is_recording = True
             self.state.start_time = time.time()
             self.state.frame_count = 0
+            self.state.error = None
             
             # Start recording thread
             self.record_thread = threading.Thread(
-                target=self._recording_loop,
+                target=self._stream_loop if self.sink else self._recording_loop,
                 daemon=True
             )
             self.record_thread.start()
             
-            self.logger.info(f"Started recording to {self.output_file}")
+            # Statistics are sampled on their own clock, off the frame path
+            self._stats_stop.clear()
+            self.stats_thread = threading.Thread(
+                target=self._stats_loop,
+                daemon=True
+            )
+            self.stats_thread.start()
+            
+            self.logger.info(f"Started {self.mode} recording to {self.output_file}")
             return True
             
         except Exception as e:
@@ -214,34 +276,24 @@ class RecordingManager:
 
     def _recording_loop(self):
         """Main recording loop."""
-        video_file = None
         audio_file = None
         
         try:
-            # Open temporary files
-            video_file = open(self.temp_video, 'wb')
+            # Open temporary files; raw frames are written behind the loop
+            width, height = self.input_size
+            self.disk_writer = DiskWriter(
+                self.temp_video,
+                bytes_per_second=frame_bytes(width, height, self.input_pix_fmt) * DEFAULT_FPS,
+                direct=self.direct_io
+            )
+            if not self.disk_writer.open():
+                raise Exception(f"Failed to open {self.temp_video}: {self.disk_writer.error}")
             audio_file = open(self.temp_audio, 'wb')
             
             # Write WAV header
             self._write_wav_header(audio_file)
             
-            while self.state.is_recording:
-                if not self.state.is_paused:
-                    # Process video
-                    video_frame = self.video_manager.get_frame()
-                    if video_frame:
-                        video_file.write(video_frame.data.tobytes())
-                        self.state.frame_count += 1
-                    
-                    # Process audio
-                    audio_frame = self.audio_manager.get_audio_data(1/30)  # Match video FPS
-                    if audio_frame:
-                        audio_file.write(audio_frame)
-                    
-                    # Update statistics
-                    self._update_recording_stats()
-                
-                time.sleep(0.001)  # Prevent CPU overuse
+            self._pump_capture(self._write_raw_frame, audio_file.write)
             
         except Exception as e:
             self.state.error = str(e)
@@ -249,8 +301,15 @@ class RecordingManager:
             
         finally:
             # Close files
-            if video_file:
-                video_file.close()
+            if self.disk_writer:
+                if not self.disk_writer.close() and not self.state.error:
+                    self.state.error = self.disk_writer.error
+                stats = self.disk_writer.get_statistics()
+                self.logger.info(
+                    f"Raw video written at {stats['sustained_mbps']:.1f} MB/s, "
+                    f"worst write {stats['worst_write_latency'] * 1000:.1f} ms, "
+                    f"{stats['buffers_dropped']} frames dropped"
+                )
             if audio_file:
                 self._update_wav_header(audio_file)
                 audio_file.close()
@@ -258,9 +317,244 @@ class RecordingManager:
             # Start encoding if recording was successful
             if not self.state.error:
                 self._start_encoding()
+
+    def _write_raw_frame(self, video_frame: VideoFrame):
+        """Queue a frame for the raw capture file.
+
+        A dropped frame would shift the video against the audio, so capture
+        waits for a full writer queue and the recording fails if the writer
+        has stopped or stays stalled for RECORDING_WRITE_STALL_TIMEOUT.
+        """
+        if not self.disk_writer.write(self._frame_data(video_frame),
+                                      timeout=RECORDING_WRITE_STALL_TIMEOUT):
+            reason = self.disk_writer.error or f"stalled for {RECORDING_WRITE_STALL_TIMEOUT}s"
+            raise Exception(f"Raw video writer stopped: {reason}")
+
+    def _negotiate_format(self):
+        """Match the encoder input to the layout and size capture produces.
+
+        Frames are passed through in their native layout unless
+        recording.pixel_format asks for yuv420p, which is converted once
+        here instead of by FFmpeg and carries half the bytes of BGR.
+        """
+        frame_format, self.input_size = self.video_manager.get_frame_format()
+        self.input_pix_fmt = FRAME_PIX_FMTS[frame_format]
+        self._frame_conversion = None
+
+        if self.pixel_format == "yuv420p":
+            width, height = self.input_size
+            if width % 2 or height % 2:
+                self.logger.warning(
+                    f"{width}x{height} cannot be subsampled to yuv420p; "
+                    f"recording {self.input_pix_fmt} frames"
+                )
+            elif frame_format in I420_CONVERSIONS:
+                self._frame_conversion = I420_CONVERSIONS[frame_format]
+                self.input_pix_fmt = 'yuv420p'
+
+        self.logger.info(
+            f"Recording input: {self.input_pix_fmt} at {self.input_size[0]}x{self.input_size[1]}"
+        )
+
+    def _frame_data(self, video_frame: VideoFrame) -> np.ndarray:
+        """Frame pixels in the negotiated input format."""
+        if self._frame_conversion is None:
+            return video_frame.data
+        return cv2.cvtColor(video_frame.data, self._frame_conversion)
+
+    def _start_stream(self):
+        """Launch the encoder so frames and audio are compressed as they arrive."""
+        width, height = self.input_size
+        level = EncoderLevel(self._get_encoding_preset(streaming=True), DEFAULT_FPS,
+                             f"{width}x{height}")
+        self.parts = []
+        self.part_closers = []
+        self.backpressure = None
+        if self.adaptive_encoding:
+            self.backpressure = BackpressureController(
+                build_ladder(level.preset, level.fps, level.resolution),
+                on_change=self._apply_encoder_level
+            )
+
+        self.video_manager.target_fps = level.fps
+        self.sink, part = self._open_sink(level)
+        self.parts.append(part)
+
+    def _open_sink(self, level: EncoderLevel) -> Tuple[EncoderSink, Dict]:
+        """Start an encoder for the next part of the session at ``level``.
+
+        Returns the sink and its part entry, which the caller records in
+        ``parts`` once the sink is in use.
+        """
+        part = len(self.parts) + 1
+        width, height = self.input_size
+        if self.segment_dir:
+            prefix = "segment" if part == 1 else f"segment_{part:02d}"
+            output = self.segment_dir / f"{prefix}_%05d.{self.format}"
+        elif part == 1:
+            output = self.output_file
+        else:
+            output = self.output_file.with_name(
+                f"{self.output_file.stem}_part{part}{self.output_file.suffix}"
+            )
+
+        sink = EncoderSink(
+            output, width, height,
+            output_args=self._get_output_args(streaming=True, level=level, part=part),
+            fps=level.fps,
+            pix_fmt=self.input_pix_fmt,
+            audio=True,
+            audio_rate=self.audio_manager.sample_rate,
+            audio_channels=self.audio_manager.channels,
+            audio_format='f32le'  # AudioManager captures paFloat32
+        )
+        if not sink.start():
+            raise Exception(f"Failed to start streaming encoder: {sink.error}")
+
+        return sink, {'path': output, 'level': level}
+
+    def _apply_encoder_level(self, previous: EncoderLevel, level: EncoderLevel):
+        """Roll the live encoder over to a new part with ``level``'s settings.
+
+        FFmpeg cannot change preset, input rate or output size mid-stream,
+        so the next part's encoder is started first and swapped in; the old
+        one then drains its queue and finalizes its file on its own thread,
+        keeping the statistics thread that called us on its clock.
+        """
+        try:
+            sink, part = self._open_sink(level)
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Applying encoder backpressure")
+            return
+
+        with self.sink_lock:
+            # Recording may have stopped while the new encoder started
+            if not self.state.is_recording or self.sink is None:
+                old_sink = None
+            else:
+                old_sink, self.sink = self.sink, sink
+                self.parts.append(part)
+                self.video_manager.target_fps = level.fps
+                # Registered under the lock so _finish_stream waits for it
+                closer = threading.Thread(target=self._close_part, args=(old_sink,), daemon=True)
+                self.part_closers.append(closer)
+                closer.start()
+
+        if old_sink is None:
+            sink.abort()
+            if not self.segment_dir:
+                Path(part['path']).unlink(missing_ok=True)
+
+    def _close_part(self, sink: EncoderSink):
+        """Finalize a replaced encoder part, killing it if it hangs."""
+        if not sink.close(timeout=BACKPRESSURE_PART_CLOSE_TIMEOUT):
+            self.logger.error(f"Encoder part failed to finalize: {sink.error}")
+            sink.abort()
+
+    def _check_backpressure(self):
+        """Sample encoder load for the backpressure controller."""
+        sink = self.sink
+        if not self.backpressure or not sink or self.state.is_paused:
+            return
+
+        sink_stats = sink.get_statistics()
+        self.backpressure.observe(
+            speed=sink_stats['encoding_speed'],
+            queue_fill=sink_stats['queue_depth'] / max(1, sink_stats['queue_capacity']),
+            cpu=psutil.cpu_percent()
+        )
+
+    def _pump_capture(self, write_video, write_audio):
+        """Hand captured frames and audio to the writers until recording stops.
+
+        The thread sleeps in a blocking wait for the next frame rather than
+        polling; audio queued meanwhile is drained on every wake-up.
+        """
+        while self.state.is_recording:
+            video_frame = self.video_manager.get_frame(timeout=RECORDING_FRAME_TIMEOUT)
+            audio_data = self.audio_manager.get_audio_data(RECORDING_AUDIO_DRAIN)
+
+            if self.state.is_paused:
+                continue  # Captured while paused: discarded
+
+            if video_frame:
+                write_video(video_frame)
+                self.state.frame_count += 1
+            if audio_data:
+                write_audio(audio_data)
+
+    def _stream_loop(self):
+        """Recording loop for streaming mode: feed the encoder's pipes."""
+        def write_video(video_frame: VideoFrame):
+            data = self._frame_data(video_frame)
+            # Blocks only while the encoder's queue is full. The lock keeps
+            # frames out of an encoder that is being swapped out.
+            with self.sink_lock:
+                if not self.sink.write_frame(data, timeout=1.0) \
+                        and not self.sink.is_open:
+                    raise Exception(f"Streaming encoder stopped: {self.sink.error}")
+
+        def write_audio(data: bytes):
+            with self.sink_lock:
+                self.sink.write_audio(data, timeout=1.0)
+
+        try:
+            self._pump_capture(write_video, write_audio)
+
+        except Exception as e:
+            self.state.error = str(e)
+            self.error_handler.handle_error(e, context="Streaming recording loop")
+
+        finally:
+            self._finish_stream()
+
+    def _finish_stream(self):
+        """Flush the encoder and finalize the output container."""
+        with self.sink_lock:
+            sink, self.sink = self.sink, None
+        self.video_manager.target_fps = DEFAULT_FPS
+        if sink is None:
+            return
+
+        # Earlier parts must be finalized before they can be joined
+        for closer in self.part_closers:
+            closer.join()
+        self.part_closers = []
+
+        if self.state.error:
+            sink.abort()
+            self.stats['failed_recordings'] += 1
+            return
+
+        start = time.time()
+        if sink.close():
+            self.stats['total_recordings'] += 1
+            self.stats['total_duration'] += self.get_recording_duration()
+            if self.segment_dir and self.finalize_on_stop:
+                self.finalize_segments(self.segment_dir, self.output_file)
+            elif len(self.parts) > 1:
+                self._join_parts()
+            self._update_recording_stats()
+            self.logger.info(
+                f"Recording finalized in {time.time() - start:.2f}s: "
+                f"{self.output_file if self.output_file.exists() else self.segment_dir}"
+            )
+        else:
+            self.state.error = sink.error
+            self.stats['failed_recordings'] += 1
+            self.logger.error(f"Streaming encode failed: {sink.error}")
+
     def _start_encoding(self):
         """Start encoding process."""
         try:
+            if self.parallel_chunks > 1:
+                self.encoding_thread = threading.Thread(
+                    target=self._run_chunked_encoding,
+                    daemon=True
+                )
+                self.encoding_thread.start()
+                return
+
             # Create encoding command
             command = self._create_ffmpeg_command()
             
@@ -283,54 +577,278 @@ class RecordingManager:
             self.error_handler.handle_error(e, context="Starting encoding")
             self.state.error = str(e)
 
+    def _run_chunked_encoding(self):
+        """Encode the raw recording as parallel chunks, then mux the audio."""
+        try:
+            width, height = self.input_size
+            self.stats['encoding_progress'] = 0.0
+            self.chunked_encoder = ChunkedEncoder(
+                self.temp_video, width, height, DEFAULT_FPS,
+                pix_fmt=self.input_pix_fmt,
+                output=self.output_file,
+                video_args=self._get_video_args(),
+                audio_source=self.temp_audio,
+                audio_args=self._get_audio_args(),
+                output_args=['-movflags', '+faststart'],
+                chunks=self.parallel_chunks,
+                on_progress=lambda progress: self.stats.update(encoding_progress=progress)
+            )
+
+            start = time.time()
+            if not self.chunked_encoder.run():
+                raise Exception(f"Encoding failed: {self.chunked_encoder.error}")
+
+            encode_time = time.time() - start
+            frames = self.chunked_encoder.stats['total_frames']
+            self.stats['encoding_speed'] = frames / DEFAULT_FPS / encode_time if encode_time else 0.0
+            self.logger.info(
+                f"Encoded {frames} frames in {self.chunked_encoder.stats['chunks']} chunks "
+                f"in {encode_time:.1f}s ({self.stats['encoding_speed']:.2f}x)"
+            )
+
+            # Update statistics
+            self.stats['total_recordings'] += 1
+            self.stats['total_duration'] += self.get_recording_duration()
+            self.cleanup_temp_files()
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Chunked encoding")
+            self.stats['failed_recordings'] += 1
+            self.state.error = str(e)
+
     def _create_ffmpeg_command(self) -> List[str]:
         """Create FFmpeg encoding command."""
         try:
-            # Get video dimensions
-            width, height = map(int, BASE_CANVAS_RESOLUTION.split('x'))
+            # Raw frames were written in the negotiated format
+            width, height = self.input_size
             
             # Base command
             command = [
                 'ffmpeg',
                 # Video input
-                '-f', 'rawvideo',
-                '-vcodec', 'rawvideo',
-                '-s', f'{width}x{height}',
-                '-pix_fmt', 'rgb24',
-                '-framerate', str(DEFAULT_FPS),
-                '-i', str(self.temp_video),
+                *rawvideo_input_args(width, height, DEFAULT_FPS,
+                                     pix_fmt=self.input_pix_fmt,
+                                     source=str(self.temp_video)),
                 
                 # Audio input
                 '-i', str(self.temp_audio),
                 
-                # Video encoding settings
-                '-c:v', 'h264',
-                '-preset', self._get_encoding_preset(),
-                '-crf', self._get_quality_crf(),
-                
-                # Audio encoding settings
-                '-c:a', 'aac',
-                '-b:a', '192k',
-                
-                # Output settings
-                '-pix_fmt', 'yuv420p',  # For compatibility
-                '-movflags', '+faststart',  # For streaming
+                *self._get_output_args(),
                 '-y',  # Overwrite output
                 str(self.output_file)
             ]
             
-            # Add quality-specific settings
-            if self.quality == "High":
-                command.extend(['-x264-params', 'ref=4:me=umh:subme=7:trellis=2'])
-            
             return command
             
         except Exception as e:
             self.error_handler.handle_error(e, context="Creating FFmpeg command")
             raise
 
-    def _get_encoding_preset(self) -> str:
+    def _get_output_args(self, streaming: bool = False,
+                         level: Optional[EncoderLevel] = None, part: int = 1) -> List[str]:
+        """FFmpeg encoding and container arguments for the recording."""
+        args = self._get_encoding_args(streaming, level)
+        if streaming and self.segment_dir:
+            return args + self._get_segment_args(part)
+        return args + ['-movflags', '+faststart']  # For streaming
+
+    def _get_encoding_args(self, streaming: bool = False,
+                           level: Optional[EncoderLevel] = None) -> List[str]:
+        """FFmpeg codec arguments for the recording."""
+        return self._get_video_args(streaming, level) + self._get_audio_args()
+
+    def _get_audio_args(self) -> List[str]:
+        """FFmpeg audio codec arguments for the recording."""
+        return ['-c:a', 'aac', '-b:a', '192k']
+
+    def _get_video_args(self, streaming: bool = False,
+                        level: Optional[EncoderLevel] = None) -> List[str]:
+        """FFmpeg video codec arguments for the recording."""
+        args = []
+        width, height = self.input_size
+        if level and level.resolution != f"{width}x{height}":
+            # Scaled picture for backpressure, padded back to the capture
+            # size so every part of the recording can still be joined
+            out_w, out_h = level.resolution.split('x')
+            args.extend([
+                '-vf', f'scale={out_w}:{out_h}:force_original_aspect_ratio=decrease,'
+                       f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2'
+            ])
+
+        args.extend([
+            # Video encoding settings
+            '-c:v', 'h264',
+            '-preset', level.preset if level else self._get_encoding_preset(streaming),
+            '-crf', self._get_quality_crf(),
+            
+            # Output settings
+            '-pix_fmt', 'yuv420p'  # For compatibility
+        ])
+        
+        # Add quality-specific settings; too slow to encode in real time
+        if self.quality == "High" and not streaming:
+            args.extend(['-x264-params', 'ref=4:me=umh:subme=7:trellis=2'])
+        
+        return args
+
+    def _get_segment_args(self, part: int = 1) -> List[str]:
+        """Segment muxer arguments: fixed-length, independently playable files.
+
+        Every segment starts on a forced keyframe with timestamps from zero,
+        and FFmpeg appends each finished segment to the CSV index (one per
+        encoder part).
+        """
+        index = Path(RECORDING_SEGMENT_INDEX)
+        if part > 1:
+            index = index.with_name(f"{index.stem}_{part:02d}{index.suffix}")
+        args = [
+            '-force_key_frames', f'expr:gte(t,n_forced*{self.segment_duration})',
+            '-f', 'segment',
+            '-segment_time', str(self.segment_duration),
+            '-segment_format', RECORDING_SEGMENT_FORMATS.get(self.format, self.format),
+            '-segment_list', str(self.segment_dir / index),
+            '-segment_list_type', 'csv',
+            '-reset_timestamps', '1'
+        ]
+        if self.format in ('mp4', 'mov'):
+            args.extend(['-segment_format_options', 'movflags=+faststart'])
+        return args
+
+    def get_finished_segments(self, segment_dir: Optional[Path] = None) -> List[Dict]:
+        """Completed segments of a segmented recording, oldest first.
+
+        Only segments FFmpeg has closed are listed, so they can be uploaded
+        or trimmed while recording continues, or recovered after a crash.
+        """
+        segment_dir = Path(segment_dir or self.segment_dir)
+        index = Path(RECORDING_SEGMENT_INDEX)
+        segments = []
+
+        # index.csv, then index_02.csv, ... for later encoder parts; each
+        # part's times start from zero
+        offset = 0.0
+        index_paths = sorted(segment_dir.glob(f"{index.stem}*{index.suffix}"))
+        for part, index_path in enumerate(index_paths, start=1):
+            part_end = 0.0
+            for line in index_path.read_text().splitlines():
+                name, _, times = line.partition(',')
+                start, _, end = times.partition(',')
+                try:
+                    segments.append({
+                        'path': segment_dir / name,
+                        'part': part,
+                        'start': offset + float(start),
+                        'end': offset + float(end)
+                    })
+                    part_end = float(end)
+                except ValueError:
+                    continue  # Partially written line
+            offset += part_end
+        return segments
+
+    def finalize_segments(self, segment_dir: Path, output_file: Path,
+                          remove: bool = True) -> bool:
+        """Join finished segments into one file without re-encoding.
+
+        Also recovers a session that crashed: everything up to the last
+        closed segment is kept. Segments are removed only after a
+        successful join.
+        """
+        try:
+            segments = self.get_finished_segments(segment_dir)
+            if not segments:
+                self.logger.warning(f"No finished segments in {segment_dir}")
+                return False
+
+            self._concat_copy(
+                [segment['path'] for segment in segments],
+                Path(segment_dir) / "concat.txt",
+                output_file,
+                # Segments of different encoder parts have different settings
+                remux_to_ts=len({segment['part'] for segment in segments}) > 1
+            )
+
+            if remove:
+                shutil.rmtree(segment_dir, ignore_errors=True)
+            self.logger.info(f"Joined {len(segments)} segments into {output_file}")
+            return True
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Finalizing recording segments")
+            return False
+
+    def _join_parts(self) -> bool:
+        """Join the session's encoder parts into the output file."""
+        parts = [Path(part['path']) for part in self.parts]
+
+        try:
+            joined = self.output_file.with_name(f"{self.output_file.stem}.joined{self.output_file.suffix}")
+            self._concat_copy(
+                parts,
+                self.output_file.with_name(f"{self.output_file.stem}.parts.txt"),
+                joined,
+                remux_to_ts=len({part['level'] for part in self.parts}) > 1
+            )
+
+            os.replace(joined, self.output_file)
+            for path in parts[1:]:
+                path.unlink()
+            return True
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Joining recording parts")
+            return False
+
+    def _concat_copy(self, inputs: List[Path], concat_list: Path, output: Path,
+                     remux_to_ts: bool = False):
+        """Concatenate ``inputs`` into ``output`` without re-encoding.
+
+        An MP4 keeps a single set of H.264 parameter sets (SPS/PPS) in its
+        header, so inputs encoded with different settings would all be
+        decoded with the first one's. With ``remux_to_ts`` each input is
+        first remuxed to MPEG-TS, which carries the parameter sets in-band,
+        and the TS streams are joined instead. Raises if FFmpeg fails.
+        """
+        streams = inputs
+        if remux_to_ts:
+            streams = [path.with_name(f"{path.stem}.join.ts") for path in inputs]
+
+        try:
+            if remux_to_ts:
+                for path, stream in zip(inputs, streams):
+                    self._run_ffmpeg([
+                        '-i', str(path), '-map', '0', '-c', 'copy',
+                        '-bsf:v', 'h264_mp4toannexb', '-f', 'mpegts', '-y', str(stream)
+                    ])
+
+            concat_list.write_text("".join(f"file '{path.name}'\n" for path in streams))
+            container_args = []
+            if self.format in ('mp4', 'mov'):
+                if remux_to_ts:
+                    container_args.extend(['-bsf:a', 'aac_adtstoasc'])
+                container_args.extend(['-movflags', '+faststart'])
+            self._run_ffmpeg([
+                '-f', 'concat', '-safe', '0', '-i', str(concat_list), '-c', 'copy',
+                *container_args, '-y', str(output)
+            ])
+
+        finally:
+            concat_list.unlink(missing_ok=True)
+            if remux_to_ts:
+                for stream in streams:
+                    stream.unlink(missing_ok=True)
+
+    def _run_ffmpeg(self, args: List[str]):
+        """Run an FFmpeg job to completion, raising with its error output."""
+        result = subprocess.run(['ffmpeg', '-hide_banner', *args],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg failed: {result.stderr[-500:]}")
+
+    def _get_encoding_preset(self, streaming: bool = False) -> str:
         """Get encoding preset based on quality setting."""
+        if streaming:
+            return RECORDING_STREAM_PRESETS.get(self.quality, DEFAULT_VIDEO_PRESET)
         presets = {
             "Low": "veryfast",
             "Medium": "medium",
@@ -398,6 +916,10 @@ class RecordingManager:
             # Wait for recording thread
             if self.record_thread:
                 self.record_thread.join()
+            self._stats_stop.set()
+            if self.stats_thread:
+                self.stats_thread.join()
+                self.stats_thread = None
             
             # Wait for encoding if needed
             if self.encoding_thread:
@@ -489,12 +1011,49 @@ class RecordingManager:
         except Exception as e:
             self.error_handler.handle_error(e, context="Updating WAV header")
 
+    def _stats_loop(self):
+        """Update recording statistics at a low, fixed rate."""
+        last_cpu = None
+        last_time = time.time()
+        while not self._stats_stop.wait(RECORDING_STATS_INTERVAL):
+            self._update_recording_stats()
+            self._check_backpressure()
+
+            # CPU used by the recording loop thread, as a share of one core
+            cpu = self._thread_cpu_time(self.record_thread)
+            now = time.time()
+            if cpu is not None and last_cpu is not None:
+                self.stats['loop_cpu_percent'] = 100 * (cpu - last_cpu) / (now - last_time)
+            last_cpu, last_time = cpu, now
+
+    def _thread_cpu_time(self, thread: Optional[threading.Thread]) -> Optional[float]:
+        """User plus system CPU seconds of a thread, if the OS reports them."""
+        if thread is None or thread.native_id is None:
+            return None
+        try:
+            for info in self._process.threads():
+                if info.id == thread.native_id:
+                    return info.user_time + info.system_time
+        except psutil.Error:
+            pass
+        return None
+
     def _update_recording_stats(self):
         """Update recording statistics."""
         try:
             # Update current file size
-            if self.temp_video and self.temp_video.exists():
-                self.stats['current_filesize'] = self.temp_video.stat().st_size
+            current_file = self.temp_video or self.output_file
+            if self.disk_writer and self.disk_writer.is_open:
+                # The file's size includes space preallocated ahead of the data
+                self.stats['current_filesize'] = self.disk_writer.position
+            elif current_file and current_file.exists():
+                self.stats['current_filesize'] = current_file.stat().st_size
+            elif self.segment_dir and self.segment_dir.exists():
+                self.stats['current_filesize'] = sum(
+                    f.stat().st_size for f in self.segment_dir.glob(f"segment_*.{self.format}")
+                )
+            if self.sink:
+                self.stats['encoding_speed'] = self.sink.stats['encoding_speed']
             
             # Update current duration
             self.stats['current_duration'] = self.get_recording_duration()
@@ -513,7 +1072,15 @@ class RecordingManager:
             'total_duration': self.stats['total_duration'],
             'failed_recordings': self.stats['failed_recordings'],
             'encoding_speed': self.stats['encoding_speed'],
+            'encoding_progress': self.stats['encoding_progress'],
+            'loop_cpu_percent': self.stats['loop_cpu_percent'],
             'frame_count': self.state.frame_count,
+            'mode': self.mode,
+            'segments': len(self.get_finished_segments()) if self.segment_dir else None,
+            'parts': len(self.parts),
+            'backpressure': self.backpressure.get_statistics() if self.backpressure else None,
+            'encoder': self.sink.get_statistics() if self.sink else None,
+            'disk_writer': self.disk_writer.get_statistics() if self.disk_writer else None,
             'error': self.state.error
         }
     def _sync_streams(self):
@@ -564,9 +1131,14 @@ class RecordingManager:
                 self.stop_recording()
             
             # Stop encoding process if running
+            if self.sink:
+                self.sink.abort()
+                self.sink = None
             if self.encoding_process:
                 self.encoding_process.terminate()
                 self.encoding_process.wait()
+            if self.chunked_encoder:
+                self.chunked_encoder.cancel()
             
             # Clean up managers
             self.video_manager.cleanup()
@@ -8,6 +8,8 @@ from dataclasses import dataclass
 from enum import Enum
 import threading
 
+from src.features.effects import to_bgr
+
 class BlendMode(Enum):
     NORMAL = "normal"
     MULTIPLY = "multiply"
@@ -138,9 +140,13 @@ class Scene:
         """Get frame from source."""
         try:
             if item.type == "video":
-                return item.source.get_frame()
+                frame = item.source.get_frame()
+                if frame is None:
+                    return None
+                # Screen sources hand out BGRA VideoFrames; the canvas is BGR
+                return to_bgr(getattr(frame, "data", frame))
             elif item.type == "image":
-                return item.source
+                return to_bgr(item.source)
             elif item.type == "color":
                 return np.full((*self.size, 3), item.source, dtype=np.uint8)
             return None
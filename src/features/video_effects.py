@@ -16,7 +16,7 @@ from dataclasses import dataclass
 
 from src.constants import *
 from src.utils.error_handler import ErrorHandler
-from src.features.effects import BaseVideoEffect, ChromaKeyEffect, ColorCorrectionEffect, BlurEffect
+from src.features.effects import BaseVideoEffect, ChromaKeyEffect, ColorCorrectionEffect, BlurEffect, to_bgr
 
 @dataclass
 class EffectConfig:
@@ -243,7 +243,7 @@ class EffectChain:
     def process_frame(self, frame: np.ndarray) -> np.ndarray:
         """Process frame through effect chain."""
         try:
-            result = frame.copy()
+            result = to_bgr(frame)
             for effect in self.effects:
                 if effect.enabled:
                     result = effect.process(result)
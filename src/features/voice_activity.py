@@ -0,0 +1,115 @@
+# src/features/voice_activity.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import logging
+from collections import deque
+from typing import Dict, List, Tuple, Union
+import numpy as np
+
+from src.constants import *
+
+class VoiceActivityGate:
+    """Energy / zero-crossing voice activity gate for the command recognizer.
+
+    Each block is split into short frames and scored in one vectorized pass:
+    a frame counts as voiced when its RMS clears an adaptive noise floor and
+    its zero-crossing rate is in the speech range (game audio and hiss cross
+    far more often). Speech-like blocks open the gate together with a short
+    pre-roll of the blocks before them; a hangover keeps it open across
+    pauses between words.
+    """
+
+    def __init__(self, sample_rate: int = VOICE_SAMPLE_RATE,
+                 block_size: int = VOICE_BLOCK_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.frame_size = VAD_FRAME_SIZE
+
+        block_seconds = block_size / sample_rate
+        self.hangover_blocks = max(1, round(VAD_HANGOVER / block_seconds))
+        self.pre_roll = deque(maxlen=max(1, round(VAD_PRE_ROLL / block_seconds)))
+
+        self.noise_floor = float(VAD_MIN_RMS)
+        self.hangover = 0
+        self.active = False
+
+        self.stats = {
+            'blocks_total': 0,
+            'blocks_gated': 0,
+            'blocks_forwarded': 0,
+            'utterances': 0
+        }
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        """Whether enough frames of a block look like speech."""
+        frames = len(samples) // self.frame_size
+        if not frames:
+            return False
+
+        x = samples[:frames * self.frame_size].astype(np.float32).reshape(frames, self.frame_size)
+        rms = np.sqrt(np.mean(x * x, axis=1))
+        zcr = np.mean(np.signbit(x[:, 1:]) != np.signbit(x[:, :-1]), axis=1)
+
+        threshold = max(VAD_MIN_RMS, self.noise_floor * VAD_NOISE_RATIO)
+        voiced = (rms > threshold) & (zcr >= VAD_ZCR_RANGE[0]) & (zcr <= VAD_ZCR_RANGE[1])
+        speech = np.mean(voiced) >= VAD_SPEECH_FRAME_RATIO
+
+        if not speech:
+            # Track background level only while nobody is talking
+            quiet = float(np.median(rms))
+            self.noise_floor += VAD_NOISE_ADAPTATION * (quiet - self.noise_floor)
+        return bool(speech)
+
+    def process(self, block: Union[bytes, np.ndarray]) -> Tuple[List[bytes], bool]:
+        """Gate one block of 16-bit mono PCM.
+
+        Returns the blocks to hand to the recognizer (pre-roll included when
+        speech starts) and whether an utterance just ended.
+        """
+        samples = np.frombuffer(block, dtype=np.int16)
+        self.stats['blocks_total'] += 1
+
+        if self.is_speech(samples):
+            self.hangover = self.hangover_blocks
+            if not self.active:
+                self.active = True
+                self.stats['utterances'] += 1
+                forward = list(self.pre_roll) + [bytes(block)]
+                self.stats['blocks_gated'] -= len(self.pre_roll)
+                self.pre_roll.clear()
+                self.stats['blocks_forwarded'] += len(forward)
+                return forward, False
+        elif self.active:
+            self.hangover -= 1
+            if self.hangover <= 0:
+                self.active = False
+                self.pre_roll.append(bytes(block))
+                self.stats['blocks_gated'] += 1
+                return [], True
+        else:
+            self.pre_roll.append(bytes(block))
+            self.stats['blocks_gated'] += 1
+            return [], False
+
+        self.stats['blocks_forwarded'] += 1
+        return [bytes(block)], False
+
+    def reset(self):
+        """Close the gate and forget buffered audio."""
+        self.active = False
+        self.hangover = 0
+        self.pre_roll.clear()
+
+    def get_statistics(self) -> Dict:
+        """Get gate statistics."""
+        total = self.stats['blocks_total']
+        return {
+            **self.stats,
+            'gated_ratio': self.stats['blocks_gated'] / total if total else 0.0,
+            'noise_floor': self.noise_floor
+        }
@@ -0,0 +1,249 @@
+# src/features/voice_benchmark.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import json
+import time
+import wave
+import logging
+import argparse
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, List, Tuple
+import numpy as np
+import vosk
+
+from src.constants import *
+from src.features.audio_processing import PolyphaseResampler
+from src.features.voice_commands import VoiceCommandListener, CommandMatcher, CommandMatch
+
+# A trigger counts for a label when it lands this long before/after the speech end
+MATCH_WINDOW = (-1.0, 2.0)
+
+@dataclass
+class Trigger:
+    """A command the listener fired while replaying a file."""
+    file: str
+    action: str
+    phrase: str
+    score: float
+    heard_at: float
+    fired_at: float
+    argument: Optional[int] = None
+
+@dataclass
+class BenchmarkConfig:
+    """Listener settings a benchmark run is made with."""
+    model: str
+    command_grammar: bool = VOICE_COMMAND_GRAMMAR
+    voice_gate: bool = VOICE_ACTIVITY_GATE
+    similarity_threshold: float = VOICE_COMMAND_SIMILARITY_THRESHOLD
+    partial_threshold: float = VOICE_PARTIAL_SIMILARITY_THRESHOLD
+    block_size: int = VOICE_BLOCK_SIZE
+
+def read_wav(path: Path) -> np.ndarray:
+    """Read a 16-bit WAV as mono int16 at the recognizer rate."""
+    with wave.open(str(path), 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path.name}: only 16-bit PCM is supported")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+    samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != VOICE_SAMPLE_RATE:
+        resampler = PolyphaseResampler(rate, VOICE_SAMPLE_RATE)
+        # Trailing zeros push the held-back context through the filter
+        samples = resampler.process(np.concatenate((samples, np.zeros(resampler.pad * 2))))
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+def load_labels(directory: Path) -> Dict[str, List[Dict]]:
+    """Labels from ``labels.json``: ``{"file.wav": [{"action": ..., "time": ...}]}``.
+
+    ``time`` is when the command's speech ends, in seconds from the start of
+    the file. WAV files without labels are negatives: any trigger in them is
+    a false trigger.
+    """
+    labels_path = directory / "labels.json"
+    labels = json.loads(labels_path.read_text()) if labels_path.exists() else {}
+    for wav_path in sorted(directory.glob("*.wav")):
+        labels.setdefault(wav_path.name, [])
+    return labels
+
+class VoiceBenchmark:
+    """Replays labelled WAV files through the voice command listener.
+
+    Each file gets a fresh VoiceCommandListener whose clock is the audio
+    position, so the gate, partial triggering and cooldown behave as they
+    would live while the files run as fast as the recognizer allows.
+    """
+
+    def __init__(self, model, config: BenchmarkConfig):
+        self.logger = logging.getLogger(__name__)
+        self.model = model
+        self.config = config
+        self.matcher = CommandMatcher(score_cutoff=config.similarity_threshold)
+
+    def run_file(self, path: Path) -> Tuple[List[Trigger], float]:
+        """Replay one file; returns its triggers and duration in seconds."""
+        samples = read_wav(path)
+        block_size = self.config.block_size
+        position = [0.0]
+        triggers: List[Trigger] = []
+
+        def on_command(match: CommandMatch, heard_at: float):
+            triggers.append(Trigger(
+                file=path.name,
+                action=match.action,
+                phrase=match.phrase,
+                score=match.score,
+                heard_at=heard_at,
+                fired_at=position[0],
+                argument=match.argument
+            ))
+
+        listener = VoiceCommandListener(
+            self.model,
+            on_command,
+            command_grammar=self.config.command_grammar,
+            voice_gate=self.config.voice_gate,
+            matcher=self.matcher,
+            partial_threshold=self.config.partial_threshold,
+            clock=lambda: position[0]
+        )
+
+        for start in range(0, len(samples), block_size):
+            block = samples[start:start + block_size]
+            # The block has been heard once it is fully fed
+            position[0] = (start + len(block)) / VOICE_SAMPLE_RATE
+            listener.process(block.tobytes())
+        listener.flush()
+
+        return triggers, len(samples) / VOICE_SAMPLE_RATE
+
+    def run(self, directory: Path) -> Dict:
+        """Replay every labelled file in ``directory`` and score the results."""
+        labels = load_labels(directory)
+        triggers: List[Trigger] = []
+        audio_seconds = 0.0
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        for name in labels:
+            file_triggers, duration = self.run_file(directory / name)
+            triggers.extend(file_triggers)
+            audio_seconds += duration
+            self.logger.info(f"{name}: {len(file_triggers)} triggers in {duration:.1f}s")
+        cpu_seconds = time.process_time() - cpu_start
+        wall_seconds = time.perf_counter() - wall_start
+
+        report = score(labels, triggers, audio_seconds)
+        audio_hours = audio_seconds / 3600
+        report["performance"] = {
+            "audio_seconds": audio_seconds,
+            "cpu_seconds": cpu_seconds,
+            "cpu_seconds_per_audio_hour": cpu_seconds / audio_hours if audio_hours else 0.0,
+            "realtime_factor": audio_seconds / wall_seconds if wall_seconds else 0.0
+        }
+        report["config"] = asdict(self.config)
+        return report
+
+def score(labels: Dict[str, List[Dict]], triggers: List[Trigger],
+          audio_seconds: float) -> Dict:
+    """Match triggers to labels and compute per-command accuracy and latency.
+
+    Each label is claimed by at most one trigger of the same action inside
+    MATCH_WINDOW around its time; every other trigger is a false trigger.
+    Latency is measured from the labelled end of speech to the trigger.
+    """
+    actions = sorted({t.action for t in triggers} |
+                     {l["action"] for file_labels in labels.values() for l in file_labels})
+    counts = {action: {"true_positives": 0, "false_positives": 0, "false_negatives": 0}
+              for action in actions}
+    latencies: Dict[str, List[float]] = {action: [] for action in actions}
+
+    by_file: Dict[str, List[Trigger]] = {}
+    for trigger in triggers:
+        by_file.setdefault(trigger.file, []).append(trigger)
+
+    for name, file_labels in labels.items():
+        unclaimed = sorted(by_file.get(name, []), key=lambda t: t.fired_at)
+        for label in file_labels:
+            hit = next((t for t in unclaimed if t.action == label["action"]
+                        and MATCH_WINDOW[0] <= t.fired_at - label["time"] <= MATCH_WINDOW[1]),
+                       None)
+            if hit is None:
+                counts[label["action"]]["false_negatives"] += 1
+                continue
+            unclaimed.remove(hit)
+            counts[label["action"]]["true_positives"] += 1
+            latencies[label["action"]].append(hit.fired_at - label["time"])
+        for trigger in unclaimed:
+            counts[trigger.action]["false_positives"] += 1
+
+    audio_hours = audio_seconds / 3600
+    commands = {}
+    for action in actions:
+        c = counts[action]
+        detected = c["true_positives"] + c["false_positives"]
+        expected = c["true_positives"] + c["false_negatives"]
+        commands[action] = {
+            **c,
+            "precision": c["true_positives"] / detected if detected else None,
+            "recall": c["true_positives"] / expected if expected else None,
+            "latency": latency_percentiles(latencies[action])
+        }
+
+    false_triggers = sum(c["false_positives"] for c in counts.values())
+    return {
+        "commands": commands,
+        "false_triggers": false_triggers,
+        "false_triggers_per_hour": false_triggers / audio_hours if audio_hours else 0.0,
+        "latency": latency_percentiles([l for values in latencies.values() for l in values]),
+        "files": len(labels)
+    }
+
+def latency_percentiles(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "count": len(values)}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay labelled WAV files through the voice command pipeline."
+    )
+    parser.add_argument("directory", type=Path, help="directory of .wav files and labels.json")
+    parser.add_argument("--model", required=True, help="path to a Vosk model")
+    parser.add_argument("--no-grammar", action="store_true", help="use free-form recognition")
+    parser.add_argument("--no-vad", action="store_true", help="disable the voice activity gate")
+    parser.add_argument("--threshold", type=float, default=VOICE_COMMAND_SIMILARITY_THRESHOLD,
+                        help="fuzzy match threshold for final results")
+    parser.add_argument("--partial-threshold", type=float,
+                        default=VOICE_PARTIAL_SIMILARITY_THRESHOLD,
+                        help="fuzzy match threshold for partial results")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    vosk.SetLogLevel(-1)
+    config = BenchmarkConfig(
+        model=Path(args.model).name,
+        command_grammar=not args.no_grammar,
+        voice_gate=not args.no_vad,
+        similarity_threshold=args.threshold,
+        partial_threshold=args.partial_threshold
+    )
+    report = VoiceBenchmark(vosk.Model(args.model), config).run(args.directory)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+# src/features/voice_commands.py
+import sys
+import re
+import json
+import time
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Dict, List, Callable
+import numpy as np
+import vosk
+from rapidfuzz import process, fuzz
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.constants import *
+from src.features.voice_activity import VoiceActivityGate
+
+# Spoken numbers the recognizer produces for clip durations
+NUMBER_WORDS: Dict[str, int] = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90
+}
+
+def parse_number(text: str) -> Optional[int]:
+    """Parse the first number in an utterance, as digits or English words.
+
+    Handles "45", "forty five", "ninety" and "one hundred twenty".
+    """
+    digits = re.search(r"\d+", text)
+    if digits:
+        return int(digits.group())
+
+    total = None
+    for word in text.lower().replace('-', ' ').split():
+        if word in NUMBER_WORDS:
+            value = NUMBER_WORDS[word]
+            if total is None:
+                total = value
+            elif total % 10 == 0 and total % 100 >= 20 and value < 10:
+                total += value  # "forty" + "five"
+            elif total >= 100 and total % 100 == 0 and value < 100:
+                total += value  # "one hundred" + "twenty"
+            else:
+                break
+        elif word == "hundred" and total is not None and total < 10:
+            total *= 100
+        elif word == "and" and total is not None:
+            continue
+        elif total is not None:
+            break
+
+    return total
+
+def build_command_grammar(commands: Dict[str, List[str]] = VOICE_COMMANDS) -> str:
+    """Vosk grammar covering the command phrases and spoken numbers.
+
+    Anything else decodes as ``[unk]``, so the recognizer only searches the
+    few words that can form a command.
+    """
+    phrases = []
+    for command_phrases in commands.values():
+        for phrase in command_phrases:
+            if phrase not in phrases:
+                phrases.append(phrase)
+
+    phrases.extend(NUMBER_WORDS)
+    phrases.extend(["hundred", "and", "seconds", "[unk]"])
+    return json.dumps(phrases)
+
+@dataclass
+class CommandMatch:
+    """A voice command recognized in an utterance."""
+    action: str
+    phrase: str
+    score: float
+    argument: Optional[int] = None
+
+class CommandMatcher:
+    """Matches utterances against every command phrase in one lookup.
+
+    All phrases are compiled once. An utterance is split into word n-grams
+    up to the longest phrase length, and the whole n-gram set is scored
+    against all phrases with a single ``rapidfuzz.process.cdist`` call.
+    Phrases of ``exact_actions`` only match word for word: near misses of
+    short control words ("cause", "smart") score as high as real clip
+    phrases do.
+    """
+
+    def __init__(self, commands: Dict[str, List[str]] = VOICE_COMMANDS,
+                 score_cutoff: float = VOICE_COMMAND_SIMILARITY_THRESHOLD,
+                 exact_actions: List[str] = VOICE_EXACT_COMMANDS):
+        self.score_cutoff = score_cutoff
+        self.phrases: List[str] = []
+        self.actions: List[str] = []
+        for action, phrases in commands.items():
+            for phrase in phrases:
+                self.phrases.append(phrase)
+                self.actions.append(action)
+
+        self.phrase_lengths = np.array([len(p.split()) for p in self.phrases])
+        self.exact = np.array([action in exact_actions for action in self.actions], dtype=bool)
+        self.max_words = int(self.phrase_lengths.max()) if self.phrases else 0
+
+    def _ngrams(self, words: List[str]) -> List[str]:
+        return [
+            " ".join(words[i:i + n])
+            for n in range(1, self.max_words + 1)
+            for i in range(len(words) - n + 1)
+        ]
+
+    def match(self, text: str, score_cutoff: Optional[float] = None) -> Optional[CommandMatch]:
+        """Best command in ``text``, with its spoken number for clip commands."""
+        ngrams = self._ngrams(text.lower().split())
+        if not ngrams or not self.phrases:
+            return None
+
+        cutoff = self.score_cutoff if score_cutoff is None else score_cutoff
+        scores = process.cdist(ngrams, self.phrases, scorer=fuzz.ratio,
+                               score_cutoff=0, dtype=np.float32)
+        # A match has to beat the cutoff; cdist's own cutoff keeps ties
+        scores[scores <= cutoff] = 0
+        controls = scores[:, self.exact]
+        controls[controls < 100] = 0
+        scores[:, self.exact] = controls
+        best = scores.max()
+        if best <= 0:
+            return None
+
+        # Among equally good matches prefer the longest phrase,
+        # so "stop recording" wins over "stop"
+        _, columns = np.nonzero(scores == best)
+        column = columns[np.argmax(self.phrase_lengths[columns])]
+
+        action = self.actions[column]
+        return CommandMatch(
+            action=action,
+            phrase=self.phrases[column],
+            score=float(best),
+            argument=parse_number(text) if action in VOICE_ARGUMENT_COMMANDS else None
+        )
+
+class VoiceCommandListener:
+    """The voice command pipeline: activity gate, recognizer and matcher.
+
+    Blocks of 16 kHz mono int16 audio go in; ``on_command(match, heard_at)``
+    is called for each command, where ``heard_at`` approximates the end of
+    speech on ``clock``. The Clipper drives it from the microphone; the
+    benchmark drives it from WAV files with an audio-time clock.
+    """
+
+    def __init__(self, model: vosk.Model,
+                 on_command: Callable[[CommandMatch, float], None],
+                 command_grammar: bool = VOICE_COMMAND_GRAMMAR,
+                 voice_gate: bool = VOICE_ACTIVITY_GATE,
+                 matcher: Optional[CommandMatcher] = None,
+                 partial_threshold: float = VOICE_PARTIAL_SIMILARITY_THRESHOLD,
+                 cooldown: float = VOICE_COMMAND_COOLDOWN,
+                 clock: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.on_command = on_command
+        self.command_grammar = command_grammar
+        self.matcher = matcher or CommandMatcher()
+        self.partial_threshold = partial_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+
+        if command_grammar:
+            self.recognizer = vosk.KaldiRecognizer(model, VOICE_SAMPLE_RATE, build_command_grammar())
+        else:
+            self.recognizer = vosk.KaldiRecognizer(model, VOICE_SAMPLE_RATE)
+        self.voice_gate = VoiceActivityGate() if voice_gate else None
+
+        # Partial-result triggering
+        self.last_partial = ""
+        self.partial_changed_at: Optional[float] = None
+        self.partial_repeats = 0
+        self.utterance_triggered = False
+        self.last_command_time = float('-inf')
+
+        self.stats = {
+            'partial_triggers': 0,
+            'final_triggers': 0
+        }
+
+    def process(self, data: bytes):
+        """Feed one block of audio through the pipeline."""
+        if not self.voice_gate:
+            self._feed_recognizer(data)
+            return
+
+        # Only speech-like audio reaches the recognizer
+        blocks, utterance_ended = self.voice_gate.process(data)
+        for block in blocks:
+            self._feed_recognizer(block)
+        if utterance_ended:
+            self.flush()
+
+    def flush(self):
+        """Finish the current utterance and reset the recognizer."""
+        self._handle_result(self.recognizer.FinalResult())
+        self.recognizer.Reset()
+
+    def _feed_recognizer(self, block: bytes):
+        """Decode one block, checking the partial result when no utterance ends."""
+        if self.recognizer.AcceptWaveform(block):
+            self._handle_result(self.recognizer.Result())
+        else:
+            self._handle_partial(self.recognizer.PartialResult())
+
+    def _handle_partial(self, result_json: str):
+        """Fire as soon as a stable partial result is a confident command.
+
+        A partial is stable once it is unchanged for a few blocks, i.e. the
+        speaker has stopped, which is well before Vosk's endpointer finalizes.
+        Commands that take a number wait for the final result instead: a
+        pause after "clip" or "clip forty" may still be followed by one.
+        """
+        text = json.loads(result_json).get("partial", "").lower().replace("[unk]", "").strip()
+        if not text:
+            return
+
+        if text != self.last_partial:
+            # Last change to the transcript approximates the end of speech
+            self.last_partial = text
+            self.partial_changed_at = self.clock()
+            self.partial_repeats = 1
+            return
+
+        self.partial_repeats += 1
+        if self.utterance_triggered or self.partial_repeats < VOICE_PARTIAL_STABLE_BLOCKS:
+            return
+
+        match = self._match(text, self.partial_threshold, partial=True)
+        if match:
+            self.logger.debug(f"Recognized (partial): {text}")
+            self.utterance_triggered = True
+            self.stats['partial_triggers'] += 1
+            self.on_command(match, self.partial_changed_at)
+
+    def _handle_result(self, result_json: str):
+        """Act on a final recognizer result."""
+        text = json.loads(result_json).get("text", "").lower().replace("[unk]", "").strip()
+        heard_at = self.partial_changed_at or self.clock()
+
+        # The utterance is over; a command already fired from its partial
+        triggered = self.utterance_triggered
+        self.utterance_triggered = False
+        self.last_partial = ""
+        self.partial_changed_at = None
+        if triggered or not text:
+            return
+
+        self.logger.debug(f"Recognized: {text}")
+        match = self._match(text)
+        if match:
+            self.stats['final_triggers'] += 1
+            self.on_command(match, heard_at)
+
+    def _match(self, text: str, threshold: Optional[float] = None,
+               partial: bool = False) -> Optional[CommandMatch]:
+        """Match a command unless one fired within the cooldown.
+
+        For a ``partial`` result, commands taking an argument are not
+        matched yet and do not start the cooldown.
+        """
+        now = self.clock()
+        if now - self.last_command_time < self.cooldown:
+            return None
+
+        match = self.matcher.match(text, threshold)
+        if match and partial and match.action in VOICE_ARGUMENT_COMMANDS:
+            return None
+        if match:
+            self.last_command_time = now
+        return match
+
+    def get_statistics(self) -> Dict:
+        """Get listener statistics."""
+        stats = dict(self.stats)
+        if self.voice_gate:
+            stats['voice_activity'] = self.voice_gate.get_statistics()
+        return stats
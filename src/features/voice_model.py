@@ -0,0 +1,46 @@
+# src/features/voice_model.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+import vosk
+
+logger = logging.getLogger(__name__)
+
+# Process-wide cache: every Clipper shares one loaded model per path
+_models: Dict[str, Future] = {}
+_models_lock = threading.Lock()
+_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vosk_loader")
+
+def _load(model_path: str) -> vosk.Model:
+    start = time.perf_counter()
+    model = vosk.Model(model_path)
+    logger.info(f"Loaded Vosk model {Path(model_path).name} in {time.perf_counter() - start:.2f}s")
+    return model
+
+def load_model(model_path: str) -> Future:
+    """Future for the Vosk model at ``model_path``, loading it in the background.
+
+    The first call starts the load; later calls return the same future, so
+    the model is read from disk once per process. A failed load is evicted
+    so the next call retries.
+    """
+    key = str(Path(model_path).resolve())
+    with _models_lock:
+        future = _models.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = _loader.submit(_load, key)
+            _models[key] = future
+        return future
+
+def clear_model_cache():
+    """Drop cached models (they are freed once no recognizer uses them)."""
+    with _models_lock:
+        _models.clear()
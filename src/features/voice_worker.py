@@ -0,0 +1,339 @@
+# src/features/voice_worker.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Optional, Dict, List, Tuple, Callable
+import numpy as np
+import vosk
+
+from src.constants import *
+from src.utils.error_handler import ErrorHandler
+from src.features.voice_commands import VoiceCommandListener, CommandMatch
+
+class SharedAudioRing:
+    """Single-producer ring of fixed-size audio blocks in shared memory.
+
+    The header holds the number of blocks ever written, followed by the
+    length of each slot. The writer fills a slot before publishing the new
+    count; the reader copies blocks out and then checks the count again,
+    discarding any block the writer may have lapped in the meantime.
+    """
+
+    def __init__(self, slots: int, block_bytes: int, name: Optional[str] = None):
+        self.slots = slots
+        self.block_bytes = block_bytes
+        self.owner = name is None
+
+        header = 8 + 4 * slots
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=header + slots * block_bytes
+        )
+        self.count = np.ndarray((1,), dtype=np.uint64, buffer=self.shm.buf)
+        self.lengths = np.ndarray((slots,), dtype=np.uint32, buffer=self.shm.buf, offset=8)
+        self.blocks = np.ndarray((slots, block_bytes), dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=header)
+        if self.owner:
+            self.count[0] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def write_count(self) -> int:
+        return int(self.count[0])
+
+    def write(self, data: bytes):
+        """Append one block, overwriting the oldest when the ring is full."""
+        block = np.frombuffer(data, dtype=np.uint8)[:self.block_bytes]
+        seq = int(self.count[0])
+        slot = seq % self.slots
+        self.blocks[slot, :len(block)] = block
+        self.lengths[slot] = len(block)
+        self.count[0] = seq + 1
+
+    def read(self, seq: int) -> Tuple[List[bytes], int, int]:
+        """Blocks from ``seq`` onwards: ``(blocks, next_seq, dropped)``."""
+        count = int(self.count[0])
+        # The slot after the newest block may be mid-write
+        dropped = max(0, count - seq - (self.slots - 1))
+        seq += dropped
+
+        blocks = []
+        while seq < count:
+            slot = seq % self.slots
+            data = self.blocks[slot, :self.lengths[slot]].tobytes()
+            if int(self.count[0]) - seq >= self.slots:
+                # Overwritten while copying
+                dropped += 1
+            else:
+                blocks.append(data)
+            seq += 1
+        return blocks, seq, dropped
+
+    def close(self):
+        if self.shm is None:
+            return
+        # Views must go before the mapping can be released
+        del self.count, self.lengths, self.blocks
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+def _worker_main(model_path: str, ring_name: str, slots: int, block_bytes: int,
+                 data_ready, stop_event, connection, command_grammar: bool,
+                 voice_gate: bool):
+    """Worker process: decode audio from the ring, send commands back."""
+    vosk.SetLogLevel(-1)
+
+    ring = SharedAudioRing(slots, block_bytes, name=ring_name)
+    try:
+        start = time.perf_counter()
+        model = vosk.Model(model_path)
+        listener = VoiceCommandListener(
+            model,
+            lambda match, heard_at: connection.send(("command", match, heard_at)),
+            command_grammar=command_grammar,
+            voice_gate=voice_gate
+        )
+        connection.send(("ready", time.perf_counter() - start))
+
+        # Audio written while the model loaded is stale
+        seq = ring.write_count
+        stats = {'blocks_processed': 0, 'blocks_dropped': 0}
+        last_health = 0.0
+
+        while not stop_event.is_set():
+            if data_ready.wait(timeout=VOICE_WORKER_HEALTH_INTERVAL / 2):
+                data_ready.clear()
+
+            blocks, seq, dropped = ring.read(seq)
+            stats['blocks_dropped'] += dropped
+            for block in blocks:
+                listener.process(block)
+            stats['blocks_processed'] += len(blocks)
+
+            now = time.time()
+            if now - last_health >= VOICE_WORKER_HEALTH_INTERVAL:
+                last_health = now
+                connection.send(("health", {
+                    **stats,
+                    **listener.get_statistics(),
+                    'pid': os.getpid(),
+                    'backlog': ring.write_count - seq,
+                    'cpu_seconds': time.process_time()
+                }))
+
+    except (EOFError, BrokenPipeError):
+        pass  # Main process went away
+    except Exception as e:
+        try:
+            connection.send(("error", f"{type(e).__name__}: {e}"))
+        except Exception:
+            pass
+        raise
+    finally:
+        ring.close()
+
+class VoiceWorker:
+    """Hosts the voice command listener in a supervised worker process.
+
+    Decoding then runs outside this process's GIL, so capture threads keep
+    their time slices. Audio blocks go to the worker through a shared-memory
+    ring and recognized commands come back over a pipe, where a monitor
+    thread dispatches them. The monitor restarts the worker when it exits
+    or stops sending heartbeats, and gives up after repeated failures.
+    """
+
+    def __init__(self, model_path: str,
+                 on_command: Callable[[CommandMatch, float], None],
+                 on_ready: Optional[Callable[[float], None]] = None,
+                 command_grammar: bool = VOICE_COMMAND_GRAMMAR,
+                 voice_gate: bool = VOICE_ACTIVITY_GATE,
+                 slots: int = VOICE_WORKER_RING_BLOCKS,
+                 block_size: int = VOICE_BLOCK_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self.error_handler = ErrorHandler(DEFAULT_LOGS_PATH)
+
+        self.model_path = model_path
+        self.on_command = on_command
+        self.on_ready = on_ready
+        self.command_grammar = command_grammar
+        self.voice_gate = voice_gate
+
+        # Spawn on every platform: forking a process with live capture
+        # threads can copy held locks into the child
+        self.context = multiprocessing.get_context("spawn")
+        self.ring = SharedAudioRing(slots, block_size * 2)
+        self.data_ready = self.context.Event()
+
+        self.process = None
+        self.connection = None
+        self.stop_event = None
+        self.monitor_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+        self.ready = False
+        self.failed = False
+        self.failures = 0  # Consecutive failures since the worker was last ready
+        self.last_heartbeat = 0.0
+        self.health: Dict = {}
+        self.last_error: Optional[str] = None
+        self.stats = {
+            'starts': 0,
+            'restarts': 0,
+            'crashes': 0,
+            'hangs': 0,
+            'commands': 0,
+            'load_time': 0.0
+        }
+
+    def start(self):
+        """Start the worker process and its monitor."""
+        if self.monitor_thread and self.monitor_thread.is_alive():
+            return
+        self._stopping.clear()
+        self.failed = False
+        self._spawn()
+        self.monitor_thread = threading.Thread(
+            target=self._monitor, name="voice_worker_monitor", daemon=True
+        )
+        self.monitor_thread.start()
+
+    def _spawn(self):
+        receive, send = self.context.Pipe(duplex=False)
+        self.stop_event = self.context.Event()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(self.model_path, self.ring.name, self.ring.slots, self.ring.block_bytes,
+                  self.data_ready, self.stop_event, send,
+                  self.command_grammar, self.voice_gate),
+            name="voice_worker",
+            daemon=True
+        )
+        self.process.start()
+        # Only the child holds the send end, so recv() fails once it exits
+        send.close()
+        self.connection = receive
+        self.ready = False
+        self.stats['starts'] += 1
+        self.logger.info(f"Voice worker started (pid {self.process.pid})")
+
+    def write(self, data: bytes):
+        """Hand one block of 16 kHz mono int16 audio to the worker."""
+        self.ring.write(data)
+        self.data_ready.set()
+
+    def _monitor(self):
+        """Dispatch worker messages and restart the worker when it fails."""
+        while not self._stopping.is_set():
+            try:
+                if self.connection.poll(0.5):
+                    self._handle_message(self.connection.recv())
+                    continue
+            except (EOFError, OSError):
+                self.process.join(timeout=1.0)
+
+            if self._stopping.is_set():
+                break
+
+            if not self.process.is_alive():
+                self.stats['crashes'] += 1
+                self.logger.error(
+                    f"Voice worker exited with code {self.process.exitcode}"
+                    + (f": {self.last_error}" if self.last_error else "")
+                )
+            elif self.ready and time.time() - self.last_heartbeat > VOICE_WORKER_HEALTH_TIMEOUT:
+                self.stats['hangs'] += 1
+                self.logger.error("Voice worker stopped responding; restarting it")
+                self.process.kill()
+                self.process.join()
+            else:
+                continue
+
+            if not self._restart():
+                break
+
+    def _restart(self) -> bool:
+        """Replace a failed worker after a backoff; False once giving up."""
+        self.ready = False
+        self.failures += 1
+        self.connection.close()
+        if self.failures > VOICE_WORKER_MAX_RESTARTS:
+            self.failed = True
+            self.logger.error("Voice worker failed repeatedly; voice commands disabled")
+            return False
+
+        # Exponential backoff, interrupted by stop()
+        if self._stopping.wait(min(2 ** (self.failures - 1), 30)):
+            return False
+        self.stats['restarts'] += 1
+        self._spawn()
+        return True
+
+    def _handle_message(self, message: Tuple):
+        kind, *payload = message
+        if kind == "command":
+            match, heard_at = payload
+            self.stats['commands'] += 1
+            try:
+                self.on_command(match, heard_at)
+            except Exception as e:
+                self.error_handler.handle_error(e, context="Voice worker command")
+        elif kind == "health":
+            self.health = payload[0]
+            self.last_heartbeat = time.time()
+        elif kind == "ready":
+            self.ready = True
+            self.failures = 0
+            self.last_heartbeat = time.time()
+            self.stats['load_time'] = payload[0]
+            self.logger.info(f"Voice worker ready in {payload[0]:.2f}s")
+            if self.on_ready:
+                self.on_ready(payload[0])
+        elif kind == "error":
+            self.last_error = payload[0]
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the worker and release the shared ring."""
+        try:
+            self._stopping.set()
+            if self.stop_event:
+                self.stop_event.set()
+            if self.monitor_thread:
+                self.monitor_thread.join(timeout)
+            if self.process:
+                self.process.join(timeout)
+                if self.process.is_alive():
+                    self.process.terminate()
+                    self.process.join()
+            if self.connection:
+                self.connection.close()
+            self.ring.close()
+            self.ready = False
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Stopping voice worker")
+
+    def get_statistics(self) -> Dict:
+        """Get worker health and statistics."""
+        return {
+            **self.stats,
+            'alive': bool(self.process and self.process.is_alive()),
+            'ready': self.ready,
+            'failed': self.failed,
+            'pid': self.process.pid if self.process else None,
+            'heartbeat_age': time.time() - self.last_heartbeat if self.last_heartbeat else None,
+            'last_error': self.last_error,
+            'worker': self.health
+        }
@@ -0,0 +1,60 @@
+# tests/test_audio.py
+import pytest
+import numpy as np
+from src.features.audio_processing import PolyphaseResampler
+from src.utils.audio_manager import AudioTap, AudioFrame
+
+class TestPolyphaseResampler:
+    def test_chunked_output_has_no_seams(self):
+        """Test irregular chunks resample to the same samples as one long call."""
+        rng = np.random.default_rng(0)
+        samples = rng.uniform(-0.5, 0.5, 44100).astype(np.float32)
+
+        whole = PolyphaseResampler(44100, 16000).process(samples)
+
+        resampler = PolyphaseResampler(44100, 16000)
+        pieces = []
+        for chunk in np.array_split(samples, [513, 1024, 4000, 4001, 20000, 30000]):
+            pieces.append(resampler.process(chunk))
+        chunked = np.concatenate(pieces)
+
+        assert len(chunked) == len(whole)
+        assert np.allclose(chunked, whole, atol=1e-5)
+
+    def test_reset_starts_a_new_stream(self):
+        """Test reset drops buffered input."""
+        resampler = PolyphaseResampler(48000, 16000)
+        first = resampler.process(np.ones(9600, dtype=np.float32))
+        resampler.reset()
+        assert np.array_equal(resampler.process(np.ones(9600, dtype=np.float32)), first)
+
+    def test_equal_rates_pass_through(self):
+        """Test a microphone already at the target rate is passed through unchanged."""
+        samples = np.linspace(-1, 1, 1600, dtype=np.float32)
+        assert np.allclose(PolyphaseResampler(16000, 16000).process(samples), samples)
+
+class TestAudioTap:
+    def test_reads_fixed_size_mono_blocks(self):
+        """Test stereo capture chunks come out as exact int16 mono blocks."""
+        tap = AudioTap(48000, channels=2, target_rate=16000, block_size=1000)
+        stereo = np.zeros((4800, 2), dtype=np.float32)
+        stereo[:, 0] = 0.5  # Left only: the mono mix is 0.25
+        for i in range(5):
+            tap.push(AudioFrame(stereo.tobytes(), i * 0.1, i, 2, 4, 48000))
+
+        blocks = []
+        while (block := tap.read(timeout=0.01)) is not None:
+            blocks.append(np.frombuffer(block, dtype=np.int16))
+
+        # 0.5 s in, less the resampler's look-ahead
+        assert len(blocks) == 7
+        assert all(len(block) == 1000 for block in blocks)
+        assert np.allclose(blocks[-1], 0.25 * 32767, atol=50)
+
+    def test_full_queue_drops_chunks_without_blocking(self):
+        """Test the capture side never waits on a slow consumer."""
+        tap = AudioTap(16000, channels=1, queue_size=2)
+        frame = AudioFrame(np.zeros(160, dtype=np.float32).tobytes(), 0.0, 0, 1, 4, 16000)
+        for _ in range(5):
+            tap.push(frame)
+        assert tap.chunks_dropped == 3
@@ -1,7 +1,24 @@
 # tests/test_clipper.py
 import pytest
+import json
 import time
+import threading
+from pathlib import Path
 import numpy as np
+from src.utils.replay_buffer import (
+    FrameRingBuffer, CompressedFrameRingBuffer, MappedFrameRingBuffer, AudioRingBuffer,
+    SegmentReplayBuffer, ReplaySegment
+)
+from src.utils import replay_buffer
+from src.clipper import Clipper
+from src.features import voice_commands, voice_model
+from src.features.voice_commands import (
+    parse_number, build_command_grammar, CommandMatcher, VoiceCommandListener
+)
+from src.features.voice_activity import VoiceActivityGate
+from src.features.voice_benchmark import Trigger, score
+from src.features.voice_worker import SharedAudioRing
+from src.utils.encoder_sink import frame_bytes, pix_fmt_for_frame
 
 class TestClipper:
     def test_voice_detection(self, clipper):
@@ -15,10 +32,10 @@ class TestClipper:
     def test_clip_creation(self, clipper, temp_dir):
         """Test clip creation."""
         # Simulate frame buffer
-        frame_size = (1920, 1080, 3)
-        for _ in range(30 * 30):  # 30 seconds at 30 fps
+        frame_size = (1080, 1920, 3)
+        for i in range(30 * 30):  # 30 seconds at 30 fps
             frame = np.random.randint(0, 255, frame_size, dtype=np.uint8)
-            clipper.frame_buffer.append(frame.tobytes())
+            clipper.add_frame(frame, i / 30)
 
         # Create clip
         clipper.save_clip()
@@ -30,10 +47,474 @@ class TestClipper:
     def test_buffer_management(self, clipper):
         """Test buffer management."""
         # Fill buffer
-        frame_size = (1920, 1080, 3)
-        for _ in range(35 * 30):  # Overflow the 30-second buffer
+        frame_size = (1080, 1920, 3)
+        for i in range(35 * 30):  # Overflow the 30-second buffer
             frame = np.random.randint(0, 255, frame_size, dtype=np.uint8)
-            clipper.frame_buffer.append(frame.tobytes())
+            clipper.add_frame(frame, i / 30)
 
         # Check buffer size
-        assert len(clipper.frame_buffer) == 30 * 30  # Should maintain 30 seconds
\ No newline at end of file
+        assert len(clipper.frame_buffer) == 30 * 30  # Should maintain 30 seconds
+
+    def test_post_roll_merges_commands(self, clipper):
+        """Test overlapping clip commands extend one post-roll window."""
+        clipper.post_roll = 1
+        frame = np.zeros((2, 2, 3), dtype=np.uint8)
+        for i in range(30):
+            clipper.add_frame(frame, i / 30)
+
+        assert clipper.request_clip()
+        first_end = clipper.pending_job.end_time
+        clipper.add_frame(frame, 1.0)
+        assert clipper.request_clip()
+
+        assert clipper.clips_merged == 1
+        assert clipper.pending_job.end_time > first_end
+
+    def test_spoken_clip_duration(self):
+        """Test clip durations are parsed from digits and number words."""
+        assert parse_number("clip 45") == 45
+        assert parse_number("clip forty five") == 45
+        assert parse_number("clip one hundred twenty") == 120
+        assert parse_number("clip that") is None
+
+    def test_command_grammar(self):
+        """Test the recognizer grammar covers commands, numbers and unknowns."""
+        grammar = json.loads(build_command_grammar())
+        assert "clip that" in grammar
+        assert "forty" in grammar and "five" in grammar
+        assert grammar[-1] == "[unk]"
+        assert len(grammar) == len(set(grammar))
+
+    def test_command_matcher(self):
+        """Test multi-word phrases and clip durations are matched in one lookup."""
+        matcher = CommandMatcher()
+        match = matcher.match("okay stop recording now")
+        assert (match.action, match.phrase) == ("stop", "stop recording")
+        assert matcher.match("clip that forty five").argument == 45
+        assert matcher.match("nice shot") is None
+
+    def test_matcher_rejects_scores_at_cutoff(self):
+        """Test one-letter near misses scoring exactly the cutoff do not trigger."""
+        matcher = CommandMatcher()
+        for word in ("flip", "slip", "chip", "klip"):
+            assert matcher.match(word) is None, word
+        assert matcher.match("clipt").action == "clip"  # 89, above the cutoff
+
+    def test_recording_controls_need_exact_words(self):
+        """Test near misses of start/stop/pause/resume do not control the recording."""
+        matcher = CommandMatcher()
+        for text in ("cause", "smart", "stark", "top", "step", "shop", "resumed",
+                     "just cause recording"):
+            assert matcher.match(text) is None, text
+        assert matcher.match("pause").action == "pause"
+        assert matcher.match("please start recording").phrase == "start recording"
+        assert matcher.match("clip dat").action == "clip"  # Clip phrases stay fuzzy
+
+class TestFrameRingBuffer:
+    def test_wraparound_order(self):
+        """Test frames come back oldest first after the ring wraps."""
+        ring = FrameRingBuffer(4)
+        for i in range(6):
+            ring.append(np.full((2, 2, 3), i, dtype=np.uint8), float(i))
+
+        assert len(ring) == 4
+        assert [int(frame[0, 0, 0]) for frame in ring] == [2, 3, 4, 5]
+        assert list(ring.get_timestamps()) == [2.0, 3.0, 4.0, 5.0]
+
+    def test_resize_keeps_newest(self):
+        """Test shrinking keeps the newest frames."""
+        ring = FrameRingBuffer(4)
+        for i in range(4):
+            ring.append(np.full((2, 2, 3), i, dtype=np.uint8), float(i))
+
+        ring.resize(2)
+        assert ring.maxlen == 2
+        assert [int(frame[0, 0, 0]) for frame in ring] == [2, 3]
+
+    def test_snapshot_survives_reserve(self):
+        """Test a snapshot stays resident until capture laps the reserve."""
+        ring = FrameRingBuffer(4, reserve=2)
+        for i in range(4):
+            ring.append(np.full((2, 2, 3), i, dtype=np.uint8), float(i))
+
+        snapshot = ring.snapshot()
+        for i in range(4, 6):
+            ring.append(np.full((2, 2, 3), i, dtype=np.uint8), float(i))
+
+        assert all(ring.is_resident(seq, generation=snapshot.generation)
+                   for seq in range(snapshot.start, snapshot.end))
+        assert int(ring.frame_at(snapshot.start)[0, 0, 0]) == 0
+
+        ring.append(np.full((2, 2, 3), 6, dtype=np.uint8), 6.0)
+        assert not ring.is_resident(snapshot.start)
+
+    def test_snapshot_frames_near_overwrite_are_copied(self):
+        """Test the pipe writer gets slot views far from capture, copies near it, None once lapped."""
+        ring = FrameRingBuffer(60, reserve=10)
+        for i in range(70):
+            ring.append(np.full((2, 2, 3), i, dtype=np.uint8), float(i))
+        generation = ring.generation
+
+        deep = Clipper._resolve_snapshot_frame(ring, 69, generation)
+        assert np.shares_memory(deep, ring.frame_at(69))
+
+        edge = Clipper._resolve_snapshot_frame(ring, 1, generation)
+        assert not np.shares_memory(edge, ring.frame_at(1))
+        ring.append(np.full((2, 2, 3), 70, dtype=np.uint8), 70.0)
+        assert int(edge[0, 0, 0]) == 1
+
+        assert Clipper._resolve_snapshot_frame(ring, 0, generation) is None
+        assert Clipper._resolve_snapshot_frame(ring, 69, generation + 1) is None
+
+    def test_find_range_by_timestamp(self):
+        """Test the last N seconds are located across the wrap point."""
+        ring = FrameRingBuffer(10)
+        for i in range(15):
+            ring.append(np.full((2, 2, 3), i, dtype=np.uint8), i * 0.5)
+
+        window = ring.find_range(4.0, 6.0)
+        assert len(window) == 5
+        assert [ring.timestamp_at(seq) for seq in range(window.start, window.end)] == \
+            [4.0, 4.5, 5.0, 5.5, 6.0]
+
+class TestCompressedFrameRingBuffer:
+    def test_png_round_trip(self):
+        """Test lossless frames decode unchanged, newest window only."""
+        ring = CompressedFrameRingBuffer(4, codec="png", workers=4)
+        frames = [np.random.randint(0, 255, (16, 16, 3), dtype=np.uint8) for _ in range(6)]
+        for i, frame in enumerate(frames):
+            ring.append(frame, i / 30)
+
+        decoded = ring.get_frames()
+        ring.close()
+        assert len(decoded) == 4
+        assert all(np.array_equal(a, b) for a, b in zip(decoded, frames[2:]))
+
+class TestMappedFrameRingBuffer:
+    def test_frames_live_in_ring_file(self, temp_dir):
+        """Test frames and the cursor are stored in the mapped file."""
+        ring = MappedFrameRingBuffer(4, cache_dir=temp_dir)
+        for i in range(6):
+            ring.append(np.full((2, 2, 3), i, dtype=np.uint8), i / 30)
+
+        assert ring.path.exists()
+        assert int(ring.header['write_count'][0]) == 6
+        assert [int(frame[0, 0, 0]) for frame in ring] == [2, 3, 4, 5]
+
+        ring.close()
+        assert not ring.path.exists()
+
+class TestAudioRingBuffer:
+    def test_window_is_sample_accurate(self):
+        """Test a time window maps onto exact samples across the wrap point."""
+        ring = AudioRingBuffer(duration=1, sample_rate=10, channels=2)
+        for chunk in range(4):
+            ring.append(np.full(8, chunk, dtype=np.int16).tobytes(), chunk * 0.4)
+
+        assert len(ring) == ring.maxlen == 10
+        window = ring.find_range(0.8, 1.2)
+        assert (window.start, window.end) == (8, 12)
+
+        views = ring.get_views(window.start, window.end)
+        assert len(views) == 2  # Split at the wrap point
+        assert np.concatenate(views).tolist() == [[2, 2]] * 4
+
+    def test_time_at_inverts_sample_at(self):
+        """Test sample positions map back to their capture time."""
+        ring = AudioRingBuffer(duration=1, sample_rate=10, channels=2)
+        for chunk in range(4):
+            ring.append(np.full(8, chunk, dtype=np.int16).tobytes(), chunk * 0.4)
+
+        assert ring.time_at(ring.sample_at(1.0)) == pytest.approx(1.0)
+        assert ring.time_at(9) == pytest.approx(0.9)
+
+class TestSegmentReplayBuffer:
+    def test_export_shifts_audio_to_first_segment(self, temp_dir, monkeypatch):
+        """Test clip audio is offset by its distance from the first copied segment."""
+        commands = []
+        monkeypatch.setattr(replay_buffer.subprocess, "run",
+                            lambda command, **kwargs: commands.append(command))
+        buffer = SegmentReplayBuffer(duration=4, segment_length=2, cache_dir=str(temp_dir))
+        buffer.cache_dir.mkdir(parents=True)
+        buffer.segments.extend([
+            ReplaySegment(buffer.cache_dir / "segment_000001.ts", 10.0, 11.9),
+            ReplaySegment(buffer.cache_dir / "segment_000002.ts", 12.0, 13.9)
+        ])
+        audio = temp_dir / "audio.wav"
+        audio.touch()
+
+        assert buffer.export_clip(temp_dir / "clip.mp4", audio, 11.5, 13.9, audio_start=10.5)
+        command = commands[-1]
+        assert command[command.index('-itsoffset') + 1] == '0.500000'
+        assert command.index('-itsoffset') < command.index(str(audio))
+
+    def test_leased_segments_outlive_expiry(self, temp_dir):
+        """Test expired segments an export still reads are deleted only on release."""
+        buffer = SegmentReplayBuffer(duration=4, segment_length=2, cache_dir=str(temp_dir))
+        buffer.cache_dir.mkdir(parents=True)
+
+        def finish_segments(numbers):
+            with open(buffer.list_file, 'a') as f:
+                for n in numbers:
+                    (buffer.cache_dir / f"segment_{n:06d}.ts").touch()
+                    f.write(f"segment_{n:06d}.ts,{n * 2}.0,{n * 2 + 2}.0\n")
+            buffer._refresh_segments()
+
+        finish_segments(range(3))
+        leased = buffer.lease_segments()
+        assert len(leased) == buffer.max_segments == 3
+
+        finish_segments(range(3, 5))
+        assert len(buffer.segments) == 3
+        assert all(segment.path.exists() for segment in leased)
+
+        buffer.release_segments(leased)
+        assert [segment.path.exists() for segment in leased] == [False, False, True]
+        assert buffer.get_statistics()['retired_segments'] == 0
+
+    def test_expired_segments_are_deleted_with_capture_times(self, temp_dir):
+        """Test only the newest segments stay on disk, timed by their capture timestamps."""
+        buffer = SegmentReplayBuffer(duration=4, segment_length=2, cache_dir=str(temp_dir), fps=10)
+        buffer.cache_dir.mkdir(parents=True)
+        # Encoder frame n was captured at 100 + n / 10 seconds
+        buffer._frame_times.extend(100 + n / 10 for n in range(100))
+        buffer._frames_written = 100
+
+        with open(buffer.list_file, 'w') as f:
+            for n in range(5):
+                (buffer.cache_dir / f"segment_{n:06d}.ts").touch()
+                f.write(f"segment_{n:06d}.ts,{n * 2}.000000,{n * 2 + 2}.000000\n")
+            f.write("segment_000005.ts,10.0")  # Still being written
+        buffer._refresh_segments()
+
+        assert [s.path.name for s in buffer.segments] == [
+            "segment_000002.ts", "segment_000003.ts", "segment_000004.ts"
+        ]
+        assert not (buffer.cache_dir / "segment_000000.ts").exists()
+        assert not (buffer.cache_dir / "segment_000001.ts").exists()
+        assert buffer.segments[0].start_time == pytest.approx(104.0)
+        assert buffer.segments[0].end_time == pytest.approx(105.9)
+        assert buffer.get_statistics()['buffered_duration'] == pytest.approx(5.9)
+
+    def test_concurrent_refreshes_add_each_segment_once(self, temp_dir, monkeypatch):
+        """Test capture and save worker refreshing together never duplicate a segment."""
+        buffer = SegmentReplayBuffer(duration=4, segment_length=2, cache_dir=str(temp_dir))
+        buffer.cache_dir.mkdir(parents=True)
+        with open(buffer.list_file, 'w') as f:
+            for n in range(3):
+                (buffer.cache_dir / f"segment_{n:06d}.ts").touch()
+                f.write(f"segment_{n:06d}.ts,{n * 2}.0,{n * 2 + 2}.0\n")
+
+        # Widen the window between reading the list and consuming its lines
+        class SlowList:
+            def __init__(self, *args):
+                self.file = open(*args)
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                self.file.close()
+            def seek(self, position):
+                self.file.seek(position)
+            def readlines(self):
+                lines = self.file.readlines()
+                time.sleep(0.05)
+                return lines
+        monkeypatch.setattr(replay_buffer, "open", SlowList, raising=False)
+        threads = [threading.Thread(target=buffer._refresh_segments) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [s.path.name for s in buffer.segments] == [
+            f"segment_{n:06d}.ts" for n in range(3)
+        ]
+        assert all(s.path.exists() for s in buffer.segments)
+
+    def test_export_copies_only_segments_in_window(self, temp_dir, monkeypatch):
+        """Test a clip window maps onto the whole segments that overlap it."""
+        concat_lists = []
+        def run(command, **kwargs):
+            concat_lists.append(Path(command[command.index('-i') + 1]).read_text())
+        monkeypatch.setattr(replay_buffer.subprocess, "run", run)
+
+        buffer = SegmentReplayBuffer(duration=6, segment_length=2, cache_dir=str(temp_dir))
+        buffer.cache_dir.mkdir(parents=True)
+        buffer.segments.extend(
+            ReplaySegment(buffer.cache_dir / f"segment_{n:06d}.ts", 10.0 + 2 * n, 11.9 + 2 * n)
+            for n in range(4)
+        )
+
+        assert buffer.export_clip(temp_dir / "clip.mp4", start_time=12.5, end_time=15.0)
+        assert [line.split('/')[-1] for line in concat_lists[0].splitlines()] == [
+            "segment_000001.ts'", "segment_000002.ts'"
+        ]
+        assert not buffer._leases  # Released after the export
+        assert not list(buffer.cache_dir.glob("concat_*.txt"))
+
+class ScriptedRecognizer:
+    """Stands in for vosk.KaldiRecognizer: each block yields the next scripted result."""
+    script = []
+
+    def __init__(self, *args):
+        self.results = list(self.script)
+        self.current = ("partial", "")
+
+    def AcceptWaveform(self, block):
+        self.current = self.results.pop(0) if self.results else ("partial", "")
+        return self.current[0] == "final"
+
+    def PartialResult(self):
+        return json.dumps({"partial": self.current[1]})
+
+    def Result(self):
+        return json.dumps({"text": self.current[1]})
+
+    def FinalResult(self):
+        return json.dumps({"text": ""})
+
+    def Reset(self):
+        pass
+
+class TestVoiceCommandListener:
+    @pytest.fixture
+    def listen(self, monkeypatch):
+        """Run a recognizer script through a listener; returns (listener, commands, clock)."""
+        def run(script, start=0.0):
+            monkeypatch.setattr(ScriptedRecognizer, "script", script)
+            monkeypatch.setattr(voice_commands.vosk, "KaldiRecognizer", ScriptedRecognizer)
+            now = [start]
+            commands = []
+            listener = VoiceCommandListener(
+                None, lambda match, heard_at: commands.append((match.action, match.argument, heard_at)),
+                command_grammar=False, voice_gate=False, clock=lambda: now[0]
+            )
+            for _ in script:
+                listener.process(b"")
+                now[0] += 0.25
+            return listener, commands, now
+        return run
+
+    def test_stable_partial_fires_once_before_final(self, listen):
+        """Test a repeated partial fires early, timed at its first appearance, and the final is ignored."""
+        listener, commands, _ = listen([
+            ("partial", "stop"), ("partial", "stop recording"), ("partial", "stop recording"),
+            ("partial", "stop recording"), ("final", "stop recording")
+        ])
+        assert commands == [("stop", None, 0.25)]
+        assert listener.get_statistics() == {'partial_triggers': 1, 'final_triggers': 0}
+
+    def test_changing_partial_waits_for_final(self, listen):
+        """Test a transcript that keeps changing only triggers on the final result."""
+        listener, commands, _ = listen([
+            ("partial", "stop"), ("partial", "stop recording"), ("final", "stop recording")
+        ])
+        assert commands == [("stop", None, 0.25)]
+        assert listener.get_statistics()['final_triggers'] == 1
+
+    def test_clip_waits_for_its_spoken_duration(self, listen):
+        """Test a stable "clip" partial does not fire before the number that follows it."""
+        listener, commands, _ = listen([
+            ("partial", "clip"), ("partial", "clip"), ("partial", "clip"),
+            ("partial", "clip forty"), ("partial", "clip forty"), ("partial", "clip forty"),
+            ("partial", "clip forty five"), ("partial", "clip forty five"),
+            ("final", "clip forty five")
+        ])
+        assert commands == [("clip", 45, 1.5)]  # Timed at the last transcript change
+        assert listener.get_statistics() == {'partial_triggers': 0, 'final_triggers': 1}
+
+    def test_cooldown_suppresses_repeat_commands(self, listen):
+        """Test a second command inside the cooldown is dropped, and allowed after it."""
+        script = [("final", "clip")] * 2 + [("partial", "")] * 7 + [("final", "clip")]
+        listener, commands, _ = listen(script)
+        assert [heard_at for _, _, heard_at in commands] == [0.0, 2.25]
+
+class TestVoiceModelCache:
+    def test_model_loads_once_and_failures_are_retried(self, temp_dir, monkeypatch):
+        """Test one load per path is shared, and a failed load is evicted so the next call retries."""
+        loads = []
+        def model(path):
+            loads.append(path)
+            if len(loads) == 1:
+                raise OSError("model files missing")
+            return f"model:{path}"
+        monkeypatch.setattr(voice_model.vosk, "Model", model)
+        voice_model.clear_model_cache()
+        try:
+            failed = voice_model.load_model(str(temp_dir / "model"))
+            with pytest.raises(OSError):
+                failed.result(timeout=5)
+
+            loaded = voice_model.load_model(str(temp_dir / "model"))
+            assert loaded is not failed
+            assert loaded.result(timeout=5) == f"model:{(temp_dir / 'model').resolve()}"
+
+            # Same path, relative spelling or not, shares the cached load
+            assert voice_model.load_model(str(temp_dir / "x" / ".." / "model")) is loaded
+            assert len(loads) == 2
+        finally:
+            voice_model.clear_model_cache()
+
+class TestVoiceActivityGate:
+    def test_gates_silence_and_forwards_speech(self):
+        """Test quiet blocks are held back and speech opens the gate with pre-roll."""
+        gate = VoiceActivityGate(sample_rate=16000, block_size=4096)
+        rng = np.random.default_rng(0)
+        silence = (rng.normal(0, 20, 4096)).astype(np.int16).tobytes()
+        t = np.arange(4096) / 16000
+        speech = (4000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+
+        for _ in range(10):
+            assert gate.process(silence) == ([], False)
+
+        blocks, ended = gate.process(speech)
+        assert blocks[-1] == speech and len(blocks) > 1  # Pre-roll comes first
+        assert not ended
+
+        ended = [gate.process(silence)[1] for _ in range(gate.hangover_blocks)]
+        assert ended[-1]
+        assert gate.get_statistics()['utterances'] == 1
+
+class TestVoiceBenchmark:
+    def test_scoring(self):
+        """Test triggers are matched to labels within the window."""
+        labels = {
+            "commands.wav": [{"action": "clip", "time": 2.0}, {"action": "clip", "time": 10.0}],
+            "gameplay.wav": []
+        }
+        triggers = [
+            Trigger("commands.wav", "clip", "clip that", 100, 2.2, 2.3),
+            Trigger("gameplay.wav", "clip", "clip", 80, 30.0, 30.1)
+        ]
+        report = score(labels, triggers, audio_seconds=1800)
+
+        clip = report["commands"]["clip"]
+        assert (clip["true_positives"], clip["false_positives"], clip["false_negatives"]) == (1, 1, 1)
+        assert clip["precision"] == 0.5 and clip["recall"] == 0.5
+        assert report["false_triggers_per_hour"] == 2
+        assert report["latency"]["p50"] == pytest.approx(0.3)
+
+class TestSharedAudioRing:
+    def test_reader_skips_lapped_blocks(self):
+        """Test a reader that falls a full ring behind resumes at the oldest safe block."""
+        ring = SharedAudioRing(slots=4, block_bytes=8)
+        reader = SharedAudioRing(slots=4, block_bytes=8, name=ring.name)
+        try:
+            for i in range(6):
+                ring.write(bytes([i]) * 8)
+
+            blocks, seq, dropped = reader.read(0)
+            assert [b[0] for b in blocks] == [3, 4, 5]
+            assert (seq, dropped) == (6, 3)
+            assert reader.read(seq) == ([], 6, 0)
+        finally:
+            reader.close()
+            ring.close()
+
+class TestPixelFormats:
+    def test_capture_layouts_map_to_encoder_input(self):
+        """Test capture frames are declared in their own layout and sized correctly."""
+        assert pix_fmt_for_frame(np.zeros((1080, 1920, 4), dtype=np.uint8)) == 'bgra'
+        assert pix_fmt_for_frame(np.zeros((1080, 1920, 3), dtype=np.uint8)) == 'bgr24'
+        assert frame_bytes(1920, 1080, 'bgr24') == 1920 * 1080 * 3
+        assert frame_bytes(1920, 1080, 'yuv420p') * 2 == frame_bytes(1920, 1080, 'bgr24')
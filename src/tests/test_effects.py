@@ -0,0 +1,26 @@
+# tests/test_effects.py
+import pytest
+import numpy as np
+from src.features.effects import EffectsManager, to_bgr
+
+class TestEffectsManager:
+    def test_bgra_capture_frames_are_processed_as_bgr(self):
+        """Test 4-channel screen frames go through HSV effects and come out BGR."""
+        frame = np.zeros((72, 128, 4), dtype=np.uint8)
+        frame[..., 1] = 255  # Pure green, opaque
+        frame[..., 3] = 255
+
+        manager = EffectsManager()
+        manager.effect_chain = ['Color Correction', 'Chroma Key']
+        result = manager.process_frame(frame)
+
+        assert result.shape == (72, 128, 3)
+        assert not result.any()  # The green screen was keyed out
+        assert frame[..., 1].all()  # Input untouched
+
+    def test_bgr_frames_are_copied(self):
+        """Test 3-channel frames keep their layout and are not modified in place."""
+        frame = np.full((4, 4, 3), 7, dtype=np.uint8)
+        result = to_bgr(frame)
+        assert result is not frame
+        assert np.array_equal(result, frame)
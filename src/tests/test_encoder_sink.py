@@ -0,0 +1,137 @@
+# tests/test_encoder_sink.py
+import pytest
+import io
+import threading
+import numpy as np
+from src.utils import encoder_sink
+from src.utils.encoder_sink import EncoderSink
+
+class FakeStdin:
+    """FFmpeg's stdin: keeps what was written; ``gate`` can hold writes back."""
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def write(self, data):
+        self.gate.wait()
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def close(self):
+        self.closed = True
+
+class FakeProcess:
+    """Stands in for the FFmpeg Popen; exits with ``returncode`` once stdin closes."""
+    returncode_on_exit = 0
+
+    def __init__(self, command, **kwargs):
+        self.command = command
+        self.stdin = FakeStdin()
+        self.stderr = io.BytesIO(b"frame=2\nfps=60.0\nspeed=1.50x\nprogress=end\n")
+        self.returncode = None
+        self.killed = False
+
+    def poll(self):
+        if self.stdin.closed or self.killed:
+            self.returncode = -9 if self.killed else self.returncode_on_exit
+        return self.returncode
+
+    def wait(self, timeout=None):
+        return self.poll()
+
+    def kill(self):
+        self.killed = True
+        self.stdin.gate.set()
+
+@pytest.fixture
+def processes(monkeypatch):
+    started = []
+    def popen(command, **kwargs):
+        started.append(FakeProcess(command, **kwargs))
+        return started[-1]
+    monkeypatch.setattr(encoder_sink.subprocess, "Popen", popen)
+    return started
+
+def make_sink(tmp_path, **kwargs):
+    return EncoderSink(tmp_path / "out.mp4", 4, 2, output_args=['-c:v', 'libx264'],
+                       fps=30, pix_fmt='bgr24', **kwargs)
+
+class TestEncoderSink:
+    def test_start_pipes_raw_video_into_ffmpeg(self, tmp_path, processes):
+        """Test the encoder reads raw frames of the declared layout from stdin."""
+        sink = make_sink(tmp_path)
+        assert sink.start()
+        assert sink.is_open
+
+        command = processes[0].command
+        assert command[command.index('-pix_fmt') + 1] == 'bgr24'
+        assert command[command.index('-s') + 1] == '4x2'
+        assert command[command.index('-i') + 1] == 'pipe:0'
+        assert command[-3:] == ['libx264', '-y', str(tmp_path / "out.mp4")]
+        assert not sink.start()  # Already running
+        sink.abort()
+
+    def test_frames_are_written_in_order_and_flushed(self, tmp_path, processes):
+        """Test queued frames reach the pipe in order before flush returns."""
+        sink = make_sink(tmp_path)
+        sink.start()
+        frames = [np.full((2, 4, 3), i, dtype=np.uint8) for i in range(5)]
+        for frame in frames:
+            assert sink.write_frame(frame)
+        assert sink.flush(timeout=2.0)
+
+        assert processes[0].stdin.chunks == [frame.tobytes() for frame in frames]
+        assert sink.close(timeout=2.0)
+        stats = sink.get_statistics()
+        assert (stats['frames_written'], stats['bytes_written']) == (5, 5 * 24)
+        assert stats['encoding_speed'] == 1.5
+        assert processes[0].stdin.closed
+
+    def test_failed_encoder_reports_error_on_close(self, tmp_path, processes, monkeypatch):
+        """Test a non-zero FFmpeg exit fails close with the exit code."""
+        monkeypatch.setattr(FakeProcess, "returncode_on_exit", 1)
+        sink = make_sink(tmp_path)
+        sink.start()
+        sink.write_frame(np.zeros((2, 4, 3), dtype=np.uint8))
+        assert not sink.close(timeout=2.0)
+        assert "code 1" in sink.error
+
+    def test_abort_discards_queued_frames_and_kills_encoder(self, tmp_path, processes):
+        """Test abort drops what is queued and stops accepting frames."""
+        sink = make_sink(tmp_path, queue_size=8)
+        sink.start()
+        stdin = processes[0].stdin
+        stdin.gate.clear()  # The encoder stops reading
+        for i in range(6):
+            assert sink.write_frame(np.full((2, 4, 3), i, dtype=np.uint8), block=False)
+
+        sink.abort()
+        assert processes[0].killed
+        assert sink.video_queue.empty()
+        assert not sink.write_frame(np.zeros((2, 4, 3), dtype=np.uint8))
+        assert len(stdin.chunks) <= 1  # At most the frame already being written
+
+    def test_full_queue_drops_without_blocking(self, tmp_path, processes):
+        """Test non-blocking writes are dropped and counted once the queue is full."""
+        sink = make_sink(tmp_path, queue_size=2)
+        sink.start()
+        processes[0].stdin.gate.clear()
+        results = [sink.write_frame(np.zeros((2, 4, 3), dtype=np.uint8), block=False)
+                   for _ in range(6)]
+        assert not all(results)
+        assert sink.get_statistics()['frames_dropped'] == results.count(False)
+        sink.abort()
+
+    def test_resolved_frames_are_fetched_at_write_time(self, tmp_path, processes):
+        """Test frames queued with resolve are fetched by the writer and skipped once gone."""
+        sink = make_sink(tmp_path)
+        sink.start()
+        frames = {0: np.zeros((2, 4, 3), dtype=np.uint8), 2: np.ones((2, 4, 3), dtype=np.uint8)}
+        for sequence in range(3):
+            assert sink.write_frame(None, resolve=lambda sequence=sequence: frames.get(sequence))
+        assert sink.close(timeout=2.0)
+
+        assert processes[0].stdin.chunks == [frames[0].tobytes(), frames[2].tobytes()]
+        assert sink.get_statistics()['frames_stale'] == 1
@@ -1,7 +1,51 @@
 # tests/test_recording.py
 import pytest
+import threading
 import time
 from pathlib import Path
+import numpy as np
+from src.constants import RECORDING_FRAME_TIMEOUT, BACKPRESSURE_PART_CLOSE_TIMEOUT
+from src.features import recording
+from src.utils.chunked_encoder import plan_chunks
+from src.utils.disk_writer import DiskWriter
+from src.utils.video_manager import VideoFrame
+from src.utils.backpressure import EncoderLevel, BackpressureController, build_ladder
+
+class FakeSink:
+    """Stands in for EncoderSink: records what the recorder hands to FFmpeg."""
+    def __init__(self, output, width, height, **kwargs):
+        self.output = output
+        self.size = (width, height)
+        self.kwargs = kwargs
+        self.frames = []
+        self.audio = []
+        self.is_open = False
+        self.aborted = False
+        self.error = None
+        self.stats = {'encoding_speed': 1.0}
+
+    def start(self):
+        self.is_open = True
+        return True
+
+    def write_frame(self, frame, block=True, timeout=None):
+        self.frames.append(frame)
+        return True
+
+    def write_audio(self, data, block=True, timeout=None):
+        self.audio.append(data)
+        return True
+
+    def close(self, timeout=None):
+        self.is_open = False
+        return True
+
+    def abort(self):
+        self.is_open = False
+        self.aborted = True
+
+    def get_statistics(self):
+        return {**self.stats, 'queue_depth': 0, 'queue_capacity': 30, 'error': None}
 
 class TestRecording:
     def test_start_recording(self, recording_manager, temp_dir):
@@ -39,4 +83,354 @@ class TestRecording:
         
         recordings = list(Path(temp_dir / "recordings").glob("*.mp4"))
         assert len(recordings) == 1
-        assert recordings[0].stat().st_size > 0
\ No newline at end of file
+        assert recordings[0].stat().st_size > 0
+
+class TestEncoderLevelChange:
+    def test_level_change_after_stop_aborts_new_sink(self, recording_manager, temp_dir, monkeypatch):
+        """Test a ladder change racing stop does not orphan the encoder it opened."""
+        sinks = []
+        monkeypatch.setattr(recording, "EncoderSink",
+                            lambda *args, **kwargs: sinks.append(FakeSink(*args, **kwargs)) or sinks[-1])
+        manager = recording_manager
+        manager.output_file = temp_dir / "recording.mp4"
+        level = EncoderLevel("fast", 30, "1920x1080")
+
+        manager.state.is_recording = True
+        manager._start_stream()
+        manager.state.is_recording = False
+        manager._finish_stream()
+
+        manager._apply_encoder_level(level, EncoderLevel("faster", 30, "1920x1080"))
+        assert sinks[-1].aborted
+        assert len(manager.parts) == 1
+
+    def test_hung_part_close_does_not_block_level_change(self, recording_manager, temp_dir, monkeypatch):
+        """Test a replaced part that will not finalize is closed off-thread, then killed."""
+        release = threading.Event()
+        close_timeouts = []
+
+        class HangingSink(FakeSink):
+            def close(self, timeout=None):
+                close_timeouts.append(timeout)
+                release.wait()
+                return False  # Timed out
+
+        sinks = []
+        monkeypatch.setattr(recording, "EncoderSink",
+                            lambda *args, **kwargs: sinks.append(HangingSink(*args, **kwargs)) or sinks[-1])
+        monkeypatch.setattr(recording.RecordingManager, "_join_parts", lambda self: True)
+        manager = recording_manager
+        manager.output_file = temp_dir / "recording.mp4"
+        level = EncoderLevel("fast", 30, "1920x1080")
+
+        manager.state.is_recording = True
+        manager._start_stream()
+        manager._apply_encoder_level(level, EncoderLevel("faster", 30, "1920x1080"))
+        assert manager.sink is sinks[1]  # Swapped while the old part is still closing
+        assert not sinks[0].aborted
+
+        release.set()
+        manager.state.is_recording = False
+        manager._finish_stream()
+        assert close_timeouts[0] == BACKPRESSURE_PART_CLOSE_TIMEOUT
+        assert sinks[0].aborted
+        assert manager.part_closers == []
+
+    def test_parts_with_different_settings_join_through_mpegts(self, recording_manager, temp_dir,
+                                                               monkeypatch):
+        """Test parts at different levels are remuxed to TS so each keeps its SPS/PPS."""
+        commands, lists = [], []
+        def run(command, **kwargs):
+            commands.append(command)
+            if 'concat' in command:
+                lists.append(Path(command[command.index('-i') + 1]).read_text())
+            Path(command[-1]).write_bytes(b"out")
+            return type("Result", (), {'returncode': 0, 'stderr': ''})()
+        monkeypatch.setattr(recording.subprocess, "run", run)
+
+        output_dir = temp_dir / "parts"
+        output_dir.mkdir()
+        manager = recording_manager
+        manager.format = 'mp4'
+        manager.output_file = output_dir / "recording.mp4"
+        manager.parts = [
+            {'path': output_dir / "recording.mp4", 'level': EncoderLevel("fast", 30, "1920x1080")},
+            {'path': output_dir / "recording_part2.mp4", 'level': EncoderLevel("veryfast", 20, "1920x1080")},
+            {'path': output_dir / "recording_part3.mp4", 'level': EncoderLevel("veryfast", 20, "1280x720")}
+        ]
+        for part in manager.parts:
+            part['path'].write_bytes(b"part")
+
+        assert manager._join_parts()
+
+        *remuxes, concat = commands
+        assert [command[command.index('-i') + 1] for command in remuxes] == [
+            str(part['path']) for part in manager.parts
+        ]
+        for command in remuxes:
+            assert command[command.index('-bsf:v') + 1] == 'h264_mp4toannexb'
+            assert command[command.index('-f') + 1] == 'mpegts'
+        assert lists == ["file 'recording.join.ts'\n"
+                         "file 'recording_part2.join.ts'\n"
+                         "file 'recording_part3.join.ts'\n"]
+        assert concat[concat.index('-bsf:a') + 1] == 'aac_adtstoasc'
+        assert concat[-1] == str(output_dir / "recording.joined.mp4")
+
+        # Only the joined output is left behind
+        assert sorted(path.name for path in output_dir.iterdir()) == ["recording.mp4"]
+
+    def test_scaled_level_keeps_output_canvas(self, recording_manager):
+        """Test the scaled rung pads back to the capture size so parts can be joined."""
+        recording_manager.input_size = (1920, 1080)
+        args = recording_manager._get_video_args(True, EncoderLevel("veryfast", 20, "1280x720"))
+        assert args[args.index('-vf') + 1] == (
+            "scale=1280:720:force_original_aspect_ratio=decrease,"
+            "pad=1920:1080:(ow-iw)/2:(oh-ih)/2"
+        )
+        assert '-vf' not in recording_manager._get_video_args(True, EncoderLevel("fast", 30, "1920x1080"))
+
+class TestBackpressureController:
+    def test_steps_down_under_pressure_and_recovers(self):
+        """Test sustained pressure degrades one rung and lasting headroom restores it."""
+        now = [0.0]
+        changes = []
+        controller = BackpressureController(
+            build_ladder("fast", 30, "1920x1080"),
+            on_change=lambda previous, level: changes.append(level),
+            clock=lambda: now[0]
+        )
+
+        for now[0] in (0.0, 1.0, 2.0):
+            assert controller.observe(speed=0.8, queue_fill=0.6, cpu=95) is None
+        now[0] = 3.0
+        assert controller.observe(speed=0.8, queue_fill=0.6, cpu=95).preset == "faster"
+
+        # Held at the new level, then recovers only after sustained headroom
+        for now[0] in (5.0, 10.0, 20.0):
+            assert controller.observe(speed=1.2, queue_fill=0.0, cpu=40) is None
+        now[0] = 25.0
+        assert controller.observe(speed=1.2, queue_fill=0.0, cpu=40).preset == "fast"
+        assert [level.preset for level in changes] == ["faster", "fast"]
+
+    def test_busy_cpu_alone_does_not_degrade(self):
+        """Test a saturated CPU with an encoder keeping up leaves the level alone."""
+        now = [0.0]
+        controller = BackpressureController(build_ladder("fast", 30, "1920x1080"),
+                                            clock=lambda: now[0])
+        for now[0] in range(0, 60, 2):
+            assert controller.observe(speed=1.05, queue_fill=0.05, cpu=100) is None
+        assert controller.level.preset == "fast"
+
+    def test_slow_capture_with_empty_queue_does_not_degrade(self):
+        """Test speed under 1x from capture delivering few frames is not pressure."""
+        now = [0.0]
+        controller = BackpressureController(build_ladder("fast", 30, "1920x1080"),
+                                            clock=lambda: now[0])
+        for now[0] in range(0, 60, 2):
+            assert controller.observe(speed=0.7, queue_fill=0.0, cpu=40) is None
+        assert controller.level.preset == "fast"
+
+    def test_slow_encoder_with_backlog_degrades(self):
+        """Test speed under 1x counts once frames start queuing for the encoder."""
+        now = [0.0]
+        controller = BackpressureController(build_ladder("fast", 30, "1920x1080"),
+                                            clock=lambda: now[0])
+        for now[0] in (0.0, 1.0, 2.0):
+            assert controller.observe(speed=0.9, queue_fill=0.2, cpu=60) is None
+        now[0] = 3.0
+        assert controller.observe(speed=0.9, queue_fill=0.2, cpu=60).preset == "faster"
+        assert controller.events[-1]['reason'] == "speed 0.90x"
+
+class TestRawCapture:
+    def test_stalled_disk_writer_fails_instead_of_dropping(self, recording_manager, temp_dir, monkeypatch):
+        """Test a raw writer that stops draining fails the recording and counts the drop."""
+        monkeypatch.setattr(recording, "RECORDING_WRITE_STALL_TIMEOUT", 0.05)
+        manager = recording_manager
+        manager.disk_writer = DiskWriter(temp_dir / "capture.raw", queue_size=1)
+        manager.disk_writer.is_open = True  # No writer thread: the queue never drains
+
+        frame = VideoFrame(np.zeros((4, 4, 3), dtype=np.uint8), 0.0, 0, (4, 4))
+        manager._write_raw_frame(frame)
+        with pytest.raises(Exception, match="stalled"):
+            manager._write_raw_frame(frame)
+        assert manager.disk_writer.get_statistics()['buffers_dropped'] == 1
+
+class TestChunkedEncoder:
+    def test_plan_splits_at_frame_boundaries(self):
+        """Test chunk ranges are contiguous, balanced and respect the minimum length."""
+        ranges = plan_chunks(1003, 4)
+        assert ranges == [(0, 251), (251, 251), (502, 251), (753, 250)]
+
+        assert plan_chunks(1000, 16, min_frames=300) == [(0, 334), (334, 333), (667, 333)]
+        assert plan_chunks(100, 8, min_frames=300) == [(0, 100)]
+
+class TestDiskWriter:
+    def test_writes_queued_frames_in_order(self, tmp_path):
+        """Test queued frames land in order and preallocated space is trimmed."""
+        path = tmp_path / "capture.raw"
+        frames = [np.full((90, 160, 3), i, dtype=np.uint8) for i in range(20)]
+        writer = DiskWriter(path, bytes_per_second=frames[0].nbytes * 30, buffer_size=1 << 16)
+        assert writer.open()
+
+        for frame in frames:
+            assert writer.write(frame, timeout=1.0)
+        assert writer.close()
+
+        assert path.read_bytes() == b"".join(frame.tobytes() for frame in frames)
+        stats = writer.get_statistics()
+        assert stats['bytes_written'] == sum(frame.nbytes for frame in frames)
+        assert stats['worst_write_latency'] > 0
+
+def make_frame(number: int) -> VideoFrame:
+    return VideoFrame(np.full((2, 4, 3), number, dtype=np.uint8), number / 30, number, (4, 2))
+
+class FakeCapture:
+    """Video and audio manager replaying a script, then stopping the recording.
+
+    Script items are frames, None for a wait that timed out, or callables
+    run in place of a wait (e.g. to pause).
+    """
+    def __init__(self, manager, script):
+        self.manager = manager
+        self.script = list(script)
+        self.timeouts = []
+        self.audio_reads = 0
+        self.target_fps = 30
+        self.sample_rate = 48000
+        self.channels = 2
+        self.stats = {'frames_dropped': 0}
+
+    def get_frame_format(self):
+        return 'BGR', (4, 2)
+
+    def get_frame(self, timeout=None):
+        self.timeouts.append(timeout)
+        if not self.script:
+            self.manager.state.is_recording = False
+            return None
+        item = self.script.pop(0)
+        if callable(item):
+            item()
+            return None
+        return item
+
+    def get_audio_data(self, duration):
+        self.audio_reads += 1
+        return b"audio%d" % self.audio_reads
+
+class TestRecordingLoops:
+    @pytest.fixture
+    def sinks(self, monkeypatch):
+        sinks = []
+        monkeypatch.setattr(recording, "EncoderSink",
+                            lambda *args, **kwargs: sinks.append(FakeSink(*args, **kwargs)) or sinks[-1])
+        return sinks
+
+    def start_stream(self, manager, script, temp_dir):
+        """Set up a streaming session the way start_recording does, minus the threads."""
+        manager.video_manager = manager.audio_manager = FakeCapture(manager, script)
+        manager.output_file = temp_dir / "recording.mp4"
+        manager._negotiate_format()
+        manager._start_stream()
+        manager.state.is_recording = True
+
+    def test_capture_blocks_for_frames_and_drains_audio_on_every_wake(self, recording_manager):
+        """Test the loop waits on capture instead of polling and discards input while paused."""
+        manager = recording_manager
+        state = manager.state
+        capture = FakeCapture(manager, [
+            make_frame(0), None, make_frame(1),
+            lambda: setattr(state, 'is_paused', True), make_frame(2),
+            lambda: setattr(state, 'is_paused', False), make_frame(3)
+        ])
+        manager.video_manager = manager.audio_manager = capture
+        state.is_recording = True
+
+        video, audio = [], []
+        manager._pump_capture(video.append, audio.append)
+
+        assert [frame.frame_number for frame in video] == [0, 1, 3]
+        assert state.frame_count == 3
+        assert set(capture.timeouts) == {RECORDING_FRAME_TIMEOUT}
+        # Audio is drained even when the wait times out, but not kept while paused
+        assert audio == [b"audio1", b"audio2", b"audio3", b"audio6", b"audio7", b"audio8"]
+
+    def test_streaming_pipes_capture_into_encoder(self, recording_manager, temp_dir, sinks):
+        """Test streaming mode feeds frames and audio straight to the encoder and finalizes it."""
+        manager = recording_manager
+        self.start_stream(manager, [make_frame(i) for i in range(3)], temp_dir)
+        manager._stream_loop()
+
+        sink = sinks[0]
+        assert sink.output == manager.output_file
+        assert sink.size == (4, 2)
+        assert sink.kwargs['pix_fmt'] == 'bgr24' and sink.kwargs['audio']
+        assert [int(frame[0, 0, 0]) for frame in sink.frames] == [0, 1, 2]
+        assert sink.audio == [b"audio1", b"audio2", b"audio3", b"audio4"]
+        assert not sink.is_open and not sink.aborted
+        assert manager.sink is None
+        assert manager.stats['total_recordings'] == 1
+
+    def test_streaming_aborts_when_encoder_dies(self, recording_manager, temp_dir, sinks):
+        """Test a dead encoder fails the recording instead of dropping frames."""
+        manager = recording_manager
+        self.start_stream(manager, [make_frame(i) for i in range(3)], temp_dir)
+        sink = sinks[0]
+        sink.is_open = False
+        sink.error = "Encoder video pipe closed"
+        sink.write_frame = lambda frame, block=True, timeout=None: False
+
+        manager._stream_loop()
+        assert "Encoder video pipe closed" in manager.state.error
+        assert sink.aborted
+        assert manager.stats['failed_recordings'] == 1
+
+    def test_segmented_recording_joins_finished_segments(self, recording_manager, temp_dir,
+                                                         sinks, monkeypatch):
+        """Test segmented mode writes indexed segments and joins the finished ones on stop."""
+        joined = []
+        def run(command, **kwargs):
+            joined.append(Path(command[command.index('-i') + 1]).read_text())
+            return type("Result", (), {'returncode': 0, 'stderr': ''})()
+        monkeypatch.setattr(recording.subprocess, "run", run)
+
+        manager = recording_manager
+        manager.segment_dir = temp_dir / "segments"
+        manager.segment_dir.mkdir()
+        self.start_stream(manager, [make_frame(i) for i in range(3)], temp_dir)
+
+        sink = sinks[0]
+        args = sink.kwargs['output_args']
+        assert sink.output == manager.segment_dir / "segment_%05d.mp4"
+        assert args[args.index('-f') + 1] == 'segment'
+        assert args[args.index('-segment_list') + 1] == str(manager.segment_dir / "index.csv")
+
+        # What FFmpeg leaves behind: two closed segments, a third in progress
+        (manager.segment_dir / "index.csv").write_text(
+            "segment_00000.mp4,0.000000,2.000000\n"
+            "segment_00001.mp4,2.000000,4.000000\n"
+            "segment_00002.mp4,4.0"
+        )
+        manager._stream_loop()
+
+        assert joined == ["file 'segment_00000.mp4'\nfile 'segment_00001.mp4'\n"]
+        assert not manager.segment_dir.exists()
+
+    def test_finished_segments_span_encoder_parts(self, recording_manager, temp_dir):
+        """Test crash recovery lists closed segments of every part on one timeline."""
+        segment_dir = temp_dir / "segments"
+        segment_dir.mkdir()
+        (segment_dir / "index.csv").write_text(
+            "segment_00000.mp4,0.0,2.0\nsegment_00001.mp4,2.0,3.5\n"
+        )
+        (segment_dir / "index_02.csv").write_text(
+            "segment_02_00000.mp4,0.0,2.0\nsegment_02_00001.mp4,2.0"
+        )
+
+        segments = recording_manager.get_finished_segments(segment_dir)
+        assert [segment['path'].name for segment in segments] == [
+            "segment_00000.mp4", "segment_00001.mp4", "segment_02_00000.mp4"
+        ]
+        assert [(segment['start'], segment['end']) for segment in segments] == [
+            (0.0, 2.0), (2.0, 3.5), (3.5, 5.5)
+        ]
@@ -0,0 +1,40 @@
+# tests/test_scene_composition.py
+import numpy as np
+from src.features.scene_composition import Scene, SceneItem
+from src.utils.video_manager import VideoFrame
+
+class FakeScreenSource:
+    """Video source that hands out BGRA frames like screen capture."""
+
+    def __init__(self, size):
+        self.data = np.zeros((*size, 4), dtype=np.uint8)
+        self.data[..., 2] = 200  # Red
+        self.data[..., 3] = 255
+
+    def get_frame(self):
+        return VideoFrame(self.data, 0.0, 0, self.data.shape[1::-1], format='BGRA')
+
+class TestScene:
+    def test_bgra_video_source_composites_as_bgr(self):
+        """Test a screen source's BGRA VideoFrame is drawn onto the BGR canvas."""
+        scene = Scene("Screen")
+        scene.size = (32, 32)
+        scene.add_item(SceneItem("Display", FakeScreenSource(scene.size), "video"))
+
+        canvas = scene.render()
+
+        assert canvas.shape == (32, 32, 3)
+        assert (canvas[..., 2] == 200).all()
+        assert not canvas[..., :2].any()
+
+    def test_bgra_image_source_composites_as_bgr(self):
+        """Test 4-channel image sources lose their alpha channel before blending."""
+        scene = Scene("Image")
+        scene.size = (16, 16)
+        image = np.full((16, 16, 4), 90, dtype=np.uint8)
+        scene.add_item(SceneItem("Overlay", image, "image"))
+
+        canvas = scene.render()
+
+        assert canvas.shape == (16, 16, 3)
+        assert (canvas == 90).all()
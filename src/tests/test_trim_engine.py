@@ -0,0 +1,105 @@
+# tests/test_trim_engine.py
+import pytest
+import json
+from src.utils.trim_engine import TrimEngine, KeyframeIndex
+
+STREAMS = json.dumps({
+    'streams': [{'codec_name': 'h264', 'pix_fmt': 'yuv420p'}],
+    'format': {'start_time': '1.400000'}
+})
+# Keyframes every 2 s, packet timestamps offset by the container start
+PACKETS = "".join(
+    f"{1.4 + i / 10:.6f},{'K_' if i % 20 == 0 else '__'}\n" for i in range(100)
+)
+
+@pytest.fixture
+def recording(tmp_path):
+    path = tmp_path / "recording.ts"
+    path.write_bytes(b"\0" * 188)
+    return path
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Fake ffprobe; records each call's arguments."""
+    calls = []
+    def probe(self, source, args):
+        calls.append(args)
+        return STREAMS if args[-1] == 'json' else PACKETS
+    monkeypatch.setattr(TrimEngine, "_probe", probe)
+    return calls
+
+class TestKeyframeIndex:
+    def test_keyframes_are_relative_to_container_start(self, recording, probes):
+        """Test packet times are shifted to the origin -ss seeks from."""
+        index = TrimEngine().get_index(recording)
+        assert index.start_time == pytest.approx(1.4)
+        assert index.keyframes == pytest.approx([0.0, 2.0, 4.0, 6.0, 8.0])
+        assert index.duration == pytest.approx(9.9)
+
+    def test_index_is_cached_and_rebuilt_when_file_changes(self, recording, probes):
+        """Test the index is reused from disk until the recording changes."""
+        TrimEngine().get_index(recording)
+        assert len(probes) == 2
+        assert recording.with_name(recording.name + TrimEngine.INDEX_SUFFIX).exists()
+
+        # A new engine reads the cached file instead of probing
+        assert TrimEngine().get_index(recording).keyframes
+        assert len(probes) == 2
+
+        with open(recording, 'ab') as f:
+            f.write(b"\0" * 188)
+        TrimEngine().get_index(recording)
+        assert len(probes) == 4
+
+    def test_stale_index_format_is_rebuilt(self, recording, probes):
+        """Test an index cached without the container start is not trusted."""
+        stat = recording.stat()
+        recording.with_name(recording.name + TrimEngine.INDEX_SUFFIX).write_text(json.dumps({
+            'source_size': stat.st_size, 'source_mtime': stat.st_mtime, 'duration': 11.3,
+            'codec': 'h264', 'pix_fmt': 'yuv420p', 'keyframes': [1.4, 3.4]
+        }))
+        assert TrimEngine().get_index(recording).keyframes[0] == 0.0
+        assert len(probes) == 2
+
+class TestTrimEngine:
+    @pytest.fixture
+    def engine(self, monkeypatch):
+        """Engine with a fixed index that records which cut path it takes."""
+        engine = TrimEngine()
+        index = KeyframeIndex(0, 0.0, 10.0, 'h264', 'yuv420p', 0.0, [0.0, 2.0, 4.0, 6.0, 8.0])
+        monkeypatch.setattr(engine, "get_index", lambda source: index)
+        engine.cuts = []
+        for name in ("_copy", "_encode", "_splice"):
+            monkeypatch.setattr(engine, name,
+                                lambda *args, name=name: engine.cuts.append((name, *args[2:])) or True)
+        return engine
+
+    def test_fast_cut_copies_from_previous_keyframe(self, engine):
+        """Test a fast cut stream copies from the keyframe before the start."""
+        assert engine.trim("in.mp4", "out.mp4", 3.0, 7.0)
+        assert engine.cuts == [("_copy", 2.0, 7.0)]
+
+    def test_accurate_cut_on_keyframe_is_copied(self, engine):
+        """Test an accurate cut starting on a keyframe needs no re-encode."""
+        assert engine.trim("in.mp4", "out.mp4", 4.0, 7.0, accurate=True)
+        assert engine.cuts == [("_copy", 4.0, 7.0)]
+
+    def test_accurate_cut_mid_gop_splices(self, engine):
+        """Test an accurate cut re-encodes only up to the next keyframe."""
+        assert engine.trim("in.mp4", "out.mp4", 3.0, 7.0, accurate=True)
+        assert engine.cuts[0][:4] == ("_splice", 3.0, 4.0, 7.0)
+
+    def test_accurate_cut_within_one_gop_is_encoded(self, engine):
+        """Test a cut with no keyframe left to copy from is re-encoded, clamped to the duration."""
+        assert engine.trim("in.mp4", "out.mp4", 8.5, 12.0, accurate=True)
+        assert engine.cuts[0][:3] == ("_encode", 8.5, 10.0)
+
+    def test_copy_seeks_with_container_relative_time(self, monkeypatch):
+        """Test the stream copy passes the index time straight to -ss."""
+        engine = TrimEngine()
+        commands = []
+        monkeypatch.setattr(engine, "_run", lambda command: commands.append(command) or True)
+        engine._copy("in.ts", "out.mp4", 2.0, 7.0)
+        command = commands[0]
+        assert command[command.index('-ss') + 1] == '2.000000'
+        assert command[command.index('-t') + 1] == '5.000000'
@@ -15,6 +15,7 @@ import threading
 from typing import Optional, Dict, Any
 import time
 import mss
+import cv2
 from PIL import Image, ImageTk
 
 # Local imports
@@ -22,7 +23,6 @@ from src.constants import *
 from src.utils.error_handler import ErrorHandler
 from src.utils.performance_monitor import PerformanceMonitor
 from src.utils.video_manager import VideoManager
-from src.utils.audio_manager import AudioManager
 from src.features.recording import RecordingManager
 from src.features.effects import EffectsManager
 from src.features.audio_mixer import AudioMixer
@@ -70,8 +70,9 @@ class MainWindow:
         try:
             # Core managers
             self.video_manager = VideoManager()
-            self.audio_manager = AudioManager()
             self.recording_manager = RecordingManager(self.config)
+            # One microphone capture, shared by the recorder and voice commands
+            self.audio_manager = self.recording_manager.audio_manager
             
             # Feature managers
             self.effects_manager = EffectsManager()
@@ -82,6 +83,7 @@ class MainWindow:
             
             # Performance monitoring
             self.performance_monitor = PerformanceMonitor()
+            self.performance_monitor.attach_recorder(self.recording_manager)
             
             # Initialize clipper
             self.clipper = Clipper(
@@ -89,6 +91,7 @@ class MainWindow:
                 output_folder=self.config.get("clipping.save_path", DEFAULT_CLIPS_FOLDER),
                 format=self.config.get("clipping.format", DEFAULT_CLIP_FORMAT)
             )
+            self.clipper.set_audio_manager(self.audio_manager)
             
         except Exception as e:
             self.error_handler.handle_error(e, context="Initializing managers")
@@ -276,11 +279,11 @@ class MainWindow:
             frame = self.video_manager.get_frame()
             
             if frame is not None:
-                # Apply effects
-                frame = self.effects_manager.process_frame(frame)
+                # Apply effects; they return BGR whatever the capture layout
+                data = self.effects_manager.process_frame(frame.data)
                 
                 # Convert to PhotoImage
-                image = Image.fromarray(frame.data)
+                image = Image.fromarray(cv2.cvtColor(data, cv2.COLOR_BGR2RGB))
                 photo = ImageTk.PhotoImage(image)
                 
                 # Update preview
@@ -557,7 +560,6 @@ class MainWindow:
             
             # Clean up managers
             self.video_manager.cleanup()
-            self.audio_manager.cleanup()
             self.recording_manager.cleanup()
             self.audio_mixer.cleanup()
             self.performance_monitor.cleanup()
@@ -76,6 +76,13 @@ class PerformanceUI(ttkbs.LabelFrame):
         self.encode_label = ttkbs.Label(encode_frame, text="0x")
         self.encode_label.pack(side='right')
 
+        # Recording loop CPU (share of one core)
+        loop_frame = ttkbs.Frame(metrics_frame)
+        loop_frame.pack(fill='x', padx=5, pady=2)
+        ttkbs.Label(loop_frame, text="Recording Loop CPU:").pack(side='left')
+        self.loop_cpu_label = ttkbs.Label(loop_frame, text="0%")
+        self.loop_cpu_label.pack(side='right')
+
         # Bitrate
         bitrate_frame = ttkbs.Frame(metrics_frame)
         bitrate_frame.pack(fill='x', padx=5, pady=2)
@@ -150,6 +157,7 @@ class PerformanceUI(ttkbs.LabelFrame):
             self.fps_label.configure(text=f"{metrics.fps:.1f}")
             self.frame_time_label.configure(text=f"{metrics.frame_time:.1f} ms")
             self.encode_label.configure(text=f"{metrics.encoding_speed:.1f}x")
+            self.loop_cpu_label.configure(text=f"{metrics.recording_loop_cpu:.1f}%")
             self.bitrate_label.configure(text=f"{metrics.bitrate/1000000:.1f} Mbps")
             self.dropped_frames_label.configure(text=f"Dropped: {metrics.dropped_frames}")
 
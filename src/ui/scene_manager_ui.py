@@ -617,7 +617,8 @@ class ScenePreview(ttkbs.LabelFrame):
                 frame = cv2.resize(frame, (640, 360))
                 
                 # Convert to PhotoImage
-                image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                code = cv2.COLOR_BGRA2RGB if frame.shape[2] == 4 else cv2.COLOR_BGR2RGB
+                image = Image.fromarray(cv2.cvtColor(frame, code))
                 photo = ImageTk.PhotoImage(image)
                 
                 # Update canvas
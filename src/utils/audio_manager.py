@@ -20,6 +20,7 @@ import audioop
 from src.constants import *
 from src.utils.error_handler import ErrorHandler
 from src.utils.performance import PerformanceUtils
+from src.features.audio_processing import PolyphaseResampler
 
 @dataclass
 class AudioFrame:
@@ -43,6 +44,53 @@ class AudioDevice:
         self.is_default = False
         self.capabilities: Dict[str, Any] = {}
 
+class AudioTap:
+    """Subscriber to an AudioManager's capture, delivering 16-bit mono blocks.
+
+    The capture callback only queues raw chunks; conversion to mono, the
+    polyphase resample and int16 packing happen in the consumer's thread
+    inside ``read``.
+    """
+
+    def __init__(self, source_rate: int, channels: int,
+                 target_rate: int = VOICE_SAMPLE_RATE,
+                 block_size: int = VOICE_BLOCK_SIZE,
+                 queue_size: int = 256):
+        self.source_rate = source_rate
+        self.channels = channels
+        self.block_size = block_size
+        self.resampler = PolyphaseResampler(source_rate, target_rate)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.output = np.empty(0, dtype=np.float32)
+        self.chunks_dropped = 0
+
+    def push(self, frame: AudioFrame):
+        """Called from the capture callback; never blocks."""
+        try:
+            self.queue.put_nowait(frame.data)
+        except queue.Full:
+            self.chunks_dropped += 1
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Next ``block_size`` samples as int16 bytes, or None on timeout."""
+        deadline = time.time() + timeout if timeout is not None else None
+        while len(self.output) < self.block_size:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                data = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return None
+
+            samples = np.frombuffer(data, dtype=np.float32)
+            if self.channels > 1:
+                samples = samples.reshape(-1, self.channels).mean(axis=1)
+            self.output = np.concatenate((self.output, self.resampler.process(samples)))
+
+        block, self.output = self.output[:self.block_size], self.output[self.block_size:]
+        return (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
 class AudioManager:
     """Manages audio capture and processing."""
     
@@ -80,6 +128,11 @@ class AudioManager:
             # Streams
             self.input_stream = None
             self.output_stream = None
+            self.input_channels = 1
+            
+            # Fan-out subscribers to the input stream
+            self.taps: List[AudioTap] = []
+            self.taps_lock = threading.Lock()
             
             # Threading control
             self.is_capturing = False
@@ -183,28 +236,9 @@ class AudioManager:
                 default_info = self.audio.get_default_input_device_info()
                 self.current_input = self.devices[default_info['index']]
 
-            # Try to open stream with proper channel configuration
-            try:
-                self.input_stream = self.audio.open(
-                    format=pyaudio.paFloat32,
-                    channels=1,  # Start with mono
-                    rate=AUDIO_SAMPLE_RATE,
-                    input=True,
-                    input_device_index=self.current_input.index,
-                    frames_per_buffer=AUDIO_CHUNK_SIZE,
-                    stream_callback=self._audio_callback
-                )
-            except:
-                # If mono fails, try stereo
-                self.input_stream = self.audio.open(
-                    format=pyaudio.paFloat32,
-                    channels=2,
-                    rate=AUDIO_SAMPLE_RATE,
-                    input=True,
-                    input_device_index=self.current_input.index,
-                    frames_per_buffer=AUDIO_CHUNK_SIZE,
-                    stream_callback=self._audio_callback
-                )
+            # The stream may already be open for audio taps
+            if not self.input_stream:
+                self._open_input_stream()
             
             # Start capture thread
             self.is_capturing = True
@@ -220,6 +254,65 @@ class AudioManager:
         except Exception as e:
             self.error_handler.handle_error(e, context="Starting audio capture")
             return False
+    def _open_input_stream(self):
+        """Open the shared input stream on the current input device."""
+        # Try to open stream with proper channel configuration
+        try:
+            self.input_stream = self.audio.open(
+                format=pyaudio.paFloat32,
+                channels=1,  # Start with mono
+                rate=AUDIO_SAMPLE_RATE,
+                input=True,
+                input_device_index=self.current_input.index,
+                frames_per_buffer=AUDIO_CHUNK_SIZE,
+                stream_callback=self._audio_callback
+            )
+            self.input_channels = 1
+        except:
+            # If mono fails, try stereo
+            self.input_stream = self.audio.open(
+                format=pyaudio.paFloat32,
+                channels=2,
+                rate=AUDIO_SAMPLE_RATE,
+                input=True,
+                input_device_index=self.current_input.index,
+                frames_per_buffer=AUDIO_CHUNK_SIZE,
+                stream_callback=self._audio_callback
+            )
+            self.input_channels = 2
+
+    def _close_input_stream(self):
+        if self.input_stream:
+            self.input_stream.stop_stream()
+            self.input_stream.close()
+            self.input_stream = None
+
+    def add_tap(self) -> AudioTap:
+        """Subscribe to the input stream, opening it if nothing is capturing."""
+        try:
+            with self.taps_lock:
+                if not self.input_stream:
+                    if not self.current_input:
+                        default_info = self.audio.get_default_input_device_info()
+                        self.current_input = self.devices[default_info['index']]
+                    self._open_input_stream()
+
+                tap = AudioTap(AUDIO_SAMPLE_RATE, self.input_channels)
+                # Replaced, not mutated, so the callback can iterate unlocked
+                self.taps = self.taps + [tap]
+                return tap
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Adding audio tap")
+            return None
+
+    def remove_tap(self, tap: AudioTap):
+        """Unsubscribe a tap; the stream closes once nothing uses it."""
+        with self.taps_lock:
+            self.taps = [t for t in self.taps if t is not tap]
+            if not self.taps and not self.is_capturing:
+                self._close_input_stream()
+
     def _audio_callback(self, in_data, frame_count, time_info, status):
         """PyAudio callback for input stream."""
         try:
@@ -236,8 +329,12 @@ class AudioManager:
                 sample_rate=self.sample_rate
             )
             
+            for tap in self.taps:
+                tap.push(frame)
+            
             # Add to buffers
-            self._add_to_buffers(frame)
+            if self.is_capturing:
+                self._add_to_buffers(frame)
             
             return (None, pyaudio.paContinue)
             
@@ -458,6 +555,8 @@ class AudioManager:
                 'frames_dropped': self.stats['frames_dropped'],
                 'current_latency': self.stats['current_latency'],
                 'peak_level': self.stats['peak_level'],
+                'taps': len(self.taps),
+                'tap_chunks_dropped': sum(tap.chunks_dropped for tap in self.taps),
                 'buffer_usage': {
                     'input': self.input_buffer.qsize() / self.input_buffer.maxsize,
                     'output': self.output_buffer.qsize() / self.output_buffer.maxsize,
@@ -475,10 +574,10 @@ class AudioManager:
             if self.capture_thread:
                 self.capture_thread.join()
             
-            if self.input_stream:
-                self.input_stream.stop_stream()
-                self.input_stream.close()
-                self.input_stream = None
+            # Audio taps keep the device open after capture stops
+            with self.taps_lock:
+                if not self.taps:
+                    self._close_input_stream()
             
             self.clear_buffers()
             
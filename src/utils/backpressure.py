@@ -0,0 +1,160 @@
+# src/utils/backpressure.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import time
+import logging
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, List, Callable
+
+from src.constants import *
+
+@dataclass(frozen=True)
+class EncoderLevel:
+    """Encoder settings for one rung of the degradation ladder."""
+    preset: str
+    fps: int
+    resolution: str  # "WxH" the picture is scaled to inside the output canvas
+
+    def pixels(self) -> int:
+        width, height = map(int, self.resolution.split('x'))
+        return width * height
+
+def build_ladder(preset: str, fps: int, resolution: str) -> List[EncoderLevel]:
+    """Degradation rungs from ``(preset, fps, resolution)``, best first.
+
+    Each rung keeps the degradations before it: faster presets down to
+    BACKPRESSURE_FASTEST_PRESET, then lower capture rates, then a picture
+    scaled down inside the unchanged output canvas.
+    """
+    level = EncoderLevel(preset, fps, resolution)
+    ladder = [level]
+
+    if preset in X264_PRESETS:
+        fastest = X264_PRESETS.index(BACKPRESSURE_FASTEST_PRESET)
+        for faster in reversed(X264_PRESETS[fastest:X264_PRESETS.index(preset)]):
+            level = replace(level, preset=faster)
+            ladder.append(level)
+
+    for lower_fps in BACKPRESSURE_FPS_STEPS:
+        if lower_fps < level.fps:
+            level = replace(level, fps=lower_fps)
+            ladder.append(level)
+
+    scaled = replace(level, resolution=OUTPUT_SCALED_RESOLUTION)
+    if scaled.pixels() < level.pixels():
+        ladder.append(scaled)
+
+    return ladder
+
+class BackpressureController:
+    """Steps the live encoder down its ladder under pressure and back up.
+
+    Pressure is the encoder lagging: its input queue filling, or running
+    slower than real time while frames are backing up. Speed alone is not
+    pressure, since it also drops below 1x whenever capture delivers fewer
+    frames than the declared rate and the encoder sits idle. A busy CPU alone is not pressure while the encoder
+    keeps up, but it does hold back recovery. Pressure has to last
+    BACKPRESSURE_STEP_DOWN_AFTER seconds before the next rung is taken;
+    recovering needs clear headroom for the much longer
+    BACKPRESSURE_STEP_UP_AFTER, and no change follows another within
+    BACKPRESSURE_HOLD, so the level does not oscillate.
+    """
+
+    def __init__(self, ladder: List[EncoderLevel],
+                 on_change: Optional[Callable[[EncoderLevel, EncoderLevel], None]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.ladder = ladder
+        self.on_change = on_change
+        self.clock = clock
+
+        self.index = 0
+        self.pressure_since: Optional[float] = None
+        self.headroom_since: Optional[float] = None
+        self.last_change = float('-inf')
+        self.events: List[Dict] = []
+
+    @property
+    def level(self) -> EncoderLevel:
+        return self.ladder[self.index]
+
+    def observe(self, speed: float, queue_fill: float, cpu: float) -> Optional[EncoderLevel]:
+        """Feed one sample; returns the new level when it changes.
+
+        ``speed`` is the encoder's speed as a multiple of real time (0 when
+        not yet known), ``queue_fill`` the encoder input queue's fill ratio,
+        and ``cpu`` system CPU percent.
+        """
+        now = self.clock()
+        reasons = []
+        if 0 < speed < BACKPRESSURE_MIN_SPEED and queue_fill > BACKPRESSURE_QUEUE_LOW:
+            reasons.append(f"speed {speed:.2f}x")
+        if queue_fill >= BACKPRESSURE_QUEUE_HIGH:
+            reasons.append(f"queue {queue_fill:.0%}")
+
+        headroom = (not reasons and queue_fill <= BACKPRESSURE_QUEUE_LOW
+                    and cpu <= BACKPRESSURE_CPU_LOW)
+
+        if not reasons:
+            self.pressure_since = None
+        elif self.pressure_since is None:
+            self.pressure_since = now
+        if not headroom:
+            self.headroom_since = None
+        elif self.headroom_since is None:
+            self.headroom_since = now
+
+        if now - self.last_change < BACKPRESSURE_HOLD:
+            return None
+
+        if self.pressure_since is not None and self.index < len(self.ladder) - 1 \
+                and now - self.pressure_since >= BACKPRESSURE_STEP_DOWN_AFTER:
+            return self._step(self.index + 1, ", ".join(reasons))
+
+        if self.headroom_since is not None and self.index > 0 \
+                and now - self.headroom_since >= BACKPRESSURE_STEP_UP_AFTER:
+            return self._step(self.index - 1, "headroom recovered")
+
+        return None
+
+    def _step(self, index: int, reason: str) -> EncoderLevel:
+        previous = self.level
+        direction = 'down' if index > self.index else 'up'
+        self.index = index
+        now = self.clock()
+        self.last_change = now
+        self.pressure_since = None
+        self.headroom_since = None
+
+        event = {
+            'time': now,
+            'direction': direction,
+            'from': previous,
+            'to': self.level,
+            'reason': reason
+        }
+        self.events.append(event)
+        self.logger.info(
+            f"Encoder backpressure: stepping {direction} to "
+            f"{self.level.preset}/{self.level.fps}fps/{self.level.resolution} ({reason})"
+        )
+
+        if self.on_change:
+            self.on_change(previous, self.level)
+        return self.level
+
+    def get_statistics(self) -> Dict:
+        """Get controller statistics."""
+        return {
+            'level': self.index,
+            'levels': len(self.ladder),
+            'preset': self.level.preset,
+            'fps': self.level.fps,
+            'resolution': self.level.resolution,
+            'transitions': len(self.events),
+            'last_event': self.events[-1] if self.events else None
+        }
@@ -0,0 +1,229 @@
+# src/utils/chunked_encoder.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import os
+import time
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple, Callable
+
+from src.constants import *
+from src.utils.error_handler import ErrorHandler
+from src.utils.encoder_sink import rawvideo_input_args, frame_bytes
+
+def plan_chunks(total_frames: int, chunks: int, min_frames: int = 1) -> List[Tuple[int, int]]:
+    """Split ``total_frames`` into at most ``chunks`` ``(start, count)`` ranges.
+
+    Ranges are contiguous and differ in length by at most one frame; no
+    range is shorter than ``min_frames`` unless there is only one.
+    """
+    chunks = max(1, min(chunks, total_frames // max(1, min_frames)))
+    base, extra = divmod(total_frames, chunks)
+    ranges = []
+    start = 0
+    for index in range(chunks):
+        count = base + (1 if index < extra else 0)
+        ranges.append((start, count))
+        start += count
+    return ranges
+
+def default_chunk_count() -> int:
+    """Parallel encoders worth running on this machine."""
+    return max(1, (os.cpu_count() or 1) // RECORDING_CHUNK_CORES)
+
+class ChunkedEncoder:
+    """Encodes a raw video file as parallel chunks, then muxes in the audio.
+
+    The file is split at frame boundaries and each range is encoded by its
+    own FFmpeg process, starting on a keyframe with closed GOPs so the
+    chunks can be joined with a stream copy. The concat demuxer then joins
+    them and the audio track is encoded alongside. Progress is the share of
+    all frames encoded so far across every chunk.
+    """
+
+    def __init__(self, source: Path, width: int, height: int, fps: float,
+                 output: Path, video_args: List[str],
+                 audio_source: Optional[Path] = None, audio_args: Optional[List[str]] = None,
+                 output_args: Optional[List[str]] = None, pix_fmt: str = 'rgb24',
+                 chunks: Optional[int] = None,
+                 on_progress: Optional[Callable[[float], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.error_handler = ErrorHandler(DEFAULT_LOGS_PATH)
+
+        self.source = Path(source)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+        self.output = Path(output)
+        self.video_args = video_args
+        self.audio_source = Path(audio_source) if audio_source else None
+        self.audio_args = audio_args or []
+        self.output_args = output_args or []
+        self.chunks = chunks or default_chunk_count()
+        self.on_progress = on_progress
+
+        self.work_dir = self.output.with_name(f"{self.output.stem}_chunks")
+        self.processes: Dict[int, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+        self.error: Optional[str] = None
+        self.frames_done: Dict[int, int] = {}
+        self.stats = {
+            'chunks': 0,
+            'total_frames': 0,
+            'frames_encoded': 0,
+            'progress': 0.0,
+            'encode_time': 0.0,
+            'mux_time': 0.0
+        }
+
+    @property
+    def bytes_per_frame(self) -> int:
+        return frame_bytes(self.width, self.height, self.pix_fmt)
+
+    def plan(self) -> List[Tuple[int, int]]:
+        """Frame ranges the source is encoded in."""
+        total_frames = self.source.stat().st_size // self.bytes_per_frame
+        return plan_chunks(total_frames, self.chunks,
+                           min_frames=int(RECORDING_MIN_CHUNK_SECONDS * self.fps))
+
+    def run(self) -> bool:
+        """Encode the whole file; True once the output is complete."""
+        try:
+            ranges = self.plan()
+            total_frames = sum(count for _, count in ranges)
+            if not total_frames:
+                raise Exception(f"No complete frames in {self.source.name}")
+
+            self.stats['chunks'] = len(ranges)
+            self.stats['total_frames'] = total_frames
+            self.frames_done = {index: 0 for index in range(len(ranges))}
+            self.work_dir.mkdir(parents=True, exist_ok=True)
+            self.logger.info(f"Encoding {total_frames} frames in {len(ranges)} chunks")
+
+            start = time.perf_counter()
+            # Each job only drives an FFmpeg process, which does the encoding
+            with ThreadPoolExecutor(max_workers=len(ranges),
+                                    thread_name_prefix="chunk_encoder") as pool:
+                outputs = list(pool.map(self._encode_chunk, range(len(ranges)), ranges))
+            self.stats['encode_time'] = time.perf_counter() - start
+
+            if self._cancelled.is_set():
+                raise Exception("Chunked encoding cancelled")
+
+            start = time.perf_counter()
+            self._mux(outputs)
+            self.stats['mux_time'] = time.perf_counter() - start
+            return True
+
+        except Exception as e:
+            self.error = self.error or str(e)
+            self.error_handler.handle_error(e, context="Chunked encoding")
+            return False
+
+        finally:
+            self._remove_work_dir()
+
+    def _encode_chunk(self, index: int, frame_range: Tuple[int, int]) -> Path:
+        """Encode one frame range to its own video-only file."""
+        first_frame, frame_count = frame_range
+        output = self.work_dir / f"chunk_{index:03d}.mkv"
+        threads = max(1, (os.cpu_count() or 1) // self.chunks)
+
+        command = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-nostats', '-progress', 'pipe:1',
+            '-skip_initial_bytes', str(first_frame * self.bytes_per_frame),
+            *rawvideo_input_args(self.width, self.height, self.fps,
+                                 pix_fmt=self.pix_fmt, source=str(self.source)),
+            '-frames:v', str(frame_count),
+            *self.video_args,
+            # Every chunk starts on an IDR frame and no GOP reaches outside it
+            '-flags', '+cgop',
+            '-threads', str(threads),
+            '-an',
+            '-y', str(output)
+        ]
+
+        with self._lock:
+            if self._cancelled.is_set():
+                return output
+            process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, universal_newlines=True)
+            self.processes[index] = process
+
+        for line in process.stdout:
+            if line.startswith('frame='):
+                try:
+                    self._update_progress(index, int(line.split('=')[1]))
+                except ValueError:
+                    pass
+        process.wait()
+
+        if process.returncode != 0 and not self._cancelled.is_set():
+            self.error = f"Chunk {index} failed: {process.stderr.read()[-500:]}"
+            self.cancel()
+            raise Exception(self.error)
+
+        self._update_progress(index, frame_count)
+        return output
+
+    def _update_progress(self, index: int, frames: int):
+        with self._lock:
+            self.frames_done[index] = frames
+            self.stats['frames_encoded'] = sum(self.frames_done.values())
+            self.stats['progress'] = self.stats['frames_encoded'] / self.stats['total_frames']
+        if self.on_progress:
+            self.on_progress(self.stats['progress'])
+
+    def _mux(self, chunks: List[Path]):
+        """Join the chunks and add the audio track."""
+        concat_list = self.work_dir / "concat.txt"
+        concat_list.write_text("".join(f"file '{path.name}'\n" for path in chunks))
+
+        command = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', str(concat_list)
+        ]
+        if self.audio_source:
+            command.extend(['-i', str(self.audio_source), '-map', '0:v', '-map', '1:a',
+                            *self.audio_args])
+        command.extend(['-c:v', 'copy', *self.output_args, '-y', str(self.output)])
+
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"Joining encoded chunks failed: {result.stderr[-500:]}")
+
+    def cancel(self):
+        """Stop every running chunk encoder."""
+        with self._lock:
+            self._cancelled.set()
+            processes = list(self.processes.values())
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+
+    def _remove_work_dir(self):
+        try:
+            if self.work_dir.exists():
+                for path in self.work_dir.iterdir():
+                    path.unlink()
+                self.work_dir.rmdir()
+        except OSError as e:
+            self.logger.warning(f"Could not remove {self.work_dir}: {e}")
+
+    def get_statistics(self) -> Dict:
+        """Get chunked encoding statistics."""
+        return {
+            **self.stats,
+            'running': sum(1 for p in self.processes.values() if p.poll() is None),
+            'error': self.error
+        }
@@ -0,0 +1,263 @@
+# src/utils/disk_writer.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import os
+import mmap
+import time
+import queue
+import shutil
+import logging
+import threading
+from typing import Optional, Dict, List, Union
+import numpy as np
+
+from src.constants import *
+from src.utils.error_handler import ErrorHandler
+
+WRITEV_MAX_BUFFERS = 512  # Stays under IOV_MAX on every POSIX system
+
+class DiskWriter:
+    """Write-behind file writer for raw capture streams.
+
+    Callers queue buffers (frame arrays are kept as views, not copied) and
+    a writer thread gathers them into large ``writev`` calls, so a slow
+    flush stalls the writer instead of the capture thread. With ``direct``
+    the file is opened with ``O_DIRECT`` and written through a page-aligned
+    staging buffer, bypassing the page cache. Space is reserved ahead of
+    the write position with ``posix_fallocate`` from the stream's data rate,
+    and the file is trimmed to its real length on close.
+    """
+
+    def __init__(self, path: Union[str, Path], bytes_per_second: int = 0,
+                 buffer_size: int = RECORDING_WRITE_BUFFER,
+                 queue_size: int = RECORDING_WRITE_QUEUE,
+                 direct: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.error_handler = ErrorHandler(DEFAULT_LOGS_PATH)
+
+        self.path = Path(path)
+        self.bytes_per_second = bytes_per_second
+        self.buffer_size = buffer_size
+        self.direct = direct and hasattr(os, 'O_DIRECT')
+
+        self.fd: Optional[int] = None
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread: Optional[threading.Thread] = None
+        self._staging: Optional[mmap.mmap] = None  # O_DIRECT needs aligned memory
+        self._staged = 0
+
+        self.position = 0  # Bytes of stream data written
+        self.allocated = 0
+        self.is_open = False
+        self.error: Optional[str] = None
+        self.stats = {
+            'bytes_written': 0,
+            'writes': 0,
+            'buffers_dropped': 0,
+            'write_time': 0.0,
+            'worst_write_latency': 0.0,
+            'sustained_mbps': 0.0,
+            'preallocated': 0
+        }
+        self._start_time = 0.0
+
+    def open(self) -> bool:
+        """Create the file and start the writer thread."""
+        try:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+            if self.direct:
+                flags |= os.O_DIRECT
+                self.buffer_size -= self.buffer_size % mmap.PAGESIZE
+                self._staging = mmap.mmap(-1, self.buffer_size)
+            self.fd = os.open(self.path, flags, 0o644)
+
+            self._preallocate()
+            self.is_open = True
+            self._start_time = time.perf_counter()
+            self.thread = threading.Thread(
+                target=self._writer_loop, name="disk_writer", daemon=True
+            )
+            self.thread.start()
+            return True
+
+        except Exception as e:
+            self.error = str(e)
+            self.error_handler.handle_error(e, context="Opening disk writer")
+            self._close_fd()
+            return False
+
+    def write(self, data: Union[bytes, np.ndarray], timeout: Optional[float] = None) -> bool:
+        """Queue ``data`` for writing; False if it was dropped.
+
+        Arrays are queued by reference and must not be modified afterwards.
+        Blocks while the queue is full, for at most ``timeout`` seconds.
+        """
+        if not self.is_open:
+            self.stats['buffers_dropped'] += 1
+            return False
+        if isinstance(data, np.ndarray):
+            data = np.ascontiguousarray(data)
+        try:
+            self.queue.put(memoryview(data).cast('B'), timeout=timeout)
+            return True
+        except queue.Full:
+            self.stats['buffers_dropped'] += 1
+            return False
+
+    def _writer_loop(self):
+        """Gather queued buffers into large writes until closed."""
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+
+                # Take whatever else is already waiting, up to one buffer's worth
+                batch = [item]
+                size = item.nbytes
+                closing = False
+                while size < self.buffer_size:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        closing = True
+                        break
+                    batch.append(item)
+                    size += item.nbytes
+
+                if self.direct:
+                    self._write_direct(batch)
+                else:
+                    self._write_batch(batch)
+                if closing:
+                    break
+
+            if self.direct:
+                self._flush_staging(final=True)
+
+        except Exception as e:
+            self.error = str(e)
+            self.is_open = False
+            self.error_handler.handle_error(e, context="Disk writer")
+            # Unblock producers waiting on a full queue
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+    def _write_batch(self, views: List[memoryview]):
+        """Write ``views`` in order, resuming after partial writes."""
+        while views:
+            start = time.perf_counter()
+            if hasattr(os, 'writev'):
+                written = os.writev(self.fd, views[:WRITEV_MAX_BUFFERS])
+            else:
+                written = os.write(self.fd, views[0])
+            self._record_write(written, time.perf_counter() - start)
+
+            # Drop what was written, keep the unwritten tail
+            while views and written >= views[0].nbytes:
+                written -= views[0].nbytes
+                views = views[1:]
+            if views and written:
+                views = [views[0][written:]] + views[1:]
+
+    def _write_direct(self, views: List[memoryview]):
+        """Copy ``views`` into the aligned staging buffer, writing it when full."""
+        for view in views:
+            while view.nbytes:
+                take = min(view.nbytes, self.buffer_size - self._staged)
+                self._staging[self._staged:self._staged + take] = view[:take]
+                self._staged += take
+                view = view[take:]
+                if self._staged == self.buffer_size:
+                    self._flush_staging()
+
+    def _flush_staging(self, final: bool = False):
+        """Write the staging buffer; the last partial block is padded, then trimmed."""
+        if not self._staged:
+            return
+        size = self._staged
+        if final:
+            # O_DIRECT writes whole blocks; close() truncates the padding
+            size += -size % mmap.PAGESIZE
+            self._staging[self._staged:size] = bytes(size - self._staged)
+
+        view = memoryview(self._staging)[:size]
+        start = time.perf_counter()
+        written = 0
+        while written < size:
+            written += os.write(self.fd, view[written:])
+        view.release()
+        self._record_write(self._staged, time.perf_counter() - start)
+        self._staged = 0
+
+    def _record_write(self, nbytes: int, latency: float):
+        self.position += nbytes
+        self.stats['bytes_written'] = self.position
+        self.stats['writes'] += 1
+        self.stats['write_time'] += latency
+        self.stats['worst_write_latency'] = max(self.stats['worst_write_latency'], latency)
+        elapsed = time.perf_counter() - self._start_time
+        if elapsed > 0:
+            self.stats['sustained_mbps'] = self.position / elapsed / 1e6
+
+        if self.allocated and self.position > self.allocated - self.buffer_size:
+            self._preallocate()
+
+    def _preallocate(self):
+        """Reserve the next RECORDING_PREALLOCATE_SECONDS of the stream on disk."""
+        if not self.bytes_per_second or not hasattr(os, 'posix_fallocate'):
+            return
+        try:
+            # Leave RECORDING_DISK_RESERVE free for everything else
+            free = shutil.disk_usage(self.path.parent).free - RECORDING_DISK_RESERVE
+            size = min(self.bytes_per_second * RECORDING_PREALLOCATE_SECONDS, free)
+            if size <= 0:
+                return
+            offset = max(self.allocated, self.position)
+            os.posix_fallocate(self.fd, offset, size)
+            self.allocated = offset + size
+            self.stats['preallocated'] = self.allocated
+        except OSError as e:
+            # Not supported by every filesystem; writes still extend the file
+            self.logger.debug(f"Preallocation unavailable: {e}")
+            self.bytes_per_second = 0
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued, trim the file and close it."""
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join(timeout)
+            self.thread = None
+        self.is_open = False
+        self._close_fd()
+        return self.error is None
+
+    def _close_fd(self):
+        try:
+            if self.fd is not None:
+                # Drop preallocated space and O_DIRECT padding past the data
+                os.ftruncate(self.fd, self.position)
+                os.close(self.fd)
+        except OSError as e:
+            self.logger.warning(f"Error closing {self.path.name}: {e}")
+        finally:
+            self.fd = None
+            if self._staging:
+                self._staging.close()
+                self._staging = None
+
+    def get_statistics(self) -> Dict:
+        """Get disk writer statistics."""
+        return {
+            **self.stats,
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'direct': self.direct,
+            'error': self.error
+        }
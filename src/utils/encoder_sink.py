@@ -0,0 +1,404 @@
+# src/utils/encoder_sink.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import os
+import socket
+import logging
+import threading
+import subprocess
+import queue
+import tempfile
+import time
+from typing import Optional, Dict, List, Union, Callable
+import numpy as np
+
+from src.constants import *
+from src.utils.error_handler import ErrorHandler
+
+# VideoFrame.format layouts and the FFmpeg pixel formats that describe them
+FRAME_PIX_FMTS = {'BGR': 'bgr24', 'BGRA': 'bgra', 'RGB': 'rgb24', 'GRAY': 'gray', 'I420': 'yuv420p'}
+CHANNEL_PIX_FMTS = {1: 'gray', 3: 'bgr24', 4: 'bgra'}  # Capture frames are BGR-ordered
+PIX_FMT_BITS = {'gray': 8, 'yuv420p': 12, 'rgb24': 24, 'bgr24': 24, 'bgra': 32, 'rgba': 32}
+
+def pix_fmt_for_frame(frame: np.ndarray) -> str:
+    """FFmpeg pixel format of a capture frame, from its channel count."""
+    channels = frame.shape[2] if frame.ndim == 3 else 1
+    return CHANNEL_PIX_FMTS[channels]
+
+def frame_bytes(width: int, height: int, pix_fmt: str) -> int:
+    """Size of one raw frame in ``pix_fmt``."""
+    return width * height * PIX_FMT_BITS[pix_fmt] // 8
+
+def rawvideo_input_args(width: int, height: int, fps: float,
+                        pix_fmt: str = 'rgb24', source: str = 'pipe:0') -> List[str]:
+    """FFmpeg input arguments for headerless raw video."""
+    return [
+        '-f', 'rawvideo',
+        '-vcodec', 'rawvideo',
+        '-s', f'{width}x{height}',
+        '-pix_fmt', pix_fmt,
+        '-framerate', str(fps),
+        '-i', source
+    ]
+
+class EncoderSink:
+    """Feeds raw frames and PCM audio to an FFmpeg process through pipes.
+
+    Video goes through the process's stdin, audio through a second pipe
+    (a FIFO on POSIX, a loopback socket elsewhere). Each stream has its own
+    writer thread, so callers never block on the encoder unless they ask to.
+    """
+
+    def __init__(self, output: Union[str, Path], width: int, height: int,
+                 output_args: List[str], fps: float = DEFAULT_FPS,
+                 pix_fmt: str = 'rgb24', audio: bool = False,
+                 audio_rate: int = AUDIO_SAMPLE_RATE,
+                 audio_channels: int = AUDIO_CHANNELS,
+                 audio_format: str = 's16le',
+                 queue_size: int = DEFAULT_FPS):
+        self.logger = logging.getLogger(__name__)
+        self.error_handler = ErrorHandler(DEFAULT_LOGS_PATH)
+
+        self.output = str(output)
+        self.width = width
+        self.height = height
+        self.output_args = output_args
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+
+        self.audio = audio
+        self.audio_rate = audio_rate
+        self.audio_channels = audio_channels
+        self.audio_format = audio_format
+
+        self.process: Optional[subprocess.Popen] = None
+        self.video_queue = queue.Queue(maxsize=queue_size)
+        self.audio_queue = queue.Queue(maxsize=queue_size * 4)
+        self.threads: List[threading.Thread] = []
+        self._closing = threading.Event()
+
+        # Audio transport
+        self._fifo_dir: Optional[str] = None
+        self._audio_path: Optional[str] = None
+        self._audio_server: Optional[socket.socket] = None
+
+        self.is_open = False
+        self.error: Optional[str] = None
+        self.stats = {
+            'frames_written': 0,
+            'frames_dropped': 0,
+            'frames_stale': 0,
+            'audio_bytes_written': 0,
+            'bytes_written': 0,
+            'encoding_speed': 0.0,
+            'encoder_fps': 0.0
+        }
+
+    def _open_audio_transport(self) -> str:
+        """Create the audio pipe and return its FFmpeg input URL."""
+        if hasattr(os, 'mkfifo'):
+            self._fifo_dir = tempfile.mkdtemp(prefix="voiceclips_")
+            self._audio_path = os.path.join(self._fifo_dir, "audio.pcm")
+            os.mkfifo(self._audio_path)
+            return self._audio_path
+
+        # No FIFOs on Windows; FFmpeg connects to a loopback socket instead
+        self._audio_server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._audio_server.bind(('127.0.0.1', 0))
+        self._audio_server.listen(1)
+        port = self._audio_server.getsockname()[1]
+        return f"tcp://127.0.0.1:{port}"
+
+    def create_command(self, audio_source: Optional[str] = None) -> List[str]:
+        """Create the FFmpeg command for this sink."""
+        command = ['ffmpeg', '-hide_banner', '-nostats', '-progress', 'pipe:2']
+        command.extend(rawvideo_input_args(
+            self.width, self.height, self.fps, self.pix_fmt, 'pipe:0'
+        ))
+
+        if audio_source:
+            command.extend([
+                '-f', self.audio_format,
+                '-ar', str(self.audio_rate),
+                '-ac', str(self.audio_channels),
+                '-i', audio_source
+            ])
+
+        command.extend(self.output_args)
+        command.extend(['-y', self.output])
+        return command
+
+    def start(self) -> bool:
+        """Start the encoder process and writer threads."""
+        try:
+            if self.is_open:
+                return False
+
+            audio_source = self._open_audio_transport() if self.audio else None
+
+            self.process = subprocess.Popen(
+                self.create_command(audio_source),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                universal_newlines=False
+            )
+            self.is_open = True
+
+            targets = [self._video_writer, self._progress_reader]
+            if self.audio:
+                targets.append(self._audio_writer)
+
+            for target in targets:
+                thread = threading.Thread(target=target, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+            return True
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Starting encoder sink")
+            self.error = str(e)
+            self._close_audio_transport()
+            return False
+
+    def write_frame(self, frame: Optional[np.ndarray], block: bool = True,
+                    timeout: Optional[float] = None,
+                    resolve: Optional[Callable[[], Optional[np.ndarray]]] = None) -> bool:
+        """Queue a frame for the encoder; returns False if it was dropped.
+
+        For frames in a buffer that keeps being overwritten, pass ``resolve``
+        instead of ``frame``: the writer calls it just before the frame goes
+        into the pipe, and it returns the data to write, or None if the frame
+        is gone and must be skipped.
+        """
+        if not self.is_open:
+            return False
+
+        try:
+            self.video_queue.put((frame, resolve), block=block, timeout=timeout)
+            return True
+        except queue.Full:
+            self.stats['frames_dropped'] += 1
+            return False
+
+    def write_audio(self, data: Union[bytes, np.ndarray], block: bool = True,
+                    timeout: Optional[float] = None) -> bool:
+        """Queue PCM audio for the encoder; returns False if it was dropped."""
+        if not self.is_open or not self.audio:
+            return False
+
+        try:
+            self.audio_queue.put(data, block=block, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def _next_item(self, q: queue.Queue):
+        """Get the next queued item, or None once closing and drained."""
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self._closing.is_set():
+                    return None
+
+    def _video_writer(self):
+        """Write queued frames to the encoder's stdin."""
+        try:
+            while True:
+                item = self._next_item(self.video_queue)
+                if item is None:
+                    break
+
+                frame, resolve = item
+                if resolve is not None:
+                    frame = resolve()
+                    if frame is None:
+                        self.stats['frames_stale'] += 1
+                        self.video_queue.task_done()
+                        continue
+
+                # Contiguous frames are written straight from their buffer
+                data = np.ascontiguousarray(frame)
+                self.process.stdin.write(memoryview(data).cast('B'))
+                self.stats['frames_written'] += 1
+                self.stats['bytes_written'] += data.nbytes
+                self.video_queue.task_done()
+
+        except (BrokenPipeError, OSError) as e:
+            # Stop accepting frames; nothing drains the queue any more
+            self.is_open = False
+            self.error = f"Encoder video pipe closed: {e}"
+            self.logger.error(self.error)
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Encoder sink video writer")
+            self.error = str(e)
+        finally:
+            try:
+                self.process.stdin.close()
+            except Exception:
+                pass
+
+    def _audio_writer(self):
+        """Write queued PCM to the audio pipe."""
+        pipe = None
+        connection = None
+        try:
+            if self._audio_path:
+                # Blocks until FFmpeg opens the FIFO for reading
+                pipe = open(self._audio_path, 'wb')
+                write = pipe.write
+            else:
+                connection, _ = self._audio_server.accept()
+                write = connection.sendall
+
+            while True:
+                data = self._next_item(self.audio_queue)
+                if data is None:
+                    break
+
+                buffer = memoryview(data).cast('B')
+                write(buffer)
+                self.stats['audio_bytes_written'] += buffer.nbytes
+                self.audio_queue.task_done()
+
+        except (BrokenPipeError, OSError) as e:
+            self.error = f"Encoder audio pipe closed: {e}"
+            self.logger.error(self.error)
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Encoder sink audio writer")
+            self.error = str(e)
+        finally:
+            if pipe:
+                pipe.close()
+            if connection:
+                connection.close()
+
+    def _progress_reader(self):
+        """Drain FFmpeg's progress output so the encoder never stalls on it."""
+        try:
+            for raw_line in self.process.stderr:
+                line = raw_line.decode('utf-8', errors='replace').strip()
+                if line.startswith('speed='):
+                    try:
+                        self.stats['encoding_speed'] = float(line.split('=')[1].rstrip('x'))
+                    except ValueError:
+                        pass
+                elif line.startswith('fps='):
+                    try:
+                        self.stats['encoder_fps'] = float(line.split('=')[1])
+                    except ValueError:
+                        pass
+        except Exception as e:
+            self.logger.debug(f"Encoder progress reader stopped: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far has been written to the pipes."""
+        deadline = time.time() + timeout if timeout is not None else None
+        writers = list(zip((self.video_queue, self.audio_queue),
+                           (self.threads[0], self.threads[-1] if self.audio else None)))
+
+        for q, writer in writers:
+            while q.unfinished_tasks and writer is not None and writer.is_alive():
+                if deadline is not None and time.time() >= deadline:
+                    return False
+                time.sleep(0.005)
+
+        return self.error is None
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flush queued data, finalize the output and wait for FFmpeg."""
+        if not self.process or not self.threads:
+            return False
+
+        try:
+            # Writers drain what is queued, then close their pipes
+            self.is_open = False
+            self._closing.set()
+            video_thread, progress_thread, *audio_threads = self.threads
+            video_thread.join(timeout)
+
+            # If FFmpeg died before opening the audio FIFO, release the
+            # writer blocked in open()
+            if self.process.poll() is not None:
+                self._unblock_audio_open()
+
+            for thread in audio_threads:
+                thread.join(timeout)
+            progress_thread.join(timeout)
+            self.threads = []
+
+            returncode = self.process.wait(timeout=timeout)
+            if returncode != 0:
+                self.error = self.error or f"FFmpeg exited with code {returncode}"
+                self.logger.error(f"Encoder sink failed for {self.output}: {self.error}")
+                return False
+
+            return True
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Closing encoder sink")
+            self.error = str(e)
+            return False
+        finally:
+            self._close_audio_transport()
+
+    def abort(self):
+        """Stop the encoder immediately, discarding queued data."""
+        try:
+            self.is_open = False
+            self._closing.set()
+            for q in (self.video_queue, self.audio_queue):
+                while not q.empty():
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        break
+
+            if self.process and self.process.poll() is None:
+                self.process.kill()
+                self.process.wait()
+            self._unblock_audio_open()
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Aborting encoder sink")
+        finally:
+            self._close_audio_transport()
+
+    def _unblock_audio_open(self):
+        """Briefly open the FIFO's read end so a pending writer open() returns."""
+        try:
+            if self._audio_path and os.path.exists(self._audio_path):
+                fd = os.open(self._audio_path, os.O_RDONLY | os.O_NONBLOCK)
+                os.close(fd)
+        except OSError:
+            pass
+
+    def _close_audio_transport(self):
+        """Remove the audio FIFO or close the loopback listener."""
+        try:
+            if self._audio_server:
+                self._audio_server.close()
+                self._audio_server = None
+            if self._audio_path and os.path.exists(self._audio_path):
+                os.unlink(self._audio_path)
+            if self._fifo_dir and os.path.isdir(self._fifo_dir):
+                os.rmdir(self._fifo_dir)
+            self._audio_path = None
+            self._fifo_dir = None
+        except Exception as e:
+            self.logger.warning(f"Error closing audio pipe: {e}")
+
+    def get_statistics(self) -> Dict:
+        """Get encoder sink statistics."""
+        return {
+            **self.stats,
+            'queue_depth': self.video_queue.qsize(),
+            'queue_capacity': self.video_queue.maxsize,
+            'error': self.error
+        }
@@ -6,6 +6,7 @@ from typing import Dict, Optional, List
 from datetime import datetime
 import subprocess
 from packaging import version
+from src.utils.trim_engine import TrimEngine
 APP_VERSION = "1.0.0"
 
 class ExportManager:
@@ -17,6 +18,7 @@ class ExportManager:
             'clips': ['mp4', 'mov', 'mkv'],
             'recordings': ['mp4', 'mov', 'mkv']
         }
+        self.trim_engine = TrimEngine()
 
     def export_settings(self, settings: Dict, filepath: str) -> bool:
         """Export application settings."""
@@ -97,6 +99,20 @@ class ExportManager:
             self.logger.error(f"Error exporting clip: {e}")
             return False
 
+    def trim_recording(self, recording_path: str, output_path: str,
+                       start: float, end: float, accurate: bool = False) -> bool:
+        """Cut a time range from a recording by stream copy.
+
+        Set ``accurate`` to start on the exact frame; only the partial GOP
+        before the first keyframe is re-encoded.
+        """
+        try:
+            return self.trim_engine.trim(recording_path, output_path, start, end, accurate)
+
+        except Exception as e:
+            self.logger.error(f"Error trimming recording: {e}")
+            return False
+
     def _get_default_export_settings(self, format: str) -> Dict:
         """Get default export settings for format."""
         settings = {
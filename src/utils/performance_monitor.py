@@ -19,6 +19,7 @@ class PerformanceMetrics:
         self.bitrate = 0.0
         self.audio_levels = {}
         self.gpu_usage = 0.0
+        self.recording_loop_cpu = 0.0  # % of one core used by the recording loop
         self.timestamp = datetime.now()
 
 class PerformanceMonitor:
@@ -26,6 +27,7 @@ class PerformanceMonitor:
         self.logger = logging.getLogger(__name__)
         self.monitoring = False
         self.metrics = PerformanceMetrics()
+        self.recorder = None
         
         # Initialize current_metrics instead of relying on a non-existent attribute
         self.current_metrics = {
@@ -47,6 +49,10 @@ class PerformanceMonitor:
             'gpu': deque(maxlen=self.history_length)
         }
 
+    def attach_recorder(self, recorder):
+        """Report a RecordingManager's encoder and loop statistics."""
+        self.recorder = recorder
+
     def start(self):
         """Start performance monitoring."""
         if self.monitoring:
@@ -77,6 +83,12 @@ class PerformanceMonitor:
                 # You can add more metrics as needed
                 self.current_metrics['fps'] = 0.0  # Update with actual FPS if available
                 self.current_metrics['gpu_usage'] = 0.0  # Update with actual GPU usage if available
+                self.metrics.cpu_usage = self.current_metrics['cpu_usage']
+                
+                if self.recorder:
+                    recording = self.recorder.get_statistics()
+                    self.metrics.encoding_speed = recording['encoding_speed']
+                    self.metrics.recording_loop_cpu = recording['loop_cpu_percent']
                 
                 # Store in history
                 self._update_histories()
@@ -0,0 +1,1011 @@
+# src/utils/replay_buffer.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import os
+import math
+import logging
+import threading
+import subprocess
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+from typing import Optional, Dict, List
+import numpy as np
+import cv2
+
+from src.constants import *
+from src.utils.error_handler import ErrorHandler
+from src.utils.encoder_sink import EncoderSink
+
+@dataclass
+class RingSnapshot:
+    """A frozen window of a ring buffer, by absolute write sequence."""
+    start: int
+    end: int
+    generation: int = 0
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+class FrameRingBuffer:
+    """Fixed-capacity frame store backed by one preallocated uint8 array.
+
+    Frames are copied in place into a ``(slots, H, W, C)`` array with a
+    parallel float64 timestamp array, so appending never allocates. Reads
+    return views into the store in capture order.
+
+    ``reserve`` extra slots beyond ``capacity`` keep snapshotted frames
+    resident while capture carries on, so a save can drain a snapshot
+    without holding up the writer.
+    """
+
+    def __init__(self, capacity: int, reserve: int = 0):
+        self.capacity = max(1, int(capacity))
+        self.reserve = max(0, int(reserve))
+        self.frames: Optional[np.ndarray] = None
+        self.timestamps = np.zeros(self.slots, dtype=np.float64)
+        self.write_count = 0  # Total frames ever written
+        self.generation = 0  # Bumped whenever sequence numbers are reset
+
+    @property
+    def slots(self) -> int:
+        """Physical slots: the visible window plus the snapshot reserve."""
+        return self.capacity + self.reserve
+
+    @property
+    def maxlen(self) -> int:
+        """Capacity in frames (mirrors ``deque.maxlen``)."""
+        return self.capacity
+
+    @property
+    def frame_shape(self) -> Optional[tuple]:
+        return self.frames.shape[1:] if self.frames is not None else None
+
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes if self.frames is not None else 0
+
+    def _allocate(self, frame_shape: tuple):
+        """Allocate storage for frames of the given shape."""
+        self.frames = np.empty((self.slots, *frame_shape), dtype=np.uint8)
+        self.write_count = 0
+        self.generation += 1
+
+    def __len__(self) -> int:
+        return min(self.write_count, self.capacity)
+
+    def __bool__(self) -> bool:
+        return self.write_count > 0
+
+    def append(self, frame: np.ndarray, timestamp: float):
+        """Copy a frame into the next slot, overwriting the oldest when full."""
+        if self.frames is None or self.frames.shape[1:] != frame.shape:
+            self._allocate(frame.shape)
+
+        slot = self.write_count % self.slots
+        np.copyto(self.frames[slot], frame, casting='unsafe')
+        self.timestamps[slot] = timestamp
+        self.write_count += 1
+
+    def _slots(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """Slot indexes for a sequence range (default: the window), oldest first."""
+        if start is None:
+            start = self.write_count - len(self)
+        if end is None:
+            end = self.write_count
+        return np.arange(start, end) % self.slots
+
+    def snapshot(self) -> RingSnapshot:
+        """Freeze the current window in O(1) without copying frames."""
+        return RingSnapshot(
+            start=self.write_count - len(self),
+            end=self.write_count,
+            generation=self.generation
+        )
+
+    def find_range(self, start_time: Optional[float] = None,
+                   end_time: Optional[float] = None) -> RingSnapshot:
+        """Freeze the frames captured in ``[start_time, end_time]``.
+
+        Timestamps are monotonic in capture order, so both ends are found by
+        binary search over the window in O(log n) without touching frames.
+        """
+        first = self.write_count - len(self)
+        start = first if start_time is None else self._bisect(start_time, first)
+        end = (self.write_count if end_time is None
+               else self._bisect(end_time, first, right=True))
+        return RingSnapshot(start=start, end=max(start, end), generation=self.generation)
+
+    def _bisect(self, value: float, lo: int, right: bool = False) -> int:
+        """Sequence number where ``value`` would be inserted among buffered timestamps."""
+        hi = self.write_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            timestamp = self.timestamps[mid % self.slots]
+            if timestamp < value or (right and timestamp == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def is_resident(self, sequence: int, margin: int = 0,
+                    generation: Optional[int] = None) -> bool:
+        """Whether a frame is still stored and will survive ``margin`` more writes."""
+        if generation is not None and generation != self.generation:
+            return False
+        return self.write_count - self.slots + margin <= sequence < self.write_count
+
+    def frame_at(self, sequence: int) -> np.ndarray:
+        """View of the frame with the given absolute sequence number."""
+        return self.frames[sequence % self.slots]
+
+    def timestamp_at(self, sequence: int) -> float:
+        """Timestamp of the frame with the given absolute sequence number."""
+        return float(self.timestamps[sequence % self.slots])
+
+    def __iter__(self):
+        for sequence in range(self.write_count - len(self), self.write_count):
+            yield self.frame_at(sequence)
+
+    def get_frames(self) -> List[np.ndarray]:
+        """Get views of all buffered frames, oldest first."""
+        return list(self)
+
+    def get_timestamps(self) -> np.ndarray:
+        """Get timestamps of all buffered frames, oldest first."""
+        return self.timestamps[self._slots()]
+
+    def resize(self, capacity: int):
+        """Change capacity, keeping the newest frames that still fit."""
+        capacity = max(1, int(capacity))
+        if capacity == self.capacity:
+            return
+
+        keep = self._slots()[-capacity:]
+        timestamps = np.zeros(capacity + self.reserve, dtype=np.float64)
+        timestamps[:len(keep)] = self.timestamps[keep]
+
+        frames = None
+        if self.frames is not None:
+            frames = np.empty((capacity + self.reserve, *self.frames.shape[1:]), dtype=np.uint8)
+            frames[:len(keep)] = self.frames[keep]
+
+        self.capacity = capacity
+        self.frames = frames
+        self.timestamps = timestamps
+        self.write_count = len(keep)
+        self.generation += 1
+
+    def clear(self):
+        """Drop all buffered frames, keeping the allocation."""
+        self.write_count = 0
+        self.generation += 1
+
+    def get_statistics(self) -> Dict:
+        """Get buffer memory statistics."""
+        timestamps = self.get_timestamps()
+        span = float(timestamps[-1] - timestamps[0]) if len(timestamps) > 1 else 0.0
+        stored = self.nbytes * len(self) // self.slots
+
+        return {
+            'codec': 'raw',
+            'frames': len(self),
+            'bytes': self.nbytes,
+            'bytes_per_second': stored / span if span else 0.0
+        }
+
+    def close(self):
+        """Release resources held by the buffer."""
+        self.frames = None
+        self.write_count = 0
+
+class CompressedFrameRingBuffer(FrameRingBuffer):
+    """Frame ring that keeps frames intra-coded (JPEG or PNG) in memory.
+
+    Frames are compressed on a thread pool as they arrive and only decoded
+    when read, trading CPU at save time for a far smaller resident window.
+    Frames handed to ``append`` must not be modified afterwards; they are
+    referenced until their encode completes.
+    """
+
+    def __init__(self, capacity: int, reserve: int = 0,
+                 codec: str = "jpeg", workers: Optional[int] = None):
+        super().__init__(capacity, reserve)
+        self.logger = logging.getLogger(__name__)
+
+        if codec not in REPLAY_BUFFER_CODEC_PARAMS:
+            raise ValueError(f"Unsupported replay buffer codec: {codec}")
+        self.codec = codec
+        self.extension, params = REPLAY_BUFFER_CODEC_PARAMS[codec]
+        self.params = [int(getattr(cv2, name)) if isinstance(name, str) else name
+                       for name in params]
+
+        self.workers = workers or max(2, (os.cpu_count() or 2) // 2)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="frame_codec"
+        )
+        # Bound in-flight encodes so a slow codec drops frames instead of
+        # queueing unbounded raw frames
+        self._pending = threading.BoundedSemaphore(self.workers * 2)
+
+        self._shape: Optional[tuple] = None
+        self.encoded_sizes = np.zeros(self.slots, dtype=np.int64)
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            'frames_encoded': 0,
+            'frames_dropped': 0,
+            'raw_bytes': 0,
+            'encoded_bytes': 0,
+            'encode_time': 0.0
+        }
+
+    @property
+    def frame_shape(self) -> Optional[tuple]:
+        return self._shape
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.encoded_sizes.sum())
+
+    def _allocate(self, frame_shape: tuple):
+        """Reset storage for frames of the given shape."""
+        self.frames = [None] * self.slots
+        self.encoded_sizes[:] = 0
+        self._shape = frame_shape
+        self.write_count = 0
+        self.generation += 1
+
+    def append(self, frame: np.ndarray, timestamp: float):
+        """Queue a frame for compression into the next slot."""
+        if self.frames is None or self._shape != frame.shape:
+            self._allocate(frame.shape)
+
+        if not self._pending.acquire(blocking=False):
+            with self.stats_lock:
+                self.stats['frames_dropped'] += 1
+            return
+
+        slot = self.write_count % self.slots
+        self.encoded_sizes[slot] = 0
+        self.frames[slot] = self.executor.submit(self._encode, frame, slot)
+        self.timestamps[slot] = timestamp
+        self.write_count += 1
+
+    def _encode(self, frame: np.ndarray, slot: int) -> np.ndarray:
+        """Compress one frame on a codec worker."""
+        try:
+            start = time.perf_counter()
+            ok, encoded = cv2.imencode(self.extension, frame, self.params)
+            if not ok:
+                raise ValueError(f"{self.codec} encode failed")
+            elapsed = time.perf_counter() - start
+
+            self.encoded_sizes[slot] = encoded.nbytes
+            with self.stats_lock:
+                self.stats['frames_encoded'] += 1
+                self.stats['raw_bytes'] += frame.nbytes
+                self.stats['encoded_bytes'] += encoded.nbytes
+                self.stats['encode_time'] += elapsed
+            return encoded
+        finally:
+            self._pending.release()
+
+    def frame_at(self, sequence: int) -> np.ndarray:
+        """Decode the frame with the given absolute sequence number."""
+        encoded = self.frames[sequence % self.slots]
+        if isinstance(encoded, Future):
+            encoded = encoded.result()
+        return cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED)
+
+    def resize(self, capacity: int):
+        """Change capacity, keeping the newest frames that still fit."""
+        capacity = max(1, int(capacity))
+        if capacity == self.capacity:
+            return
+
+        keep = self._slots()[-capacity:]
+        slots = capacity + self.reserve
+
+        timestamps = np.zeros(slots, dtype=np.float64)
+        timestamps[:len(keep)] = self.timestamps[keep]
+        sizes = np.zeros(slots, dtype=np.int64)
+        sizes[:len(keep)] = self.encoded_sizes[keep]
+
+        frames = None
+        if self.frames is not None:
+            frames = [None] * slots
+            for index, slot in enumerate(keep):
+                frames[index] = self.frames[slot]
+
+        self.capacity = capacity
+        self.frames = frames
+        self.timestamps = timestamps
+        self.encoded_sizes = sizes
+        self.write_count = len(keep)
+        self.generation += 1
+
+    def get_statistics(self) -> Dict:
+        """Get compression and memory statistics."""
+        stats = super().get_statistics()
+        with self.stats_lock:
+            encoded = dict(self.stats)
+
+        timestamps = self.get_timestamps()
+        span = float(timestamps[-1] - timestamps[0]) if len(timestamps) > 1 else 0.0
+        window_bytes = int(self.encoded_sizes[self._slots()].sum()) if len(self) else 0
+        per_worker = encoded['encode_time'] / self.workers
+
+        stats.update({
+            'codec': self.codec,
+            'bytes_per_second': window_bytes / span if span else 0.0,
+            'compression_ratio': (
+                encoded['raw_bytes'] / encoded['encoded_bytes'] if encoded['encoded_bytes'] else 0.0
+            ),
+            # Throughput the worker pool sustains when fully busy
+            'encode_fps': encoded['frames_encoded'] / per_worker if per_worker else 0.0,
+            'encode_mb_per_second': (
+                encoded['raw_bytes'] / per_worker / (1024 * 1024) if per_worker else 0.0
+            ),
+            'frames_dropped': encoded['frames_dropped']
+        })
+        return stats
+
+    def close(self):
+        """Stop the codec workers and drop buffered frames."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        super().close()
+
+class MappedFrameRingBuffer(FrameRingBuffer):
+    """Frame ring stored in a fixed-size memory-mapped file.
+
+    The file holds a small header (write cursor, slot count, frame shape),
+    the timestamp index and the frame slots. Frames are copied straight into
+    the map and read back as views of it, so long windows live in the OS
+    page cache instead of pinned anonymous memory.
+    """
+
+    HEADER_SIZE = 4096  # One page; keeps the timestamp index page-aligned
+    HEADER_DTYPE = np.dtype([
+        ('magic', 'S8'),
+        ('slots', '<i8'),
+        ('shape', '<i8', (3,)),
+        ('write_count', '<i8')
+    ])
+    MAGIC = b'VCRING01'
+
+    def __init__(self, capacity: int, reserve: int = 0,
+                 cache_dir: Optional[str] = None):
+        super().__init__(capacity, reserve)
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_PATH)
+        self.header: Optional[np.memmap] = None
+        self._mappings = 0
+        self.path = self._next_path()
+
+    def _next_path(self) -> Path:
+        """A fresh ring file name; a resize maps a new file before dropping the old one."""
+        self._mappings += 1
+        return self.cache_dir / f"replay_{os.getpid()}_{id(self):x}_{self._mappings}.ring"
+
+    @property
+    def nbytes(self) -> int:
+        return self.path.stat().st_size if self.frames is not None else 0
+
+    def _layout(self, slots: int, frame_shape: tuple):
+        """Byte offsets of the timestamp index and frames, and the file size."""
+        page = self.HEADER_SIZE
+        frames_offset = page + -(-slots * 8 // page) * page
+        frame_bytes = int(np.prod(frame_shape))
+        return page, frames_offset, frames_offset + slots * frame_bytes
+
+    def _map(self, path: Path, slots: int, frame_shape: tuple):
+        """Create a ring file and map its header, timestamps and frames."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        timestamps_offset, frames_offset, size = self._layout(slots, frame_shape)
+        with open(path, 'wb') as f:
+            f.truncate(size)  # Sparse; pages are backed on first write
+
+        header = np.memmap(path, dtype=self.HEADER_DTYPE, mode='r+', shape=(1,))
+        header['magic'] = self.MAGIC
+        header['slots'] = slots
+        header['shape'] = frame_shape
+        header['write_count'] = 0
+        timestamps = np.memmap(path, dtype=np.float64, mode='r+',
+                               offset=timestamps_offset, shape=(slots,))
+        frames = np.memmap(path, dtype=np.uint8, mode='r+',
+                           offset=frames_offset, shape=(slots, *frame_shape))
+        return header, timestamps, frames
+
+    def _allocate(self, frame_shape: tuple):
+        """Map a ring file for frames of the given shape."""
+        self._unmap()
+        self.header, self.timestamps, self.frames = self._map(
+            self.path, self.slots, frame_shape
+        )
+        self.write_count = 0
+        self.generation += 1
+        self.logger.info(f"Mapped replay ring: {self.path} ({self.nbytes / 1024 ** 2:.0f} MB)")
+
+    def append(self, frame: np.ndarray, timestamp: float):
+        """Copy a frame into the mapped slot and advance the stored cursor."""
+        super().append(frame, timestamp)
+        self.header['write_count'] = self.write_count
+
+    def resize(self, capacity: int):
+        """Change capacity, keeping the newest frames that still fit."""
+        capacity = max(1, int(capacity))
+        if capacity == self.capacity:
+            return
+
+        keep = self._slots()[-capacity:]
+        slots = capacity + self.reserve
+
+        if self.frames is None:
+            self.capacity = capacity
+            self.timestamps = np.zeros(slots, dtype=np.float64)
+            self.write_count = 0
+            self.generation += 1
+            return
+
+        path = self._next_path()
+        header, timestamps, frames = self._map(path, slots, self.frames.shape[1:])
+        timestamps[:len(keep)] = self.timestamps[keep]
+        # Frame by frame, so the copy never needs the window in memory at once
+        for index, slot in enumerate(keep):
+            frames[index] = self.frames[slot]
+        header['write_count'] = len(keep)
+
+        self._unmap()
+        self.path = path
+        self.header, self.timestamps, self.frames = header, timestamps, frames
+        self.capacity = capacity
+        self.write_count = len(keep)
+        self.generation += 1
+
+    def clear(self):
+        """Drop all buffered frames, keeping the mapping."""
+        super().clear()
+        if self.header is not None:
+            self.header['write_count'] = 0
+
+    def _unmap(self):
+        """Release the current mapping and delete its file."""
+        self.header = None
+        self.frames = None
+        self.timestamps = np.zeros(self.slots, dtype=np.float64)
+        try:
+            if self.path.exists():
+                self.path.unlink()
+        except OSError as e:
+            # Windows refuses while views are still referenced elsewhere
+            self.logger.warning(f"Could not remove replay ring file {self.path}: {e}")
+
+    def get_statistics(self) -> Dict:
+        """Get buffer statistics."""
+        stats = super().get_statistics()
+        stats['codec'] = 'mmap'
+        stats['path'] = str(self.path)
+        return stats
+
+    def close(self):
+        """Unmap and delete the ring file."""
+        self._unmap()
+        super().close()
+
+class AudioRingBuffer:
+    """Preallocated ring of interleaved int16 PCM with a chunk timestamp index.
+
+    Samples are written in place behind a cursor, and the capture timestamp
+    of every chunk is indexed by its first sample, so a time window maps to
+    an exact sample range. Reads return views, at most two per window.
+    """
+
+    def __init__(self, duration: float, sample_rate: int = AUDIO_SAMPLE_RATE,
+                 channels: int = AUDIO_CHANNELS, reserve: float = 0):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.capacity = max(1, int(duration * sample_rate))
+        self.reserve = max(0, int(reserve * sample_rate))
+        self.samples = np.zeros((self.slots, channels), dtype=np.int16)
+        self.write_count = 0  # Sample frames ever written
+        self.generation = 0
+
+        # Chunk index: first sample and capture time of recent chunks
+        self.index_size = max(64, self.slots // 128)
+        self.chunk_positions = np.zeros(self.index_size, dtype=np.int64)
+        self.chunk_times = np.zeros(self.index_size, dtype=np.float64)
+        self.chunk_count = 0
+
+    @property
+    def slots(self) -> int:
+        return self.capacity + self.reserve
+
+    @property
+    def maxlen(self) -> int:
+        """Capacity in sample frames (mirrors ``deque.maxlen``)."""
+        return self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples.nbytes
+
+    def __len__(self) -> int:
+        return min(self.write_count, self.capacity)
+
+    def __bool__(self) -> bool:
+        return self.write_count > 0
+
+    def append(self, data, timestamp: float):
+        """Copy a chunk of interleaved int16 PCM in behind the write cursor."""
+        pcm = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray, memoryview)) \
+            else np.asarray(data, dtype=np.int16)
+        usable = len(pcm) - len(pcm) % self.channels
+        pcm = pcm[:usable].reshape(-1, self.channels)
+        if not len(pcm):
+            return
+
+        # Index the chunk by its first sample
+        entry = self.chunk_count % self.index_size
+        self.chunk_positions[entry] = self.write_count
+        self.chunk_times[entry] = timestamp
+        self.chunk_count += 1
+
+        # A chunk longer than the ring only keeps its tail
+        skip = max(0, len(pcm) - self.slots)
+        pcm = pcm[skip:]
+        self.write_count += skip
+
+        start = self.write_count % self.slots
+        first = min(len(pcm), self.slots - start)
+        self.samples[start:start + first] = pcm[:first]
+        self.samples[:len(pcm) - first] = pcm[first:]
+        self.write_count += len(pcm)
+
+    def sample_at(self, timestamp: float) -> int:
+        """Absolute sample position captured at ``timestamp``."""
+        oldest = max(0, self.write_count - self.slots)
+        indexed = min(self.chunk_count, self.index_size)
+        if not indexed:
+            return oldest
+
+        # Binary search for the last chunk starting at or before timestamp
+        lo, hi = self.chunk_count - indexed, self.chunk_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.chunk_times[mid % self.index_size] <= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        entry = max(lo - 1, self.chunk_count - indexed) % self.index_size
+
+        position = self.chunk_positions[entry] + int(round(
+            (timestamp - self.chunk_times[entry]) * self.sample_rate
+        ))
+        return int(min(max(position, oldest), self.write_count))
+
+    def time_at(self, sequence: int) -> float:
+        """Capture time of the sample at absolute position ``sequence``."""
+        indexed = min(self.chunk_count, self.index_size)
+        if not indexed:
+            return 0.0
+
+        # Binary search for the last chunk starting at or before the sample
+        lo, hi = self.chunk_count - indexed, self.chunk_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.chunk_positions[mid % self.index_size] <= sequence:
+                lo = mid + 1
+            else:
+                hi = mid
+        entry = max(lo - 1, self.chunk_count - indexed) % self.index_size
+
+        return float(self.chunk_times[entry] +
+                     (sequence - self.chunk_positions[entry]) / self.sample_rate)
+
+    def find_range(self, start_time: Optional[float] = None,
+                   end_time: Optional[float] = None) -> RingSnapshot:
+        """Freeze the samples captured in ``[start_time, end_time)``."""
+        first = self.write_count - len(self)
+        start = first if start_time is None else max(self.sample_at(start_time), first)
+        end = self.write_count if end_time is None else self.sample_at(end_time)
+        return RingSnapshot(start=start, end=max(start, end), generation=self.generation)
+
+    def is_resident(self, sequence: int, generation: Optional[int] = None) -> bool:
+        """Whether a sample position is still stored."""
+        if generation is not None and generation != self.generation:
+            return False
+        return self.write_count - self.slots <= sequence <= self.write_count
+
+    def get_views(self, start: int, end: int) -> List[np.ndarray]:
+        """Views of the samples in ``[start, end)``, split at the wrap point."""
+        if end <= start:
+            return []
+
+        first = start % self.slots
+        count = end - start
+        if first + count <= self.slots:
+            return [self.samples[first:first + count]]
+        return [self.samples[first:], self.samples[:first + count - self.slots]]
+
+    def resize(self, duration: float):
+        """Change capacity, keeping the newest samples that still fit."""
+        capacity = max(1, int(duration * self.sample_rate))
+        if capacity == self.capacity:
+            return
+
+        keep = min(len(self), capacity)
+        tail = self.get_views(self.write_count - keep, self.write_count)
+
+        self.capacity = capacity
+        self.samples = np.zeros((self.slots, self.channels), dtype=np.int16)
+        if tail:
+            self.samples[:keep] = np.concatenate(tail)
+
+        # Re-base the chunk index onto the new sample positions
+        offset = self.write_count - keep
+        self.chunk_positions -= offset
+        self.write_count = keep
+        self.generation += 1
+
+    def clear(self):
+        """Drop all buffered audio, keeping the allocation."""
+        self.write_count = 0
+        self.chunk_count = 0
+        self.generation += 1
+
+@dataclass
+class ReplaySegment:
+    """A finished, independently decodable replay segment."""
+    path: Path
+    start_time: float
+    end_time: float
+
+class SegmentReplayBuffer:
+    """Encodes captured frames continuously into short keyframe-aligned segments.
+
+    Only the newest segments covering the replay window are kept on disk, so a
+    clip is a stream copy of a few finished segments instead of a full encode.
+    """
+
+    def __init__(self, duration: float = DEFAULT_CLIP_DURATION,
+                 segment_length: float = REPLAY_SEGMENT_LENGTH,
+                 cache_dir: str = DEFAULT_CACHE_PATH,
+                 fps: int = DEFAULT_FPS,
+                 preset: str = DEFAULT_VIDEO_PRESET):
+        self.logger = logging.getLogger(__name__)
+        self.error_handler = ErrorHandler(DEFAULT_LOGS_PATH)
+
+        self.duration = duration
+        self.segment_length = segment_length
+        self.fps = fps
+        self.preset = preset
+        self.cache_dir = Path(cache_dir) / f"replay_{int(time.time() * 1000)}"
+
+        # Keep one extra segment so the window is still covered while the
+        # oldest segment is being replaced
+        self.max_segments = math.ceil(duration / segment_length) + 1
+        self.segments: deque = deque()
+        self.segment_lock = threading.Lock()
+
+        # Segments being read by an export are leased; expired segments
+        # wait in ``_retired`` until no export uses them
+        self._leases: Dict[Path, int] = {}
+        self._retired: List[Path] = []
+
+        # Encoder state
+        self.sink: Optional[EncoderSink] = None
+        self.frame_size: Optional[tuple] = None
+        self.is_running = False
+        self._last_refresh = 0.0
+
+        # Wall-clock timestamp of every frame handed to the encoder, indexed
+        # by encoder frame number
+        self._frame_times: deque = deque(
+            maxlen=int((self.max_segments + 1) * segment_length * fps)
+        )
+        self._frames_written = 0
+        self._list_position = 0
+        # Guards the segment list position and the frame times; refreshes
+        # run on both the capture thread and the clip save worker
+        self._refresh_lock = threading.Lock()
+
+        self.stats = {
+            'segments_written': 0,
+            'frames_dropped': 0,
+            'bytes_on_disk': 0
+        }
+
+    @property
+    def list_file(self) -> Path:
+        return self.cache_dir / "segments.csv"
+
+    def start(self, width: int, height: int, pix_fmt: str = 'bgr24') -> bool:
+        """Start the rolling segment encoder for frames of the given size and layout."""
+        try:
+            if self.is_running:
+                return False
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.frame_size = (width, height)
+
+            self.sink = EncoderSink(
+                self.cache_dir / 'segment_%06d.ts', width, height,
+                output_args=self._get_segment_args(),
+                fps=self.fps,
+                pix_fmt=pix_fmt
+            )
+            if not self.sink.start():
+                return False
+
+            self.is_running = True
+            self._last_refresh = time.time()
+
+            self.logger.info(
+                f"Segment replay buffer started: {width}x{height}, "
+                f"{self.segment_length}s segments, keeping {self.max_segments}"
+            )
+            return True
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Starting segment replay buffer")
+            self.is_running = False
+            return False
+
+    def _get_segment_args(self) -> List[str]:
+        """Get FFmpeg output arguments for rolling keyframe-aligned segments."""
+        gop = max(1, int(round(self.segment_length * self.fps)))
+
+        return [
+            # Closed GOPs exactly one segment long, so every segment starts
+            # on a keyframe and can be stream copied on its own
+            '-c:v', 'libx264',
+            '-preset', self.preset,
+            '-crf', '23',
+            '-pix_fmt', 'yuv420p',
+            '-g', str(gop),
+            '-keyint_min', str(gop),
+            '-sc_threshold', '0',
+            '-force_key_frames', f'expr:gte(t,n_forced*{self.segment_length})',
+
+            '-f', 'segment',
+            '-segment_time', str(self.segment_length),
+            '-segment_format', 'mpegts',
+            '-segment_list', str(self.list_file),
+            '-segment_list_type', 'csv',
+            '-segment_list_flags', '+live',
+            '-reset_timestamps', '1'
+        ]
+
+    def add_frame(self, frame: np.ndarray, timestamp: float):
+        """Queue a frame for encoding without blocking capture."""
+        if not self.is_running:
+            return
+
+        # The sink's queue is FIFO, so accepted frames map one-to-one onto
+        # encoder frame numbers
+        if self.sink.write_frame(frame, block=False):
+            with self._refresh_lock:
+                self._frame_times.append(timestamp)
+                self._frames_written += 1
+        else:
+            self.stats['frames_dropped'] += 1
+
+        if timestamp - self._last_refresh >= self.segment_length / 2:
+            self._refresh_segments()
+            self._last_refresh = timestamp
+
+    def _frame_time(self, frame_number: int) -> float:
+        """Map an encoder frame number to its capture timestamp.
+
+        Caller holds ``_refresh_lock``.
+        """
+        first_number = self._frames_written - len(self._frame_times)
+        index = min(max(frame_number - first_number, 0), len(self._frame_times) - 1)
+        return self._frame_times[index] if self._frame_times else 0.0
+
+    def _refresh_segments(self):
+        """Pick up segments the encoder has finished and prune old ones."""
+        try:
+            if not self.list_file.exists():
+                return
+
+            # Held until the segments are added, so two refreshes never
+            # read the same list lines
+            with self._refresh_lock:
+                with open(self.list_file, 'r') as f:
+                    f.seek(self._list_position)
+                    lines = f.readlines()
+                    # Only consume complete lines; the encoder may be mid-write
+                    if lines and not lines[-1].endswith('\n'):
+                        lines = lines[:-1]
+                    self._list_position += sum(len(line) for line in lines)
+
+                new_segments = []
+                for line in lines:
+                    name, start, end = line.strip().split(',')[:3]
+                    new_segments.append(ReplaySegment(
+                        path=self.cache_dir / name,
+                        start_time=self._frame_time(int(round(float(start) * self.fps))),
+                        end_time=self._frame_time(int(round(float(end) * self.fps)) - 1)
+                    ))
+
+                with self.segment_lock:
+                    for segment in new_segments:
+                        self.segments.append(segment)
+                        self.stats['segments_written'] += 1
+
+                    while len(self.segments) > self.max_segments:
+                        self._retired.append(self.segments.popleft().path)
+
+            self._delete_retired()
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Refreshing replay segments")
+
+    def _delete_retired(self):
+        """Delete expired segments that no export is reading."""
+        with self.segment_lock:
+            deletable = [path for path in self._retired if not self._leases.get(path)]
+            self._retired = [path for path in self._retired if self._leases.get(path)]
+
+        for path in deletable:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                # Still open elsewhere (Windows); retried on the next refresh
+                with self.segment_lock:
+                    self._retired.append(path)
+
+    def lease_segments(self, start_time: Optional[float] = None,
+                       end_time: Optional[float] = None) -> List[ReplaySegment]:
+        """Get segments overlapping the window and keep them on disk until released."""
+        self._refresh_segments()
+        with self.segment_lock:
+            segments = [
+                segment for segment in self.segments
+                if (start_time is None or segment.end_time >= start_time)
+                and (end_time is None or segment.start_time <= end_time)
+            ]
+            for segment in segments:
+                self._leases[segment.path] = self._leases.get(segment.path, 0) + 1
+        return segments
+
+    def release_segments(self, segments: List[ReplaySegment]):
+        """Return leased segments; expired ones are deleted once unused."""
+        with self.segment_lock:
+            for segment in segments:
+                count = self._leases.get(segment.path, 0) - 1
+                if count > 0:
+                    self._leases[segment.path] = count
+                else:
+                    self._leases.pop(segment.path, None)
+        self._delete_retired()
+
+    def get_segments(self, start_time: Optional[float] = None,
+                     end_time: Optional[float] = None) -> List[ReplaySegment]:
+        """Get finished segments overlapping the requested time window."""
+        self._refresh_segments()
+        with self.segment_lock:
+            return [
+                segment for segment in self.segments
+                if (start_time is None or segment.end_time >= start_time)
+                and (end_time is None or segment.start_time <= end_time)
+            ]
+
+    def export_clip(self, output_path: Path, audio_path: Optional[Path] = None,
+                    start_time: Optional[float] = None,
+                    end_time: Optional[float] = None,
+                    audio_start: Optional[float] = None,
+                    segments: Optional[List[ReplaySegment]] = None) -> bool:
+        """Stream copy the segments covering the window into a clip.
+
+        Whole segments are copied, so the video starts at the first
+        segment's start rather than at ``start_time``. ``audio_start`` is the
+        capture time of the audio file's first sample; the audio is shifted
+        by its distance from the first segment so both stay in sync.
+        ``segments`` are segments the caller already leased; otherwise the
+        window's segments are leased for the duration of the export.
+        """
+        concat_file = None
+        leased = None
+        try:
+            if segments is None:
+                segments = leased = self.lease_segments(start_time, end_time)
+            if not segments:
+                self.logger.warning("No finished replay segments to export")
+                return False
+
+            concat_file = self.cache_dir / f"concat_{int(time.time() * 1000)}.txt"
+            with open(concat_file, 'w') as f:
+                for segment in segments:
+                    f.write(f"file '{segment.path.as_posix()}'\n")
+
+            command = [
+                'ffmpeg',
+                '-f', 'concat',
+                '-safe', '0',
+                '-i', str(concat_file)
+            ]
+
+            if audio_path and audio_path.exists():
+                offset = 0.0 if audio_start is None else audio_start - segments[0].start_time
+                if offset > 0:
+                    # Audio starts after the first segment: delay it
+                    command.extend(['-itsoffset', f'{offset:.6f}'])
+                elif offset < 0:
+                    # Audio starts before the first segment: skip the lead-in
+                    command.extend(['-ss', f'{-offset:.6f}'])
+                command.extend([
+                    '-i', str(audio_path),
+                    '-map', '0:v:0',
+                    '-map', '1:a:0',
+                    '-c:a', 'aac',
+                    '-b:a', '192k',
+                    '-shortest'
+                ])
+
+            command.extend([
+                '-c:v', 'copy',
+                '-movflags', '+faststart',
+                '-y',
+                str(output_path)
+            ])
+
+            subprocess.run(command, capture_output=True, text=True, check=True)
+            self.logger.info(
+                f"Exported {len(segments)} replay segments to {output_path}"
+            )
+            return True
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Exporting replay clip")
+            return False
+        finally:
+            if concat_file:
+                concat_file.unlink(missing_ok=True)
+            if leased:
+                self.release_segments(leased)
+
+    def get_statistics(self) -> Dict:
+        """Get replay buffer statistics."""
+        with self.segment_lock:
+            segments = list(self.segments)
+
+        return {
+            'segments': len(segments),
+            'max_segments': self.max_segments,
+            'retired_segments': len(self._retired),
+            'segments_written': self.stats['segments_written'],
+            'frames_dropped': self.stats['frames_dropped'],
+            'buffered_duration': (
+                segments[-1].end_time - segments[0].start_time if segments else 0.0
+            ),
+            'bytes_on_disk': sum(
+                s.path.stat().st_size for s in segments if s.path.exists()
+            )
+        }
+
+    def stop(self):
+        """Stop the encoder and remove cached segments."""
+        try:
+            self.is_running = False
+            if self.sink:
+                self.sink.close(timeout=5)
+                self.sink = None
+
+            with self.segment_lock:
+                self.segments.clear()
+                self._retired.clear()
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+            self.logger.info("Segment replay buffer stopped")
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Stopping segment replay buffer")
@@ -0,0 +1,235 @@
+# src/utils/trim_engine.py
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+import os
+import json
+import bisect
+import logging
+import subprocess
+import tempfile
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Dict, List
+
+from src.constants import *
+from src.utils.error_handler import ErrorHandler
+
+@dataclass
+class KeyframeIndex:
+    """Keyframe timestamps of a recording's first video stream.
+
+    Times are seconds from the container start, the origin ``-ss`` seeks
+    from, not raw packet timestamps.
+    """
+    source_size: int
+    source_mtime: float
+    duration: float
+    codec: str
+    pix_fmt: str
+    start_time: float  # Container start the packet timestamps were shifted by
+    keyframes: List[float] = field(default_factory=list)
+
+    def keyframe_before(self, time_point: float) -> float:
+        """Latest keyframe at or before ``time_point``."""
+        position = bisect.bisect_right(self.keyframes, time_point)
+        return self.keyframes[position - 1] if position else 0.0
+
+    def keyframe_after(self, time_point: float) -> Optional[float]:
+        """Earliest keyframe strictly after ``time_point``."""
+        position = bisect.bisect_right(self.keyframes, time_point)
+        return self.keyframes[position] if position < len(self.keyframes) else None
+
+class TrimEngine:
+    """Cuts time ranges out of finished recordings without re-encoding them.
+
+    A keyframe index is built once per file with an ffprobe packet scan and
+    cached beside it. Cuts stream copy from the nearest keyframe; for
+    frame-accurate cuts only the partial GOP at the head is re-encoded and
+    joined to the copied remainder.
+    """
+
+    INDEX_SUFFIX = ".keyframes.json"
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.error_handler = ErrorHandler(DEFAULT_LOGS_PATH)
+        self.indexes: Dict[str, KeyframeIndex] = {}
+
+    def _index_path(self, source: Path) -> Path:
+        return source.with_name(source.name + self.INDEX_SUFFIX)
+
+    def get_index(self, source: str) -> Optional[KeyframeIndex]:
+        """Load the cached keyframe index for a file, building it if stale."""
+        try:
+            source = Path(source)
+            stat = source.stat()
+
+            index = self.indexes.get(str(source))
+            if index is None:
+                index = self._load_index(source)
+            if index is None or index.source_size != stat.st_size \
+                    or index.source_mtime != stat.st_mtime:
+                index = self._build_index(source)
+                self._index_path(source).write_text(json.dumps(asdict(index)))
+
+            self.indexes[str(source)] = index
+            return index
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Building keyframe index")
+            return None
+
+    def _load_index(self, source: Path) -> Optional[KeyframeIndex]:
+        index_path = self._index_path(source)
+        if not index_path.exists():
+            return None
+        try:
+            return KeyframeIndex(**json.loads(index_path.read_text()))
+        except (ValueError, TypeError):
+            self.logger.warning(f"Ignoring stale or unreadable keyframe index {index_path}")
+            return None
+
+    def _build_index(self, source: Path) -> KeyframeIndex:
+        """Scan video packets once, recording the keyframe timestamps."""
+        stat = source.stat()
+        info = json.loads(self._probe(source, [
+            '-show_entries', 'stream=codec_name,pix_fmt:format=start_time',
+            '-of', 'json'
+        ]))
+        stream = (info.get('streams') or [{}])[0]
+        # MPEG-TS and other containers rarely start at zero
+        try:
+            start_time = float(info.get('format', {}).get('start_time', 0.0))
+        except ValueError:
+            start_time = 0.0
+
+        # Packet flags only, no decoding: "pts_time,flags" per packet
+        packets = self._probe(source, [
+            '-show_entries', 'packet=pts_time,flags',
+            '-of', 'csv=p=0'
+        ])
+
+        keyframes = []
+        duration = 0.0
+        for line in packets.splitlines():
+            pts_time, _, flags = line.partition(',')
+            try:
+                pts = float(pts_time) - start_time
+            except ValueError:
+                continue
+            duration = max(duration, pts)
+            if 'K' in flags:
+                keyframes.append(pts)
+
+        keyframes.sort()
+        self.logger.info(f"Indexed {len(keyframes)} keyframes in {source.name}")
+        return KeyframeIndex(
+            source_size=stat.st_size,
+            source_mtime=stat.st_mtime,
+            duration=duration,
+            codec=stream.get('codec_name', ''),
+            pix_fmt=stream.get('pix_fmt', 'yuv420p'),
+            start_time=start_time,
+            keyframes=keyframes
+        )
+
+    def _probe(self, source: Path, args: List[str]) -> str:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0', *args, str(source)],
+            capture_output=True, text=True, check=True
+        )
+        return result.stdout
+
+    def trim(self, source: str, output: str, start: float, end: float,
+             accurate: bool = False) -> bool:
+        """Cut ``[start, end)`` seconds of ``source`` into ``output``.
+
+        Without ``accurate`` the cut begins at the keyframe at or before
+        ``start``. With it, frames between ``start`` and the next keyframe
+        are re-encoded and everything after is stream copied.
+        """
+        try:
+            index = self.get_index(source)
+            if index is None or not index.keyframes:
+                return False
+
+            end = min(end, index.duration) if index.duration else end
+            keyframe = index.keyframe_before(start)
+
+            if not accurate or keyframe == start:
+                return self._copy(source, output, keyframe, end)
+
+            next_keyframe = index.keyframe_after(start)
+            if index.codec != 'h264' or next_keyframe is None or next_keyframe >= end:
+                # Nothing left to copy after the head, or no matching encoder
+                return self._encode(source, output, start, end, index)
+
+            return self._splice(source, output, start, next_keyframe, end, index)
+
+        except Exception as e:
+            self.error_handler.handle_error(e, context="Trimming recording")
+            return False
+
+    def _copy(self, source: str, output: str, start: float, end: float,
+              output_args: Optional[List[str]] = None) -> bool:
+        """Stream copy from the keyframe at ``start``."""
+        return self._run([
+            'ffmpeg', '-hide_banner', '-ss', f'{start:.6f}', '-i', str(source),
+            '-t', f'{end - start:.6f}',
+            '-map', '0', '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+            *(output_args or self._container_args(output)),
+            '-y', str(output)
+        ])
+
+    def _encode(self, source: str, output: str, start: float, end: float,
+                index: KeyframeIndex, output_args: Optional[List[str]] = None) -> bool:
+        """Re-encode a range with settings that match the recording."""
+        return self._run([
+            'ffmpeg', '-hide_banner', '-ss', f'{start:.6f}', '-i', str(source),
+            '-t', f'{end - start:.6f}',
+            # High quality so the re-encoded head does not stand out
+            '-c:v', 'libx264', '-preset', DEFAULT_VIDEO_PRESET, '-crf', '18',
+            '-pix_fmt', index.pix_fmt or 'yuv420p',
+            '-c:a', 'aac', '-b:a', AUDIO_BITRATES['high'],
+            *(output_args or self._container_args(output)),
+            '-y', str(output)
+        ])
+
+    def _splice(self, source: str, output: str, start: float, keyframe: float,
+                end: float, index: KeyframeIndex) -> bool:
+        """Re-encode the head GOP, stream copy the rest and join them."""
+        with tempfile.TemporaryDirectory(prefix="voiceclips_trim_") as temp_dir:
+            head = os.path.join(temp_dir, "head.ts")
+            tail = os.path.join(temp_dir, "tail.ts")
+            ts_args = ['-f', 'mpegts']
+
+            if not self._encode(source, head, start, keyframe, index, ts_args):
+                return False
+            if not self._copy(source, tail, keyframe, end, ts_args):
+                return False
+
+            concat_list = os.path.join(temp_dir, "parts.txt")
+            with open(concat_list, 'w') as f:
+                f.write(f"file '{head}'\nfile '{tail}'\n")
+
+            return self._run([
+                'ffmpeg', '-hide_banner', '-f', 'concat', '-safe', '0',
+                '-i', concat_list, '-c', 'copy',
+                *self._container_args(output),
+                '-y', str(output)
+            ])
+
+    def _container_args(self, output: str) -> List[str]:
+        if str(output).lower().endswith(('.mp4', '.mov')):
+            return ['-movflags', '+faststart']
+        return []
+
+    def _run(self, command: List[str]) -> bool:
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            self.logger.error(f"FFmpeg trim failed: {result.stderr[-500:]}")
+            return False
+        return True
@@ -166,23 +166,37 @@ class VideoManager:
             self.error_handler.handle_error(e, context="Getting camera capabilities")
             return {}
 
+    def select_device(self, device_id: str = None) -> VideoDevice:
+        """Make ``device_id`` (or, by default, the first screen) the capture device."""
+        if device_id and device_id in self.devices:
+            self.current_device = self.devices[device_id]
+        elif not self.current_device:
+            # Default to first screen
+            screen_devices = [d for d in self.devices.values() 
+                            if d.type == 'screen']
+            if screen_devices:
+                self.current_device = screen_devices[0]
+            else:
+                raise Exception("No capture device available")
+        return self.current_device
+
+    def get_frame_format(self) -> Tuple[str, Tuple[int, int]]:
+        """Layout and ``(width, height)`` of the frames capture will produce.
+
+        Frames keep the device's native channel order so nothing is
+        converted per frame: mss grabs BGRA, OpenCV cameras deliver BGR.
+        Encoders declare this layout as their input pixel format instead.
+        """
+        device = self.select_device()
+        return ('BGRA' if device.type == 'screen' else 'BGR'), self.frame_size
+
     def start_capture(self, device_id: str = None) -> bool:
         """Start video capture."""
         try:
             if self.is_capturing:
                 return False
 
-            # Select device
-            if device_id and device_id in self.devices:
-                self.current_device = self.devices[device_id]
-            elif not self.current_device:
-                # Default to first screen
-                screen_devices = [d for d in self.devices.values() 
-                                if d.type == 'screen']
-                if screen_devices:
-                    self.current_device = screen_devices[0]
-                else:
-                    raise Exception("No capture device available")
+            self.select_device(device_id)
 
             # Start capture thread
             self.is_capturing = True
@@ -220,6 +234,7 @@ class VideoManager:
         last_frame_time = time.time()
         frame_count = 0
         fps_update_time = last_frame_time
+        frame_format, _ = self.get_frame_format()
         
         try:
             while self.is_capturing:
@@ -239,7 +254,8 @@ class VideoManager:
                     data=frame,
                     timestamp=current_time,
                     frame_number=frame_count,
-                    resolution=self.frame_size
+                    resolution=self.frame_size,
+                    format=frame_format
                 )
 
                 # Add to buffers
@@ -281,16 +297,14 @@ class VideoManager:
             # Capture screenshot
             screenshot = self.sct.grab(monitor)
             
-            # Convert to numpy array
+            # Convert to numpy array, keeping mss's native BGRA layout
             frame = np.array(screenshot)
-            
-            # Convert from BGRA to BGR
-            if frame.shape[2] == 4:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
                 
             # Calculate aspect ratio preserving resize
             screen_h, screen_w = frame.shape[:2]
             target_w, target_h = self.frame_size
+            if (screen_w, screen_h) == (target_w, target_h):
+                return frame
             
             # Calculate scaling factor while maintaining aspect ratio
             scale = min(target_w/screen_w, target_h/screen_h)
@@ -301,7 +315,7 @@ class VideoManager:
             frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
             
             # Create black canvas of target size
-            canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
+            canvas = np.zeros((target_h, target_w, frame.shape[2]), dtype=np.uint8)
             
             # Calculate position to center the frame
             x_offset = (target_w - new_w) // 2
@@ -334,8 +348,8 @@ class VideoManager:
                 if not ret:
                     raise Exception("Failed to read camera frame")
                 
-                # Resize if needed
-                if frame.shape[:2] != self.frame_size:
+                # Resize if needed (shape is height, width)
+                if frame.shape[1::-1] != self.frame_size:
                     frame = cv2.resize(frame, self.frame_size)
                 
                 return frame
@@ -371,9 +385,11 @@ class VideoManager:
         except Exception as e:
             self.error_handler.handle_error(e, context="Adding to buffers")
 
-    def get_frame(self) -> Optional[VideoFrame]:
-        """Get latest frame."""
+    def get_frame(self, timeout: Optional[float] = None) -> Optional[VideoFrame]:
+        """Get the next captured frame, waiting up to ``timeout`` seconds for one."""
         try:
+            if timeout is not None:
+                return self.frame_buffer.get(timeout=timeout)
             return self.frame_buffer.get_nowait()
         except queue.Empty:
             return None